@@ -0,0 +1 @@
+"""Performance benchmarks and regression checks."""
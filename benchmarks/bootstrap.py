@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Flux bootstrap pipeline against the fake kubectl.
+
+Generates a Flux-like component manifest (CRDs, namespace, RBAC,
+controllers and their services, custom resources), seeds the fake k3d with
+N clusters and bootstraps all of them through ``cluster bootstrap``. Reports
+wall time and kubectl calls, next to the calls a one-``kubectl apply``-per-
+manifest approach would need.
+
+Usage:
+    python benchmarks/bootstrap.py [--clusters 20] [--parallel 8] [--controllers 6]
+                                   [--latency-ms 50] [--object-ms 2] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "cli.py"
+FAKES = Path(__file__).resolve().parent / "fakes"
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from fakes.fake_tool import cluster_name  # noqa: E402
+
+
+def flux_like_manifest(controllers: int) -> List[Dict]:
+    """Build a Flux-shaped bundle with ``controllers`` controllers."""
+    namespace = "flux-system"
+    objects: List[Dict] = [{"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": namespace}}]
+    for index in range(controllers):
+        name = f"controller-{index}"
+        group = f"group{index}.toolkit.fluxcd.io"
+        objects += [
+            {
+                "apiVersion": "apiextensions.k8s.io/v1",
+                "kind": "CustomResourceDefinition",
+                "metadata": {"name": f"things.{group}"},
+                "spec": {"group": group, "names": {"kind": f"Thing{index}", "plural": "things"}, "scope": "Namespaced"},
+            },
+            {"apiVersion": "v1", "kind": "ServiceAccount", "metadata": {"name": name, "namespace": namespace}},
+            {"apiVersion": "rbac.authorization.k8s.io/v1", "kind": "ClusterRole", "metadata": {"name": name}},
+            {"apiVersion": "rbac.authorization.k8s.io/v1", "kind": "ClusterRoleBinding", "metadata": {"name": name}},
+            {"apiVersion": "v1", "kind": "Service", "metadata": {"name": name, "namespace": namespace}},
+            {"apiVersion": "apps/v1", "kind": "Deployment", "metadata": {"name": name, "namespace": namespace}},
+            {"apiVersion": f"{group}/v1", "kind": f"Thing{index}", "metadata": {"name": name, "namespace": namespace}},
+        ]
+    return objects
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=20, help="Clusters to bootstrap")
+    parser.add_argument("--parallel", type=int, default=8, help="Clusters bootstrapped concurrently")
+    parser.add_argument("--controllers", type=int, default=6, help="Controllers in the generated manifest")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of every kubectl call")
+    parser.add_argument("--object-ms", type=float, default=2.0, help="Extra apply latency per object")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    import yaml
+    
+    with tempfile.TemporaryDirectory(prefix="tools-cli-bootstrap-") as tmp:
+        root = Path(tmp)
+        objects = flux_like_manifest(args.controllers)
+        (root / "install.yaml").write_text(yaml.safe_dump_all(objects, sort_keys=False))
+        (root / "config.yaml").write_text(yaml.safe_dump({
+            "fluxConfig": {"version": "0.0.0-bench", "manifestUrl": (root / "install.yaml").as_uri()},
+        }))
+        
+        env = dict(os.environ)
+        env["PATH"] = f"{FAKES}{os.pathsep}{env.get('PATH', '')}"
+        env["XDG_CACHE_HOME"] = str(root / "cache")
+        env["FAKE_STATE_DIR"] = str(root / "state")
+        env["FAKE_CLUSTERS"] = str(args.clusters)
+        env["FAKE_KUBECTL_LATENCY_MS"] = str(args.latency_ms)
+        env["FAKE_KUBECTL_OBJECT_MS"] = str(args.object_ms)
+        env["TOOLS_CLI_NO_DAEMON"] = "1"
+        
+        names = [cluster_name(index) for index in range(args.clusters)]
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, str(CLI), "cluster", "bootstrap", *names, "--parallel", str(args.parallel)],
+            cwd=root,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = time.perf_counter() - start
+        if completed.returncode != 0:
+            print(completed.stdout + completed.stderr, file=sys.stderr)
+            return 1
+        
+        calls = (root / "state" / "kubectl.log").read_text().splitlines()
+        
+        # Cost of one fake kubectl invocation, process start-up included
+        start = time.perf_counter()
+        subprocess.run(["kubectl", "version"], env=env, capture_output=True)
+        call_seconds = time.perf_counter() - start
+        
+        per_manifest_calls = len(objects) * args.clusters
+        per_manifest_seconds = per_manifest_calls * (call_seconds + args.object_ms / 1000) / args.parallel
+        results = {
+            "clusters": args.clusters,
+            "objects": len(objects),
+            "wall_ms": round(wall * 1000, 1),
+            "kubectl_calls": len(calls),
+            "kubectl_calls_per_cluster": round(len(calls) / args.clusters, 1),
+            "kubectl_call_ms": round(call_seconds * 1000, 1),
+            "per_manifest_calls": per_manifest_calls,
+            "per_manifest_estimate_ms": round(per_manifest_seconds * 1000, 1),
+        }
+    
+    print(f"{results['clusters']} clusters x {results['objects']} objects: {results['wall_ms']:.0f}ms, "
+          f"{results['kubectl_calls']} kubectl calls ({results['kubectl_calls_per_cluster']:g}/cluster)")
+    print(f"one apply per manifest: {results['per_manifest_calls']} calls, "
+          f"~{results['per_manifest_estimate_ms']:.0f}ms at the same parallelism")
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cold vs. warm ConfigHandler.load benchmark at several config sizes.
+
+For each size a multi-cluster config is generated and loaded with:
+  - pure-Python yaml.safe_load (the previous implementation)
+  - ConfigHandler without the parse cache (libyaml when available)
+  - ConfigHandler with a cold parse cache (parse + cache write)
+  - ConfigHandler with a warm parse cache
+and the dotted-key index behind ConfigHandler.get is built and queried
+with per-cluster keys.
+
+Usage:
+    python benchmarks/config_load.py [--sizes 10KB,1MB,10MB] [--repeat 5] [--json out.json] [--no-baseline]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yaml  # noqa: E402
+from core.config_handler import ConfigHandler  # noqa: E402
+
+UNITS = {"KB": 1024, "MB": 1024 * 1024}
+
+# ConfigHandler.get calls timed per size
+GET_LOOKUPS = 10_000
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as "10KB" or "1MB" into bytes."""
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def generate_config(target_bytes: int) -> str:
+    """
+    Generate a config with a multi-cluster list of roughly the given size.
+    
+    Args:
+        target_bytes: Approximate document size
+    
+    Returns:
+        YAML document
+    """
+    config = {
+        "credentials": {"accessToken": ""},
+        "templateConfig": {"templateProvider": "local", "templateTag": "3.1.0", "templateUrl": ""},
+        "clusterConfig": {"name": "my-cluster", "type": "local", "groupId": 0,
+                          "useLocalRegistry": True, "portsToOpen": "80,443"},
+        "tools": ["kubectl", "helm", "k3d"],
+        "clusters": [],
+    }
+    sample = {
+        "name": "cluster-00000",
+        "type": "local",
+        "groupId": 0,
+        "useLocalRegistry": False,
+        "portsToOpen": "80,443,8080",
+        "labels": {"team": "platform", "env": "ci", "tier": "ephemeral"},
+    }
+    per_cluster = len(yaml.safe_dump([sample]))
+    for index in range(max(1, target_bytes // per_cluster)):
+        cluster = dict(sample, name=f"cluster-{index:05d}", groupId=index % 16)
+        config["clusters"].append(cluster)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml.dump(config, Dumper=dumper, sort_keys=False)
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Return the best wall-clock time of several runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench_size(size: int, repeat: int, workdir: Path, baseline: bool = True) -> Dict[str, float]:
+    """Benchmark every load strategy for one config size."""
+    path = workdir / f"config-{size}.yaml"
+    path.write_text(generate_config(size))
+    # Age the file so the parse cache trusts mtime/size
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    
+    def pure_python():
+        with open(path) as f:
+            yaml.load(f, Loader=yaml.SafeLoader)
+    
+    def cold_cache():
+        shutil.rmtree(workdir / "cache", ignore_errors=True)
+        ConfigHandler(str(path)).load()
+    
+    results = {
+        "bytes": path.stat().st_size,
+        "pure_python_ms": best_of(repeat, pure_python) if baseline else float("nan"),
+        "no_cache_ms": best_of(repeat, lambda: ConfigHandler(str(path), use_cache=False).load()),
+        "cold_cache_ms": best_of(repeat, cold_cache),
+    }
+    ConfigHandler(str(path)).load()
+    results["warm_cache_ms"] = best_of(repeat, lambda: ConfigHandler(str(path)).load())
+    
+    handler = ConfigHandler(str(path))
+    config = handler.load()
+    results["index_ms"] = best_of(repeat, lambda: ConfigHandler.build_index(config))
+    clusters = len(config["clusters"])
+    keys = [f"clusters.{index % clusters}.portsToOpen" for index in range(GET_LOOKUPS)]
+    handler.get("clusterConfig.name")
+    results["get_us"] = best_of(repeat, lambda: [handler.get(key) for key in keys]) * 1000 / GET_LOOKUPS
+    return {key: round(value, 3) for key, value in results.items()}
+
+
+def run(sizes, repeat: int = 5, baseline: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmark.
+    
+    Args:
+        sizes: Size labels such as "10KB"
+        repeat: Runs per measurement (best counts)
+        baseline: Also time the pure-Python loader (slow for large sizes)
+    
+    Returns:
+        Dictionary of size labels and timings
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        previous = os.environ.get("XDG_CACHE_HOME")
+        os.environ["XDG_CACHE_HOME"] = str(workdir / "cache")
+        try:
+            for label in sizes:
+                results[label] = bench_size(parse_size(label), repeat, workdir, baseline)
+        finally:
+            if previous is None:
+                os.environ.pop("XDG_CACHE_HOME", None)
+            else:
+                os.environ["XDG_CACHE_HOME"] = previous
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10KB,1MB,10MB", help="Comma-separated config sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best counts)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the pure-Python yaml.safe_load timing")
+    args = parser.parse_args()
+    
+    results = run(args.sizes.split(","), args.repeat, not args.no_baseline)
+    
+    print(f"libyaml available: {yaml.__with_libyaml__}")
+    print(f"{'size':>6} {'pure-py':>10} {'no cache':>10} {'cold':>10} {'warm':>10} {'index':>10}  (ms)"
+          f" {'get':>8} (us)")
+    for label, result in results.items():
+        print(f"{label:>6} {result['pure_python_ms']:>10.2f} {result['no_cache_ms']:>10.2f} "
+              f"{result['cold_cache_ms']:>10.2f} {result['warm_cache_ms']:>10.3f} {result['index_ms']:>10.2f}"
+              f"      {result['get_us']:>8.3f}")
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
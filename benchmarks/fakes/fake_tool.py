@@ -0,0 +1,213 @@
+"""
+Scripted stand-ins for k3d, kubectl, helm and argocd.
+
+The executables next to this module call :func:`main` with their tool name.
+Behaviour is controlled through the environment:
+
+  FAKE_STATE_DIR       Directory holding the fake k3d cluster state (required)
+  FAKE_CLUSTERS        Clusters to seed when no state exists yet (default 0)
+  FAKE_LATENCY_MS      Delay added to every invocation (default 0)
+  FAKE_<TOOL>_LATENCY_MS  Per-tool override, e.g. FAKE_K3D_LATENCY_MS
+  FAKE_CREATE_STEP_MS  Delay between streamed ``k3d cluster create`` lines
+  FAKE_KUBECTL_OBJECT_MS  Delay per object in a ``kubectl apply -f`` file
+  FAKE_IMAGE_IMPORT_MS Duration of one ``k3d image import``
+
+Every kubectl call against a ``--context`` is appended to
+``$FAKE_STATE_DIR/kubectl.log``; contexts of clusters the fake k3d does not
+know fail like an unreachable API server. ``k3d registry create`` and
+``k3d image import`` calls are appended to ``$FAKE_STATE_DIR/k3d.log``.
+"""
+
+import fcntl
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+VERSIONS = {
+    "k3d": "k3d version v5.6.0\nk3s version v1.27.4-k3s1 (default)",
+    "kubectl": "Client Version: v1.29.2\nKustomize Version: v5.0.4-0.20230601165947-6ce0bf390ce3",
+    "helm": 'version.BuildInfo{Version:"v3.14.0", GitCommit:"3fc9f4b", GoVersion:"go1.21.5"}',
+    "argocd": "argocd: v2.10.1+a79e0ea\n  BuildDate: 2024-02-14T17:37:43Z",
+}
+
+CREATE_LINES = [
+    "Prep: Network",
+    "Created network 'k3d-{name}'",
+    "Created image volume k3d-{name}-images",
+    "Creating node 'k3d-{name}-server-0'",
+    "Creating LoadBalancer 'k3d-{name}-serverlb'",
+    "Starting cluster '{name}'",
+    "Starting servers...",
+    "Starting Node 'k3d-{name}-serverlb'",
+    "Injecting records for hostAliases",
+    "Cluster '{name}' created successfully!",
+]
+
+
+def cluster_name(index: int) -> str:
+    """Name of the index-th seeded cluster."""
+    return f"bench-{index:05d}"
+
+
+def _env_seconds(name: str, default: float = 0.0) -> float:
+    """Read a millisecond setting from the environment as seconds."""
+    value = os.environ.get(name)
+    return float(value) / 1000 if value else default
+
+
+def _node(name: str, role: str) -> Dict:
+    """Build a k3d node entry."""
+    ports = {"80/tcp": [{"HostIp": "0.0.0.0", "HostPort": "80"}]} if role == "loadbalancer" else {}
+    return {
+        "name": name,
+        "role": role,
+        "image": "rancher/k3s:v1.27.4-k3s1",
+        "created": "2024-01-01T00:00:00Z",
+        "State": {"Running": True},
+        "portMappings": ports,
+    }
+
+
+def _cluster(name: str) -> Dict:
+    """Build a ``k3d cluster list -o json`` entry."""
+    return {
+        "name": name,
+        "nodes": [_node(f"k3d-{name}-server-0", "server"), _node(f"k3d-{name}-serverlb", "loadbalancer")],
+        "serversCount": 1,
+        "serversRunning": 1,
+        "agentsCount": 0,
+        "agentsRunning": 0,
+    }
+
+
+@contextmanager
+def _state():
+    """Lock and yield the cluster name list, saving it afterwards."""
+    state_dir = Path(os.environ["FAKE_STATE_DIR"])
+    state_dir.mkdir(parents=True, exist_ok=True)
+    path = state_dir / "k3d.json"
+    with open(state_dir / "k3d.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if path.exists():
+            names = json.loads(path.read_text())
+        else:
+            names = [cluster_name(i) for i in range(int(os.environ.get("FAKE_CLUSTERS", "0")))]
+        yield names
+        path.write_text(json.dumps(names))
+
+
+def _registries() -> List[str]:
+    """Registry container names created through the fake k3d."""
+    path = Path(os.environ["FAKE_STATE_DIR"]) / "registries.json"
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def _log_k3d(args: List[str]):
+    with open(Path(os.environ["FAKE_STATE_DIR"]) / "k3d.log", "a") as log:
+        log.write(json.dumps(args) + "\n")
+
+
+def k3d(args: List[str]) -> int:
+    """Fake k3d."""
+    if args[:1] == ["version"]:
+        print(VERSIONS["k3d"])
+        return 0
+    if args[:2] == ["image", "import"]:
+        cluster = _option(args, "--cluster")
+        with _state() as names:
+            known = cluster in names
+        if not known:
+            print(f"FATA[0000] Failed to get cluster '{cluster}'", file=sys.stderr)
+            return 1
+        _log_k3d(args)
+        time.sleep(_env_seconds("FAKE_IMAGE_IMPORT_MS"))
+        return 0
+    
+    with _state() as names:
+        if args[:2] == ["registry", "list"]:
+            print(json.dumps([{"name": name, "role": "registry"} for name in _registries()]))
+            return 0
+        if args[:2] == ["registry", "create"] and len(args) > 2:
+            registries = _registries()
+            registries.append(f"k3d-{args[2]}")
+            (Path(os.environ["FAKE_STATE_DIR"]) / "registries.json").write_text(json.dumps(registries))
+            _log_k3d(args)
+            return 0
+        if args[:2] == ["cluster", "list"]:
+            print(json.dumps([_cluster(name) for name in names]))
+            return 0
+        if args[:2] == ["cluster", "create"] and len(args) > 2:
+            name = args[2]
+            if name in names:
+                print(f"FATA[0000] Failed to create cluster '{name}' because a cluster with that name already exists")
+                return 1
+            step = _env_seconds("FAKE_CREATE_STEP_MS")
+            for line in CREATE_LINES:
+                print(f"INFO[0000] {line.format(name=name)}", flush=True)
+                time.sleep(step)
+            names.append(name)
+            return 0
+        if args[:2] == ["cluster", "delete"] and len(args) > 2:
+            if args[2] in names:
+                names.remove(args[2])
+            print(f"INFO[0000] Deleting cluster '{args[2]}'")
+            return 0
+    
+    print(f"fake k3d: unsupported arguments: {' '.join(args)}", file=sys.stderr)
+    return 1
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    """Get the value of ``--name value`` or ``--name=value``."""
+    for index, arg in enumerate(args):
+        if arg == name and index + 1 < len(args):
+            return args[index + 1]
+        if arg.startswith(f"{name}="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def kubectl(args: List[str]) -> int:
+    """Fake kubectl: apply/wait against contexts of fake k3d clusters."""
+    context = _option(args, "--context")
+    if args[:1] == ["version"] or context is None:
+        return generic("kubectl", args)
+    
+    with _state() as names:
+        known = context.startswith("k3d-") and context[len("k3d-"):] in names
+    with open(Path(os.environ["FAKE_STATE_DIR"]) / "kubectl.log", "a") as log:
+        log.write(json.dumps(args) + "\n")
+    if not known:
+        print(f'error: context "{context}" does not exist', file=sys.stderr)
+        return 1
+    
+    if "apply" in args:
+        path = _option(args, "-f")
+        files = [] if path is None else sorted(Path(path).rglob("*")) if Path(path).is_dir() else [Path(path)]
+        lines = [line for file in files if file.is_file() for line in file.read_text().splitlines()]
+        objects = sum(1 for line in lines if line.startswith("kind: "))
+        time.sleep(objects * _env_seconds("FAKE_KUBECTL_OBJECT_MS"))
+        print(f"{objects} object(s) serverside-applied")
+    return 0
+
+
+def generic(tool: str, args: List[str]) -> int:
+    """Fake kubectl, helm and argocd: version probes succeed, everything else is a no-op."""
+    if args[:1] == ["version"]:
+        print(VERSIONS[tool])
+    return 0
+
+
+def main(tool: str) -> int:
+    """Entry point used by the fake executables."""
+    time.sleep(_env_seconds(f"FAKE_{tool.upper()}_LATENCY_MS", _env_seconds("FAKE_LATENCY_MS")))
+    args = sys.argv[1:]
+    if tool == "k3d":
+        return k3d(args)
+    if tool == "kubectl":
+        return kubectl(args)
+    return generic(tool, args)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+ClusterManager orchestration overhead against the simulated provider.
+
+Drives create -> list/info -> bootstrap -> delete for N clusters through
+ClusterManager.run_operations and compares the wall-clock time of each phase
+with the best possible time given the simulated latencies and the
+provider's concurrency limits. The difference is orchestration overhead.
+
+Usage:
+    python benchmarks/orchestration.py [--clusters 1000] [--parallel 64]
+                                       [--time-scale 0.01] [--failure-rate 0] [--json out.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.cluster_manager import ClusterManager  # noqa: E402
+
+SIMULATED_PROVIDER = "providers.simulated_provider.SimulatedProvider"
+
+
+def operations(action: str, names: List[str]) -> List[Dict]:
+    """Build one simulated operation per cluster."""
+    return [{"action": action, "type": "simulated", "name": name} for name in names]
+
+
+def run(clusters: int, parallel: int, time_scale: float, failure_rate: float, seed: int = 1) -> Dict[str, Dict]:
+    """
+    Run every phase once.
+    
+    Args:
+        clusters: Number of clusters to create
+        parallel: ClusterManager concurrency
+        time_scale: Multiplier for the simulated latencies
+        failure_rate: Failure probability of every operation
+        seed: Random seed for latencies and failures
+    
+    Returns:
+        Dictionary of phase names and results
+    """
+    config = {
+        "simulatedConfig": {
+            "timeScale": time_scale,
+            "seed": seed,
+            "failureRate": {op: failure_rate for op in ("create", "delete", "info", "bootstrap")},
+        }
+    }
+    manager = ClusterManager(config)
+    # The simulated provider is not shipped in PROVIDER_MAP; register it here only
+    manager.PROVIDER_MAP = dict(ClusterManager.PROVIDER_MAP, simulated=SIMULATED_PROVIDER)
+    provider = manager._get_provider("simulated")
+    names = [f"sim-{index:05d}" for index in range(clusters)]
+    
+    phases = [
+        ("create", operations("create", names)),
+        ("list", [{"action": "list", "type": "simulated"}]),
+        ("info", operations("info", names)),
+        ("bootstrap", operations("bootstrap", names)),
+        ("delete", operations("delete", names)),
+    ]
+    results = {}
+    for phase, ops in phases:
+        before = dict(provider.stats[phase])
+        start = time.perf_counter()
+        outcomes = manager.run_operations(ops, concurrency=parallel)
+        wall = time.perf_counter() - start
+        
+        simulated = provider.stats[phase]["simulated_seconds"] - before["simulated_seconds"]
+        slots = min(parallel, provider.concurrency.get(phase) or parallel, len(ops))
+        ideal = simulated / slots
+        results[phase] = {
+            "operations": len(ops),
+            "failed": sum(1 for outcome in outcomes if not outcome["ok"]),
+            "wall_ms": round(wall * 1000, 2),
+            "ideal_ms": round(ideal * 1000, 2),
+            "overhead_ms": round((wall - ideal) * 1000, 2),
+            "overhead_per_op_us": round((wall - ideal) / len(ops) * 1_000_000, 1),
+            "ops_per_second": round(len(ops) / wall, 1),
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=1000, help="Clusters to create")
+    parser.add_argument("--parallel", type=int, default=64, help="ClusterManager concurrency")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Multiplier for simulated latencies")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Failure probability per operation")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run(args.clusters, args.parallel, args.time_scale, args.failure_rate)
+    
+    print(f"{'phase':10} {'ops':>6} {'failed':>6} {'wall':>10} {'ideal':>10} {'overhead/op':>12} {'ops/s':>9}")
+    for phase, result in results.items():
+        print(f"{phase:10} {result['operations']:>6} {result['failed']:>6} {result['wall_ms']:>8.1f}ms "
+              f"{result['ideal_ms']:>8.1f}ms {result['overhead_per_op_us']:>10.1f}us {result['ops_per_second']:>9.1f}")
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
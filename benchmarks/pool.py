@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cluster handout from the warm pool against the fake k3d.
+
+Fills a pool, then times ``cluster create --from-pool`` against a plain
+``cluster create`` whose fake k3d output is slowed down to resemble a real
+create. The claim's background refill is waited for before the next claim.
+
+Usage:
+    python benchmarks/pool.py [--claims 3] [--create-step-ms 500] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "cli.py"
+FAKES = Path(__file__).resolve().parent / "fakes"
+
+
+def run_cli(argv: List[str], root: Path, env: Dict[str, str]) -> float:
+    """Run the CLI and return its wall time in seconds."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(CLI)] + argv, cwd=root, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{' '.join(argv)}' failed: {completed.stdout}{completed.stderr}")
+    return wall
+
+
+def wait_for_ready(database: Path, size: int, timeout: float = 60.0):
+    """Wait until the pool has ``size`` ready clusters again."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with sqlite3.connect(str(database)) as db:
+            ready = db.execute("SELECT COUNT(*) FROM pool WHERE state = 'ready'").fetchone()[0]
+        if ready >= size:
+            return
+        time.sleep(0.1)
+    raise RuntimeError("pool was not refilled in time")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--claims", type=int, default=3, help="Clusters to claim")
+    parser.add_argument("--create-step-ms", type=float, default=500.0, help="Delay between fake k3d create lines")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    import yaml
+    
+    with tempfile.TemporaryDirectory(prefix="tools-cli-pool-") as tmp:
+        root = Path(tmp)
+        (root / "config.yaml").write_text(yaml.safe_dump({"poolConfig": {"size": 1, "maxParallel": 1}}))
+        
+        env = dict(os.environ)
+        env["PATH"] = f"{FAKES}{os.pathsep}{env.get('PATH', '')}"
+        env["XDG_CACHE_HOME"] = str(root / "cache")
+        env["FAKE_STATE_DIR"] = str(root / "state")
+        env["FAKE_CREATE_STEP_MS"] = str(args.create_step_ms)
+        env["TOOLS_CLI_NO_DAEMON"] = "1"
+        database = root / "cache" / "tools-cli" / "pool" / "pool.db"
+        
+        create = run_cli(["cluster", "create", "plain"], root, env)
+        run_cli(["cluster", "pool", "fill"], root, env)
+        claims = []
+        for index in range(args.claims):
+            claims.append(run_cli(["cluster", "create", f"job-{index}", "--from-pool"], root, env))
+            wait_for_ready(database, 1)
+        
+        results = {
+            "create_ms": round(create * 1000, 1),
+            "claim_median_ms": round(statistics.median(claims) * 1000, 1),
+            "claims": args.claims,
+        }
+    
+    print(f"cluster create: {results['create_ms']:.0f}ms, "
+          f"create --from-pool: {results['claim_median_ms']:.0f}ms (median of {results['claims']})")
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
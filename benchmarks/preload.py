@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Image preloading against the fake k3d.
+
+Creates N image tarballs, seeds the fake k3d with a cluster and runs
+``cluster preload`` once with ``--parallel 1`` and once with the requested
+parallelism. Also creates clusters attached to the shared registry and
+counts how many registries k3d was asked to create.
+
+Usage:
+    python benchmarks/preload.py [--images 8] [--parallel 4] [--import-ms 300]
+                                 [--clusters 3] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "cli.py"
+FAKES = Path(__file__).resolve().parent / "fakes"
+
+sys.path.insert(0, str(REPO_ROOT))
+
+from fakes.fake_tool import cluster_name  # noqa: E402
+
+
+def run_cli(argv: List[str], root: Path, env: Dict[str, str]) -> float:
+    """Run the CLI and return its wall time in seconds."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(CLI)] + argv, cwd=root, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{' '.join(argv)}' failed: {completed.stdout}{completed.stderr}")
+    return wall
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=8, help="Image tarballs to preload")
+    parser.add_argument("--parallel", type=int, default=4, help="Imports in flight")
+    parser.add_argument("--import-ms", type=float, default=300.0, help="Duration of one fake image import")
+    parser.add_argument("--clusters", type=int, default=3, help="Clusters created on the shared registry")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    import yaml
+    
+    with tempfile.TemporaryDirectory(prefix="tools-cli-preload-") as tmp:
+        root = Path(tmp)
+        images = []
+        for index in range(args.images):
+            path = root / "images" / f"image-{index}.tar"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"\0" * 1024)
+            images.append(str(path))
+        (root / "config.yaml").write_text(yaml.safe_dump({
+            "clusterConfig": {"useLocalRegistry": True},
+            "registryConfig": {"shared": True},
+            "preloadConfig": {"images": images, "maxParallel": args.parallel},
+        }))
+        
+        env = dict(os.environ)
+        env["PATH"] = f"{FAKES}{os.pathsep}{env.get('PATH', '')}"
+        env["XDG_CACHE_HOME"] = str(root / "cache")
+        env["FAKE_STATE_DIR"] = str(root / "state")
+        env["FAKE_CLUSTERS"] = "1"
+        env["FAKE_IMAGE_IMPORT_MS"] = str(args.import_ms)
+        env["TOOLS_CLI_NO_DAEMON"] = "1"
+        
+        target = cluster_name(0)
+        serial = run_cli(["cluster", "preload", target, "--parallel", "1"], root, env)
+        parallel = run_cli(["cluster", "preload", target, "--parallel", str(args.parallel)], root, env)
+        
+        for index in range(args.clusters):
+            run_cli(["cluster", "create", f"shared-{index}", "--registry"], root, env)
+        calls = [json.loads(line) for line in (root / "state" / "k3d.log").read_text().splitlines()]
+        registries_created = sum(1 for call in calls if call[:2] == ["registry", "create"])
+        
+        results = {
+            "images": args.images,
+            "import_ms": args.import_ms,
+            "serial_ms": round(serial * 1000, 1),
+            "parallel_ms": round(parallel * 1000, 1),
+            "parallel": args.parallel,
+            "clusters": args.clusters,
+            "registries_created": registries_created,
+        }
+    
+    print(f"preload {results['images']} images: {results['serial_ms']:.0f}ms serial, "
+          f"{results['parallel_ms']:.0f}ms with --parallel {results['parallel']}")
+    print(f"{results['clusters']} clusters on the shared registry: {results['registries_created']} registry created")
+    
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
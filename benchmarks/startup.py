@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Cold-start regression check based on ``python -X importtime``.
+
+Runs the CLI in a fresh interpreter for each scenario, sums the top-level
+cumulative import times and fails (exit code 1) when the best of several
+runs exceeds the scenario's budget or a module that must stay lazy shows up.
+
+The budgets are on import time rather than wall time because wall time is
+dominated by whatever the command runs: a cold ``cluster list`` also waits
+for typer, the rich table and the ``k3d`` call itself, so it cannot reach
+100 ms in a fresh interpreter. The sub-100 ms target holds for cold
+``version`` and for the CLI's own overhead on commands forwarded to a
+running ``cli.py serve``; this check guards the import side against
+regressions.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--scale 1.0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "cli.py"
+
+# name -> (argv, import budget in ms, modules that must not be imported, extra env).
+# Budgets leave about 50% headroom over the slowest runs seen on a loaded
+# machine; the lazy-import lists catch structural regressions exactly.
+SCENARIOS = {
+    "version": (
+        ["version"],
+        100.0,
+        ["rich", "yaml", "providers.local_provider", "providers.aws_provider",
+         "providers.azure_provider", "commands.cluster", "commands.tools", "commands.config"],
+        {},
+    ),
+    "cluster list": (
+        ["cluster", "list"],
+        300.0,
+        ["rich.table", "rich.logging", "asyncio", "providers.aws_provider", "providers.azure_provider",
+         "commands.tools", "commands.config"],
+        {},
+    ),
+    # Completion is answered from the index before typer is imported
+    "complete cluster": (
+        [],
+        50.0,
+        ["typer", "click", "rich", "yaml", "asyncio", "providers.base_provider", "utils.command_runner"],
+        {"_CLI.PY_COMPLETE": "complete_bash", "COMP_WORDS": "cli.py cluster info ", "COMP_CWORD": "3"},
+    ),
+    "complete tool": (
+        [],
+        50.0,
+        ["typer", "click", "rich", "yaml", "asyncio", "core.tool_manager", "utils.command_runner"],
+        {"_CLI.PY_COMPLETE": "complete_bash", "COMP_WORDS": "cli.py tools install ", "COMP_CWORD": "3"},
+    ),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """
+    Parse ``-X importtime`` output.
+    
+    Args:
+        stderr: Captured stderr of the interpreter
+    
+    Returns:
+        Tuple of (total import time in ms, attempted module imports)
+    """
+    total_us = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append(name.strip())
+        # Only top-level entries; nested ones are already in their parent's total
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+# Runs the CLI as __main__ and records which modules ended up loaded
+_MODULE_PROBE = """
+import atexit, json, os, runpy, sys
+atexit.register(lambda: open(os.environ["STARTUP_MODULES_FILE"], "w").write(
+    json.dumps([name for name, module in sys.modules.items() if module is not None])))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def measure(argv: List[str], workdir: Path, env: Dict[str, str]) -> float:
+    """Run the CLI once with ``-X importtime`` and return its import time in ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(CLI)] + argv,
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return parse_importtime(result.stderr)[0]
+
+
+def loaded_modules(argv: List[str], workdir: Path, env: Dict[str, str]) -> List[str]:
+    """Run the CLI once and return the modules loaded by the time it exits."""
+    modules_file = workdir / "modules.json"
+    subprocess.run(
+        [sys.executable, "-c", _MODULE_PROBE, str(CLI)] + argv,
+        cwd=workdir,
+        env=dict(env, STARTUP_MODULES_FILE=str(modules_file)),
+        capture_output=True,
+        check=False,
+    )
+    return json.loads(modules_file.read_text())
+
+
+def prepare_workdir(root: Path) -> Dict[str, str]:
+    """
+    Create a working directory with a default config and a no-op k3d.
+    
+    Returns:
+        Environment for the measured runs
+    """
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    k3d = bin_dir / "k3d"
+    k3d.write_text("#!/bin/sh\nexit 0\n")
+    k3d.chmod(0o755)
+    
+    subprocess.run(
+        [sys.executable, str(CLI), "config", "init", "--output", str(root / "config.yaml")],
+        capture_output=True,
+        check=True,
+    )
+    
+    env = dict(os.environ)
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+    env["XDG_CACHE_HOME"] = str(root / "cache")
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def run(runs: int = 5, scale: float = 1.0) -> Dict[str, Dict]:
+    """
+    Measure every scenario.
+    
+    Args:
+        runs: Interpreter launches per scenario (best run counts)
+        scale: Multiplier applied to every budget, for slower machines
+    
+    Returns:
+        Dictionary of scenario names and results
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        env = prepare_workdir(root)
+        
+        for name, (argv, budget, forbidden, extra_env) in SCENARIOS.items():
+            scenario_env = dict(env, **extra_env)
+            best = min(measure(argv, root, scenario_env) for _ in range(runs))
+            imported = set(loaded_modules(argv, root, scenario_env))
+            leaked = sorted(module for module in forbidden if module in imported)
+            results[name] = {
+                "import_ms": round(best, 2),
+                "budget_ms": budget * scale,
+                "leaked_modules": leaked,
+                "ok": best <= budget * scale and not leaked,
+            }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (best counts)")
+    parser.add_argument("--scale", type=float, default=float(os.environ.get("STARTUP_BUDGET_SCALE", 1.0)),
+                        help="Budget multiplier for slower machines")
+    args = parser.parse_args()
+    
+    results = run(args.runs, args.scale)
+    for name, result in results.items():
+        status = "ok" if result["ok"] else "FAIL"
+        print(f"{status:4}  {name:15} {result['import_ms']:8.1f} ms  (budget {result['budget_ms']:.0f} ms)")
+        if result["leaked_modules"]:
+            print(f"      eagerly imported: {', '.join(result['leaked_modules'])}")
+    
+    return 0 if all(result["ok"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
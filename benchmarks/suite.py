@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+End-to-end CLI latency suite against scripted fake k3d/kubectl/helm/argocd.
+
+Puts benchmarks/fakes first on PATH, seeds the fake k3d with 1, 100 and
+1,000 clusters and times whole CLI invocations in fresh interpreters:
+cold start, ``cluster list``/``info``/``delete``, ``tools list`` (cached and
+``--refresh``) and ConfigHandler.load at several sizes. Results are written
+as JSON; with ``--baseline`` every metric is compared against an earlier
+results file and the run fails (exit code 1) on a regression.
+
+Usage:
+    python benchmarks/suite.py [--counts 1,100,1000] [--repeat 5] [--latency-ms 0]
+                               [--json out.json] [--baseline old.json] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "cli.py"
+FAKES = Path(__file__).resolve().parent / "fakes"
+
+sys.path.insert(0, str(REPO_ROOT))
+
+import config_load  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+from fakes.fake_tool import cluster_name  # noqa: E402
+
+# Regressions smaller than this are treated as noise whatever the ratio
+MIN_REGRESSION_MS = 5.0
+
+
+def prepare_env(root: Path, latency_ms: float) -> Dict[str, str]:
+    """
+    Create a working directory with a default config and the fakes on PATH.
+    
+    Returns:
+        Environment for the measured runs
+    """
+    subprocess.run(
+        [sys.executable, str(CLI), "config", "init", "--output", str(root / "config.yaml")],
+        cwd=root,
+        capture_output=True,
+        check=True,
+    )
+    env = dict(os.environ)
+    env["PATH"] = f"{FAKES}{os.pathsep}{env.get('PATH', '')}"
+    env["XDG_CACHE_HOME"] = str(root / "cache")
+    env["FAKE_STATE_DIR"] = str(root / "state")
+    env["FAKE_LATENCY_MS"] = str(latency_ms)
+    env["TOOLS_CLI_RETRIES"] = "0"
+    for name in ("PYTHONPROFILEIMPORTTIME", "TOOLS_CLI_STATS_FILE", "TOOLS_CLI_DEADLINE"):
+        env.pop(name, None)
+    return env
+
+
+def seed(env: Dict[str, str], clusters: int):
+    """Reset the fake k3d state to ``clusters`` seeded clusters."""
+    shutil.rmtree(env["FAKE_STATE_DIR"], ignore_errors=True)
+    env["FAKE_CLUSTERS"] = str(clusters)
+
+
+def time_cli(argv: List[str], root: Path, env: Dict[str, str], repeat: int, reset: Optional[int] = None) -> Dict:
+    """
+    Time a CLI invocation in fresh interpreters.
+    
+    Args:
+        argv: CLI arguments
+        root: Working directory
+        env: Environment for the runs
+        repeat: Number of runs
+        reset: Re-seed the fake k3d with this many clusters before every run
+            (for commands that change state)
+    
+    Returns:
+        Dictionary with median and min wall-clock time in ms
+    
+    Raises:
+        RuntimeError: If the command fails
+    """
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            seed(env, reset)
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, str(CLI)] + argv, cwd=root, env=env, capture_output=True, text=True, check=False
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"'{' '.join(argv)}' failed ({result.returncode}): {result.stderr or result.stdout}")
+    return {"median_ms": round(statistics.median(timings), 2), "min_ms": round(min(timings), 2)}
+
+
+def run(counts: List[int], repeat: int = 5, latency_ms: float = 0.0, config_sizes: Optional[List[str]] = None) -> Dict:
+    """
+    Run the suite.
+    
+    Args:
+        counts: Cluster counts for the cluster scenarios
+        repeat: Runs per scenario (median is compared)
+        latency_ms: Delay added to every fake tool invocation
+        config_sizes: Config sizes for the ConfigHandler.load scenario
+    
+    Returns:
+        Dictionary of metric names and timings
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        env = prepare_env(root, latency_ms)
+        
+        seed(env, 0)
+        results["cold_start.version"] = time_cli(["version"], root, env, repeat)
+        
+        for count in counts:
+            seed(env, count)
+            target = cluster_name(0)
+            results[f"cluster_list.{count}"] = time_cli(["cluster", "list"], root, env, repeat)
+            results[f"cluster_list_ndjson.{count}"] = time_cli(["-o", "ndjson", "cluster", "list"], root, env, repeat)
+            results[f"cluster_info.{count}"] = time_cli(["cluster", "info", target], root, env, repeat)
+            results[f"cluster_delete.{count}"] = time_cli(["cluster", "delete", target], root, env, repeat, reset=count)
+        
+        results["tools_list.refresh"] = time_cli(["tools", "list", "--refresh"], root, env, repeat)
+        results["tools_list.cached"] = time_cli(["tools", "list"], root, env, repeat)
+    
+    for label, timings in config_load.run(config_sizes or ["10KB", "1MB"], repeat, baseline=False).items():
+        results[f"config_load.{label}.no_cache"] = {"median_ms": timings["no_cache_ms"], "min_ms": timings["no_cache_ms"]}
+        results[f"config_load.{label}.warm"] = {"median_ms": timings["warm_cache_ms"], "min_ms": timings["warm_cache_ms"]}
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline run.
+    
+    Args:
+        results: Metrics of this run
+        baseline: Metrics of the baseline run
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+    
+    Returns:
+        Descriptions of the regressed metrics
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        before, after = previous["median_ms"], current["median_ms"]
+        if after > before * (1 + tolerance) and after - before > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: {before:.1f} ms -> {after:.1f} ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", default="1,100,1000", help="Comma-separated cluster counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (median counts)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every fake tool call")
+    parser.add_argument("--config-sizes", default="10KB,1MB", help="Comma-separated config sizes")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    args = parser.parse_args()
+    
+    counts = [int(count) for count in args.counts.split(",")]
+    results = run(counts, args.repeat, args.latency_ms, args.config_sizes.split(","))
+    
+    print(f"{'metric':32} {'median':>10} {'min':>10}  (ms)")
+    for name, timings in results.items():
+        print(f"{name:32} {timings['median_ms']:>10.2f} {timings['min_ms']:>10.2f}")
+    
+    if args.json_path:
+        document = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "latency_ms": args.latency_ms,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.json_path, "w") as f:
+            json.dump(document, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION  {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
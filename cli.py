@@ -1,26 +1,161 @@
 #!/usr/bin/env python3
 """
-Python Tools CLI - A comprehensive command-line tool for managing 
+Python Tools CLI - A comprehensive command-line tool for managing
 Kubernetes clusters, infrastructure, and GitOps workflows.
 """
 
-import typer
-from commands.cluster import cluster_app
-from commands.tools import tools_app
-from commands.config import config_app
+import importlib
+import os
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+# Shell completion requests come in through _<PROG>_COMPLETE with no arguments
+_completing = any(name.startswith("_") and name.endswith("_COMPLETE") for name in os.environ)
+
+# Cluster and tool names are completed straight from the completion index,
+# before typer is imported; other requests fall through to typer
+if __name__ == "__main__" and _completing:
+    from utils.completion import fast_complete
+    _completions = fast_complete(os.path.basename(sys.argv[0]))
+    if _completions is not None:
+        print(_completions)
+        sys.exit(0)
+
+# Hand the command to a resident `serve` process when one is running; this
+# skips every import below. Falls through to in-process execution otherwise.
+if __name__ == "__main__":
+    from utils.daemon_client import forward
+    _exit_code = forward(sys.argv[1:])
+    if _exit_code is not None:
+        sys.exit(_exit_code)
+
+# typer pulls in rich (~100 ms) only to pretty-print help and tracebacks.
+# Unless help or completion setup is requested, import it with rich hidden so
+# it falls back to plain click output; our own modules import rich lazily.
+_RICH_HELP_ARGS = {"--help", "--install-completion", "--show-completion"}
+_hide_rich = (
+    "rich" not in sys.modules
+    and (len(sys.argv) > 1 or _completing)
+    and not _RICH_HELP_ARGS.intersection(sys.argv[1:])
+)
+if _hide_rich:
+    sys.modules["rich"] = None
+try:
+    import typer
+    from typer.core import TyperGroup
+finally:
+    if _hide_rich:
+        del sys.modules["rich"]
+
+from typing import Optional
+
+from utils import profiler
+
+# Import timings collected before options are parsed: (name, start, duration)
+_IMPORT_SPANS = [("import typer", _STARTED, time.perf_counter() - _STARTED)]
+
+DEFAULT_PROFILE_PATH = "tools-cli-profile.json"
+
+
+class LazyGroup(TyperGroup):
+    """Click group that imports command groups only when they are invoked."""
+    
+    # name -> (module, Typer attribute)
+    LAZY_COMMANDS = {
+        "cluster": ("commands.cluster", "cluster_app"),
+        "tools": ("commands.tools", "tools_app"),
+        "config": ("commands.config", "config_app"),
+    }
+    
+    # Options whose value may be omitted: "--profile" or "--profile=PATH".
+    # A bare option is rewritten to carry its default value, so the
+    # following command name is never taken as the path.
+    OPTIONAL_VALUES = {"--profile": DEFAULT_PROFILE_PATH}
+    
+    def parse_args(self, ctx, args):
+        args = [
+            f"{arg}={self.OPTIONAL_VALUES[arg]}" if arg in self.OPTIONAL_VALUES else arg
+            for arg in args
+        ]
+        return super().parse_args(ctx, args)
+    
+    def list_commands(self, ctx):
+        return list(self.LAZY_COMMANDS) + super().list_commands(ctx)
+    
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.LAZY_COMMANDS and cmd_name not in self.commands:
+            module_name, attribute = self.LAZY_COMMANDS[cmd_name]
+            started = time.perf_counter()
+            typer_app = getattr(importlib.import_module(module_name), attribute)
+            _IMPORT_SPANS.append((f"import {module_name}", started, time.perf_counter() - started))
+            command = typer.main.get_group(typer_app)
+            command.name = cmd_name
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
+
 
 # Create main CLI application
 app = typer.Typer(
     name="tools-cli",
+    cls=LazyGroup,
     help="A comprehensive CLI tool for Kubernetes and infrastructure management",
     add_completion=True,
     # context_settings=
 )
 
-# Register command groups
-app.add_typer(cluster_app, name="cluster")
-app.add_typer(tools_app, name="tools")
-app.add_typer(config_app, name="config")
+
+@app.callback()
+def main(
+    profile: Optional[str] = typer.Option(
+        None,
+        "--profile",
+        metavar="[=PATH]",
+        help=f"Write a Chrome trace of this run (open in Perfetto), by default to {DEFAULT_PROFILE_PATH}",
+    ),
+    output: str = typer.Option(
+        "table",
+        "--output",
+        "-o",
+        metavar="[table|json|yaml|ndjson]",
+        help="Output format of list and info commands; ndjson streams one row per line",
+    ),
+):
+    """A comprehensive CLI tool for Kubernetes and infrastructure management."""
+    # Table output is the default; only other formats pay for the imports
+    if output.lower() != "table":
+        from utils.logger import set_log_format
+        from utils.output import set_output_format
+        
+        try:
+            set_output_format(output)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="'--output'")
+        # Keep machine-readable stdout clean: messages go to stderr as JSON lines
+        set_log_format("json")
+    if profile:
+        profiler.enable(profile, origin=_STARTED)
+        for name, started, duration in _IMPORT_SPANS:
+            profiler.record(name, started, duration, "import")
+
+
+@app.command()
+def serve(
+    socket_path: Optional[str] = typer.Option(None, "--socket", help="Unix socket path (default: $TOOLS_CLI_SOCKET or the runtime dir)"),
+    idle_timeout: float = typer.Option(0, help="Exit after this many seconds without requests (0: never)"),
+):
+    """Keep a warm process that runs CLI commands sent from other invocations."""
+    from core.daemon import DaemonServer
+    from utils.exceptions import ToolsCLIException
+    from utils.logger import log_error
+    from utils.paths import socket_path as default_socket_path
+    
+    try:
+        DaemonServer(app, socket_path or default_socket_path(), idle_timeout or None).serve_forever()
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -1,21 +1,67 @@
 """Cluster management commands."""
 
+import os
 import typer
-from typing import Optional
-from rich.table import Table
+from typing import Dict, List, Optional, Tuple
 from core.cluster_manager import ClusterManager
 from core.config_handler import ConfigHandler
-from utils.logger import console, log_error
-from utils.exceptions import ToolsCLIException
+from utils.completion import complete_cluster_name
+from utils.logger import console, log_error, log_info, log_success, log_warning
+from utils.output import Column, RowWriter, output_format, write_object
+from utils.exceptions import ConfigurationError, ToolsCLIException
 
 cluster_app = typer.Typer(help="Cluster lifecycle management commands")
 
 
-def get_cluster_manager() -> ClusterManager:
-    """Get configured cluster manager instance."""
-    config_handler = ConfigHandler()
+# (config path, content hash) -> manager; lets a resident `serve` process
+# reuse constructed providers across commands while the config is unchanged
+_managers: Dict[Tuple[str, Optional[str]], ClusterManager] = {}
+
+
+def get_cluster_manager(config_handler: Optional[ConfigHandler] = None) -> ClusterManager:
+    """
+    Get configured cluster manager instance.
+    
+    Args:
+        config_handler: Handler of the config to use (default: config.yaml)
+    
+    Returns:
+        ClusterManager, shared between calls for the same config content
+    
+    Raises:
+        ConfigurationError: If the config cannot be loaded or fails validation
+    """
+    config_handler = config_handler or ConfigHandler()
     config = config_handler.load()
-    return ClusterManager(config)
+    key = (os.path.abspath(config_handler.config_path), config_handler.content_hash)
+    if key not in _managers:
+        # Fail on config mistakes before any slow provider work
+        config_handler.require_valid()
+        _managers.clear()
+        _managers[key] = ClusterManager(config)
+    return _managers[key]
+
+
+def parse_labels(labels: Optional[List[str]]) -> Dict[str, str]:
+    """
+    Parse key=value label arguments.
+    
+    Raises:
+        ConfigurationError: If a label has no "="
+    """
+    parsed = {}
+    for label in labels or []:
+        key, separator, value = label.partition("=")
+        if not separator or not key:
+            raise ConfigurationError(f"Invalid label '{label}' (expected key=value)")
+        parsed[key] = value
+    return parsed
+
+
+def reset_cached_state():
+    """Drop provider state cached by shared managers (between daemon requests)."""
+    for manager in _managers.values():
+        manager.reset_provider_caches()
 
 
 @cluster_app.command()
@@ -24,12 +70,30 @@ def create(
     provider: Optional[str] = typer.Option(None, help="Cloud provider (local, aws, azure) - reads from config if not provided"),
     ports: Optional[str] = typer.Option(None, help="Ports to open (comma-separated) - reads from config if not provided"),
     registry: Optional[bool] = typer.Option(None, help="Create local registry - reads from config if not provided"),
+    label: Optional[List[str]] = typer.Option(None, help="Inventory label as key=value (repeatable)"),
+    from_pool: bool = typer.Option(False, "--from-pool", help="Claim a standby local cluster from the warm pool (poolConfig); it keeps its pool name and NAME becomes its 'claim' label"),
 ):
     """Create a new cluster. Uses config.yaml values when CLI arguments are not provided."""
     try:
-        config_handler = ConfigHandler()
-        config = config_handler.load()
-        cluster_config = config.get("clusterConfig", {})
+        manager = get_cluster_manager()
+        cluster_config = manager.config.get("clusterConfig", {})
+        labels = parse_labels(label)
+        
+        if from_pool:
+            if ports or registry is not None or (provider and manager.canonical_provider(provider) != "local"):
+                raise ConfigurationError(
+                    "--from-pool hands out local clusters built to poolConfig; "
+                    "it cannot be combined with --provider, --ports or --registry"
+                )
+            claimed = manager.claim_cluster(name, labels=labels)
+            if claimed:
+                log_success(f"Claimed pooled cluster '{claimed}' (kubectl context k3d-{claimed})")
+                if name and name != claimed:
+                    log_info(f"k3d cannot rename clusters: use '{claimed}'; '{name}' is recorded as its claim label")
+                if output_format() != "table":
+                    write_object({"name": claimed, "provider": "local", "context": f"k3d-{claimed}", "claim": name})
+                return
+            log_warning("No standby cluster is ready, creating one")
         
         # Use CLI arguments or fall back to config values
         cluster_name = name or cluster_config.get("name", "my-cluster")
@@ -37,15 +101,12 @@ def create(
         cluster_ports = ports or cluster_config.get("portsToOpen")
         cluster_registry = registry if registry is not None else cluster_config.get("useLocalRegistry", False)
         
-        manager = ClusterManager(config)
-        
-        kwargs = {}
-        if cluster_ports:
-            kwargs["ports_to_open"] = cluster_ports
-        if cluster_registry:
-            kwargs["use_registry"] = cluster_registry
+        kwargs = ClusterManager.create_kwargs({
+            "portsToOpen": cluster_ports,
+            "useLocalRegistry": cluster_registry,
+        })
         
-        manager.create_cluster(cluster_name, cluster_provider, **kwargs)
+        manager.create_cluster(cluster_name, cluster_provider, labels=labels, **kwargs)
         
     except ToolsCLIException as e:
         log_error(str(e))
@@ -54,20 +115,20 @@ def create(
 
 @cluster_app.command()
 def delete(
-    name: Optional[str] = typer.Argument(None, help="Cluster name (optional, reads from config if not provided)"),
+    name: Optional[str] = typer.Argument(
+        None, help="Cluster name (optional, reads from config if not provided)", autocompletion=complete_cluster_name
+    ),
     provider: Optional[str] = typer.Option(None, help="Cloud provider (local, aws, azure) - reads from config if not provided"),
 ):
     """Delete an existing cluster."""
     try:
-        config_handler = ConfigHandler()
-        config = config_handler.load()
-        cluster_config = config.get("clusterConfig", {})
+        manager = get_cluster_manager()
+        cluster_config = manager.config.get("clusterConfig", {})
 
         # Use CLI arguments or fall back to config values
         cluster_name = name or cluster_config.get("name", "my-cluster")
         cluster_provider = provider or cluster_config.get("type", "local")
-
-        manager = ClusterManager(config)
+        
         manager.delete_cluster(cluster_name, cluster_provider)
         
     except ToolsCLIException as e:
@@ -77,25 +138,36 @@ def delete(
 
 @cluster_app.command()
 def list(
-    provider: str = typer.Option("local", help="Cloud provider"),
+    provider: str = typer.Option("local", help="Cloud provider, or 'all' to query every provider"),
+    timeout: float = typer.Option(10.0, help="Per-provider timeout in seconds (with --provider all)"),
 ):
     """List all clusters."""
     try:
         manager = get_cluster_manager()
-        clusters = manager.list_clusters(provider)
-        
-        if not clusters:
-            console.print(f"No clusters found for provider: {provider}")
-            return
+        failures = {}
+        columns = [Column("name", "Name", "cyan"), Column("provider", "Provider", "magenta")]
         
-        table = Table(title=f"Clusters ({provider})")
-        table.add_column("Name", style="cyan")
-        table.add_column("Provider", style="magenta")
+        with RowWriter(columns, title=f"Clusters ({provider})") as writer:
+            if provider.lower() == "all":
+                def write_result(result):
+                    # Rows of each provider are written as soon as it answers
+                    if result["ok"]:
+                        for cluster in result["result"]:
+                            writer.write({"name": cluster, "provider": result["type"]})
+                    else:
+                        failures[result["type"]] = result["error"]
+                        log_warning(f"Could not list {result['type']} clusters: {result['error']}")
         
-        for cluster in clusters:
-            table.add_row(cluster, provider)
+                results = manager.list_all_clusters(timeout=timeout, on_result=write_result)
+            else:
+                for cluster in manager.list_clusters(provider):
+                    writer.write({"name": cluster, "provider": provider})
         
-        console.print(table)
+        if not writer.count:
+            if output_format() == "table":
+                console.print(f"No clusters found for provider: {provider}")
+            if failures and len(failures) == len(results):
+                raise typer.Exit(code=1)
         
     except ToolsCLIException as e:
         log_error(str(e))
@@ -104,7 +176,7 @@ def list(
 
 @cluster_app.command()
 def info(
-    name: str = typer.Argument(..., help="Cluster name"),
+    name: str = typer.Argument(..., help="Cluster name", autocompletion=complete_cluster_name),
     provider: str = typer.Option("local", help="Cloud provider"),
 ):
     """Get cluster information."""
@@ -116,30 +188,259 @@ def info(
             log_error(f"Cluster '{name}' not found")
             raise typer.Exit(code=1)
         
-        table = Table(title=f"Cluster Info: {name}")
-        table.add_column("Property", style="cyan")
-        table.add_column("Value", style="green")
+        write_object(cluster_info, title=f"Cluster Info: {name}")
         
-        for key, value in cluster_info.items():
-            table.add_row(key, str(value))
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@cluster_app.command()
+def query(
+    provider: Optional[str] = typer.Option(None, help="Provider to query (default: every provider in the inventory)"),
+    status: Optional[str] = typer.Option(None, help="Only clusters with this status"),
+    older_than: Optional[str] = typer.Option(None, help="Only clusters older than this, e.g. 2h, 30m, 1d"),
+    label: Optional[List[str]] = typer.Option(None, help="Only clusters with this key=value label (repeatable)"),
+    max_age: str = typer.Option("5m", help="Re-list providers whose inventory is older than this"),
+    offline: bool = typer.Option(False, help="Answer from the inventory without contacting providers"),
+):
+    """Query clusters from the local inventory."""
+    from core.inventory import parse_duration
+    
+    try:
+        manager = get_cluster_manager()
+        clusters = manager.query_clusters(
+            provider,
+            max_age=None if offline else parse_duration(max_age),
+            status=status,
+            older_than=parse_duration(older_than) if older_than else None,
+            labels=parse_labels(label),
+        )
         
-        console.print(table)
+        if not clusters and output_format() == "table":
+            console.print("No matching clusters in the inventory")
+            return
         
+        columns = [
+            Column("name", "Name", "cyan"),
+            Column("provider", "Provider", "magenta"),
+            Column("status", "Status", "green"),
+            Column("age", "Age", justify="right", format=format_age),
+            Column("labels", "Labels", format=lambda labels: ", ".join(f"{key}={value}" for key, value in labels.items())),
+        ]
+        with RowWriter(columns, title=f"Clusters ({len(clusters)})") as writer:
+            for cluster in clusters:
+                writer.write(cluster)
+    
     except ToolsCLIException as e:
         log_error(str(e))
         raise typer.Exit(code=1)
 
 
+def format_age(seconds: float) -> str:
+    """Format an age like kubectl does (45s, 12m, 3h, 2d)."""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+
 @cluster_app.command()
 def bootstrap(
-    name: str = typer.Argument(..., help="Cluster name"),
+    names: List[str] = typer.Argument(..., help="Cluster names", autocompletion=complete_cluster_name),
     provider: str = typer.Option("local", help="Cloud provider"),
+    parallel: int = typer.Option(4, help="Maximum clusters bootstrapped concurrently"),
+):
+    """Bootstrap clusters with GitOps tools (Flux CD)."""
+    try:
+        manager = get_cluster_manager()
+        if len(names) == 1:
+            manager.bootstrap_cluster(names[0], provider)
+            return
+        
+        results = manager.run_operations(
+            [{"action": "bootstrap", "type": provider, "name": name} for name in names],
+            concurrency=parallel,
+        )
+        failures = [result for result in results if not result["ok"]]
+        for result in failures:
+            log_error(f"Failed to bootstrap {result['name']}: {result['error']}")
+        
+        if failures:
+            raise typer.Exit(code=1)
+        log_success(f"Bootstrapped {len(results)} cluster(s)")
+    
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@cluster_app.command()
+def preload(
+    names: List[str] = typer.Argument(..., help="Cluster names", autocompletion=complete_cluster_name),
+    image: Optional[List[str]] = typer.Option(None, help="Image tarball to import (repeatable) - reads preloadConfig.images if not provided"),
+    provider: str = typer.Option("local", help="Cloud provider"),
+    parallel: Optional[int] = typer.Option(None, help="Imports in flight per cluster - reads preloadConfig.maxParallel if not provided"),
+):
+    """Import image tarballs into clusters so workloads start without pulls."""
+    try:
+        manager = get_cluster_manager()
+        images = image or None
+        if len(names) == 1:
+            manager.preload_images(names[0], provider, images, parallel)
+            return
+        
+        results = manager.run_operations(
+            [
+                {"action": "preload", "type": provider, "name": name, "kwargs": {"images": images, "parallel": parallel}}
+                for name in names
+            ],
+            concurrency=4,
+        )
+        failures = [result for result in results if not result["ok"]]
+        for result in failures:
+            log_error(f"Failed to preload {result['name']}: {result['error']}")
+        
+        if failures:
+            raise typer.Exit(code=1)
+        log_success(f"Preloaded images into {len(results)} cluster(s)")
+        
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@cluster_app.command()
+def apply(
+    file: str = typer.Option("config.yaml", "--file", "-f", help="Fleet file with a 'clusters' list"),
+    parallel: int = typer.Option(4, help="Maximum concurrent create/delete operations"),
+    prune: bool = typer.Option(False, help="Delete clusters of the listed providers that are not in the fleet file"),
+    dry_run: bool = typer.Option(False, help="Show the plan without executing it"),
+):
+    """Reconcile clusters against a declarative fleet file."""
+    from core.fleet import FleetReconciler
+    
+    try:
+        fleet = ConfigHandler(file).require_valid()
+        manager = ClusterManager(fleet)
+        reconciler = FleetReconciler(manager, parallelism=parallel)
+        
+        plan = reconciler.plan(reconciler.desired_clusters(fleet), prune=prune)
+        
+        for spec in plan["delete"]:
+            console.print(f"  - delete {spec['name']} ({spec['type']})", style="red")
+        for spec in plan["create"]:
+            console.print(f"  + create {spec['name']} ({spec['type']})", style="green")
+        console.print(
+            f"Plan: {len(plan['create'])} to create, {len(plan['delete'])} to delete, "
+            f"{len(plan['unchanged'])} unchanged"
+        )
+        
+        if not plan["create"] and not plan["delete"]:
+            log_success("Fleet is up to date")
+            return
+        if dry_run:
+            log_info("Dry run: no changes made")
+            return
+        
+        results = reconciler.apply(plan)
+        failures = [result for result in results if not result["ok"]]
+        for result in failures:
+            log_error(f"Failed to {result['action']} {result['name']}: {result['error']}")
+        
+        if failures:
+            raise typer.Exit(code=1)
+        log_success(f"Fleet applied: {len(results)} operation(s) succeeded")
+        
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+pool_app = typer.Typer(help="Warm pool of standby local clusters (poolConfig)")
+cluster_app.add_typer(pool_app, name="pool")
+
+
+@pool_app.command("status")
+def pool_status():
+    """Show the clusters of the warm pool."""
+    try:
+        clusters = get_cluster_manager().pool.status()
+        
+        if not clusters and output_format() == "table":
+            console.print("The pool is empty")
+            return
+        
+        columns = [
+            Column("name", "Name", "cyan"),
+            Column("state", "State", "green"),
+            Column("age", "Age", justify="right", format=format_age),
+            Column("claimed_as", "Claimed as", format=lambda claimed_as: claimed_as or "-"),
+            Column("current", "Spec", format=lambda current: "current" if current else "outdated"),
+        ]
+        with RowWriter(columns, title=f"Cluster pool ({len(clusters)})") as writer:
+            for cluster in clusters:
+                writer.write(cluster)
+    
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@pool_app.command("fill")
+def pool_fill(
+    background: bool = typer.Option(False, "--background", help="Fill in a detached process and return immediately"),
 ):
-    """Bootstrap cluster with GitOps tools (Flux CD)."""
+    """Recycle stale standby clusters and create missing ones."""
+    try:
+        pool = get_cluster_manager().pool
+        if background:
+            pool.refill_in_background()
+            log_info("Pool fill started in the background")
+            return
+        
+        counts = pool.fill()
+        log_success(
+            f"Pool has {pool.size} standby cluster(s) configured: "
+            f"{counts['created']} created, {counts['recycled']} recycled"
+        )
+        if counts["failed"]:
+            log_error(f"{counts['failed']} standby cluster(s) could not be created")
+            raise typer.Exit(code=1)
+    
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@pool_app.command("release")
+def pool_release(
+    names: List[str] = typer.Argument(..., help="Claimed pool clusters", autocompletion=complete_cluster_name),
+):
+    """Delete claimed pool clusters once they are no longer needed."""
     try:
         manager = get_cluster_manager()
-        manager.bootstrap_cluster(name, provider)
+        unknown = [name for name in names if not manager.pool.release(name)]
+        for name in unknown:
+            log_error(f"Cluster '{name}' is not part of the pool")
+        manager.pool.refill_in_background()
         
+        if unknown:
+            raise typer.Exit(code=1)
+        log_success(f"Released {len(names)} cluster(s)")
+    
+    except ToolsCLIException as e:
+        log_error(str(e))
+        raise typer.Exit(code=1)
+
+
+@pool_app.command("drain")
+def pool_drain():
+    """Delete every standby cluster; claimed clusters are kept."""
+    try:
+        deleted = get_cluster_manager().pool.drain()
+        log_success(f"Deleted {deleted} standby cluster(s)")
+    
     except ToolsCLIException as e:
         log_error(str(e))
         raise typer.Exit(code=1)
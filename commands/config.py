@@ -2,8 +2,8 @@
 
 import typer
 from pathlib import Path
-from core.config_handler import ConfigHandler
-from utils.logger import log_success, log_error, log_info, console
+from core.config_handler import ConfigHandler, format_problems
+from utils.logger import log_success, log_error, log_info, log_warning, console
 from utils.exceptions import ConfigurationError
 
 config_app = typer.Typer(help="Configuration file management")
@@ -52,10 +52,18 @@ def show(
 def validate(
     config_path: str = typer.Option("config.yaml", help="Config file path"),
 ):
-    """Validate configuration file."""
+    """Validate configuration file against the config schema."""
     try:
         handler = ConfigHandler(config_path)
-        handler.load()
+        problems = handler.validate()
+        errors = [problem for problem in problems if not problem.get("warning")]
+        if errors:
+            log_error(f"Configuration is invalid: {len(errors)} problem(s) in {config_path}")
+            console.print(format_problems(problems), markup=False, highlight=False)
+            raise typer.Exit(code=1)
+        if problems:
+            log_warning(f"{len(problems)} warning(s) in {config_path}")
+            console.print(format_problems(problems), markup=False, highlight=False)
         log_success("Configuration is valid")
         
     except ConfigurationError as e:
@@ -1,59 +1,94 @@
 """Tool installation and management commands."""
 
 import typer
-from typing import List
-from rich.table import Table
+from pathlib import Path
+from typing import List, Optional
+from core.config_handler import ConfigHandler
 from core.tool_manager import ToolManager
+from utils.completion import complete_tool_name
+from utils.exceptions import ConfigurationError
 from utils.logger import console, log_success, log_error
+from utils.output import Column, RowWriter
 
 tools_app = typer.Typer(help="Development tool installation and management")
 
 
 @tools_app.command()
-def list():
+def list(
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached detection results"),
+):
     """List all supported tools."""
-    manager = ToolManager()
+    manager = ToolManager(refresh=refresh)
     tools = manager.list_tools()
+    probes = manager.probe_tools(tools.keys())
     
-    table = Table(title="Supported Tools")
-    table.add_column("Tool", style="cyan")
-    table.add_column("Description", style="green")
-    table.add_column("Installed", style="magenta")
-    
-    for tool_name, tool_info in tools.items():
-        installed = "✓" if manager.check_tool_installed(tool_name) else "✗"
-        table.add_row(tool_name, tool_info["description"], installed)
-    
-    console.print(table)
+    columns = [
+        Column("tool", "Tool", "cyan"),
+        Column("description", "Description", "green"),
+        Column("installed", "Installed", "magenta", format=lambda installed: "✓" if installed else "✗"),
+        Column("version", "Version", "yellow", format=lambda version: version or "-"),
+    ]
+    with RowWriter(columns, title="Supported Tools") as writer:
+        for tool_name, tool_info in tools.items():
+            probe = probes[tool_name]
+            writer.write({
+                "tool": tool_name,
+                "description": tool_info["description"],
+                "installed": probe["installed"],
+                "version": probe["version"],
+            })
 
 
 @tools_app.command()
 def install(
-    tool_names: List[str] = typer.Argument(..., help="Tool name(s) to install"),
+    tool_names: List[str] = typer.Argument(..., help="Tool name(s) to install", autocompletion=complete_tool_name),
+    mirror: Optional[str] = typer.Option(None, help="Download mirror URL (http(s):// or file://) - reads from config if not provided"),
+    install_dir: Optional[str] = typer.Option(None, help="Directory to install binaries into - reads from config if not provided"),
+    force: bool = typer.Option(False, help="Reinstall tools that are already present"),
+    config_path: str = typer.Option("config.yaml", help="Config file path"),
 ):
     """Install one or more tools."""
-    manager = ToolManager()
+    config = {}
+    if Path(config_path).exists():
+        try:
+            config = ConfigHandler(config_path).load()
+        except ConfigurationError as e:
+            log_error(str(e))
+            raise typer.Exit(code=1)
+    
+    tools_config = dict(config.get("toolsConfig") or {})
+    if mirror:
+        tools_config["mirrorUrl"] = mirror
+    if install_dir:
+        tools_config["installDir"] = install_dir
+    manager = ToolManager(config={"toolsConfig": tools_config})
     
     console.print(f"Installing tools: {', '.join(tool_names)}")
     
-    results = manager.install_multiple_tools(tool_names)
+    results = manager.install_multiple_tools(tool_names, force=force)
     
     for tool_name, success in results.items():
         if success:
             log_success(f"{tool_name} installed successfully")
         else:
             log_error(f"Failed to install {tool_name}")
+    
+    if not all(results.values()):
+        raise typer.Exit(code=1)
 
 
 @tools_app.command()
 def check(
-    tool_name: str = typer.Argument(..., help="Tool name to check"),
+    tool_name: str = typer.Argument(..., help="Tool name to check", autocompletion=complete_tool_name),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached detection results"),
 ):
     """Check if a tool is installed."""
-    manager = ToolManager()
+    manager = ToolManager(refresh=refresh)
+    probe = manager.probe_tool(tool_name)
     
-    if manager.check_tool_installed(tool_name):
-        log_success(f"{tool_name} is installed")
+    if probe["installed"]:
+        version = f" (version {probe['version']})" if probe["version"] else ""
+        log_success(f"{tool_name} is installed at {probe['path']}{version}")
     else:
-        log_error(f"{tool_name} is not installed")
+        log_error(f"{tool_name} is not installed: {probe['error']}")
         raise typer.Exit(code=1)
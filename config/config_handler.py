@@ -1,12 +1,10 @@
-import yaml
+from core.config_handler import ConfigHandler
+from utils.exceptions import ConfigurationError
 
 def load_config(file_path: str) -> dict:
+    """Load a config file through ConfigHandler, returning {} on errors."""
     try:
-        with open(file_path, 'r') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        print("Config file not found.")
-        return {}
-    except yaml.YAMLError as e:
-        print(f"Error parsing YAML: {e}")
+        return ConfigHandler(file_path).load() or {}
+    except ConfigurationError as e:
+        print(e)
         return {}
@@ -0,0 +1,122 @@
+"""Content-addressed store for downloaded tool binaries."""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from utils.download import sha256_file
+from utils.paths import cache_dir
+
+
+class ArtifactStore:
+    """
+    Stores binaries by SHA-256 and remembers which artifact satisfies a
+    (tool, version, platform) key, so repeat installs need no network.
+    
+    Each key also records the SHA-256 of the verified download the blob
+    came from, which differs from the blob's own digest when the binary
+    was extracted from an archive.
+    """
+    
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize artifact store.
+        
+        Args:
+            root: Store directory (default: <cache dir>/store)
+        """
+        self.root = Path(root) if root else cache_dir("store")
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+    
+    def blob_path(self, digest: str) -> Path:
+        """Get the path of a blob by its SHA-256 digest."""
+        return self.root / "sha256" / digest[:2] / digest
+    
+    def _read_index(self) -> Dict[str, Any]:
+        """Read the key to {"sha256", "source"} index."""
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def lookup(self, key: str, source_sha256: Optional[str] = None) -> Optional[Path]:
+        """
+        Find the stored blob for a key.
+        
+        Args:
+            key: Artifact key, e.g. "kubectl/v1.29.2/linux-amd64"
+            source_sha256: Required digest of the download the blob came from
+        
+        Returns:
+            Blob path, or None if the key is unknown, the blob is gone or it
+            came from a different download than ``source_sha256``
+        """
+        entry = self._read_index().get(key)
+        if not isinstance(entry, dict) or "sha256" not in entry:
+            return None
+        if source_sha256 is not None and entry.get("source", "").lower() != source_sha256.lower():
+            return None
+        path = self.blob_path(entry["sha256"])
+        return path if path.exists() else None
+    
+    def add(self, key: str, source: Path, source_sha256: str) -> Path:
+        """
+        Move a file into the store and index it under a key.
+        
+        Args:
+            key: Artifact key
+            source: File to move into the store (consumed)
+            source_sha256: Verified digest of the download the file came from
+        
+        Returns:
+            Blob path
+        """
+        digest = sha256_file(source)
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if blob.exists():
+            os.unlink(source)
+        else:
+            os.replace(source, blob)
+        os.chmod(blob, 0o755)
+        
+        import fcntl
+        
+        # The thread lock orders this process's installs; the file lock
+        # keeps concurrent CLI processes from losing each other's entries
+        with self._lock, open(self.root / "index.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            index = self._read_index()
+            index[key] = {"sha256": digest, "source": source_sha256}
+            tmp_path = self.index_path.with_name(f"index.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        return blob
+    
+    @staticmethod
+    def materialize(blob: Path, destination: Path):
+        """
+        Place a stored blob at its install location.
+        
+        A hardlink is used when the store and destination share a
+        filesystem, otherwise the blob is copied.
+        
+        Args:
+            blob: Stored blob path
+            destination: Install path (replaced atomically)
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+        if tmp_path.exists():
+            os.unlink(tmp_path)
+        try:
+            os.link(blob, tmp_path)
+        except OSError:
+            shutil.copy2(blob, tmp_path)
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, destination)
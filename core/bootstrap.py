@@ -0,0 +1,286 @@
+"""Flux CD bootstrap: cached manifest rendering and staged server-side apply."""
+
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from utils.command_runner import CommandResult, get_runner
+from utils.exceptions import ClusterOperationError, ToolsCLIException
+from utils.logger import setup_logger, log_info
+from utils.paths import cache_dir
+
+logger = setup_logger(__name__)
+
+DEFAULT_FLUX_VERSION = "2.2.3"
+DEFAULT_MANIFEST_URL = "https://github.com/fluxcd/flux2/releases/download/v{version}/install.yaml"
+
+# Apply order. Objects of a stage only depend on earlier stages, so each
+# stage is sent as a single server-side apply.
+STAGES = ("crds", "namespaces", "cluster", "config", "workloads", "resources")
+
+# Kind -> stage; kinds not listed here land in "workloads", kinds defined by
+# a CRD of the same bundle in "resources"
+STAGE_KINDS = {
+    "CustomResourceDefinition": "crds",
+    "Namespace": "namespaces",
+    "ClusterRole": "cluster",
+    "ClusterRoleBinding": "cluster",
+    "PriorityClass": "cluster",
+    "StorageClass": "cluster",
+    "MutatingWebhookConfiguration": "cluster",
+    "ValidatingWebhookConfiguration": "cluster",
+    "ServiceAccount": "config",
+    "Role": "config",
+    "RoleBinding": "config",
+    "ConfigMap": "config",
+    "Secret": "config",
+    "ResourceQuota": "config",
+    "LimitRange": "config",
+    "NetworkPolicy": "config",
+}
+
+# Seconds before kubectl calls are considered hung
+APPLY_TIMEOUT = 120.0
+DEFAULT_WAIT_TIMEOUT = 300.0
+
+FIELD_MANAGER = "tools-cli"
+
+
+def stage_for(document: Dict[str, Any], custom_kinds: set) -> str:
+    """
+    Get the apply stage of a manifest object.
+    
+    Args:
+        document: Parsed Kubernetes object
+        custom_kinds: Kinds defined by CRDs in the same bundle
+    
+    Returns:
+        Stage name from STAGES
+    """
+    kind = document.get("kind", "")
+    if kind in custom_kinds:
+        return "resources"
+    return STAGE_KINDS.get(kind, "workloads")
+
+
+def render_stages(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a multi-document manifest into apply stages.
+    
+    Args:
+        text: Multi-document YAML
+    
+    Returns:
+        Dictionary of stage names and their objects, in STAGES order,
+        without empty stages
+    
+    Raises:
+        ClusterOperationError: If the manifest is not valid YAML
+    """
+    import yaml
+    
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        documents = [doc for doc in yaml.load_all(text, Loader=loader) if isinstance(doc, dict) and doc.get("kind")]
+    except yaml.YAMLError as e:
+        raise ClusterOperationError(f"Invalid Flux manifest: {e}")
+    
+    custom_kinds = {
+        ((doc.get("spec") or {}).get("names") or {}).get("kind")
+        for doc in documents if doc["kind"] == "CustomResourceDefinition"
+    }
+    stages: Dict[str, List[Dict[str, Any]]] = {stage: [] for stage in STAGES}
+    for document in documents:
+        stages[stage_for(document, custom_kinds)].append(document)
+    return {stage: objects for stage, objects in stages.items() if objects}
+
+
+class FluxBootstrap:
+    """
+    Installs Flux CD components into clusters.
+    
+    The component manifest of a Flux version is fetched and split into
+    stages once, then kept under ``<cache>/manifests/flux/<version>``.
+    Bootstrapping a cluster is one ``kubectl apply --server-side`` per
+    stage (CRDs first, waiting until they are established), so the number
+    of kubectl calls does not grow with the number of objects, and clusters
+    can be bootstrapped concurrently.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, templates=None):
+        """
+        Initialize bootstrap pipeline.
+        
+        Args:
+            config: Configuration dictionary with an optional fluxConfig
+                section (version, manifestUrl, contextTemplate, wait, waitTimeout)
+            templates: Cluster templates whose rendered ``manifests/``
+                directory is applied after Flux (default: from templateConfig)
+        """
+        settings = (config or {}).get("fluxConfig") or {}
+        self.version = str(settings.get("version") or DEFAULT_FLUX_VERSION).lstrip("v")
+        self.manifest_url = (settings.get("manifestUrl") or DEFAULT_MANIFEST_URL).format(version=self.version)
+        self.context_template = settings.get("contextTemplate") or "k3d-{name}"
+        self.wait = settings.get("wait", True)
+        self.wait_timeout = float(settings.get("waitTimeout", DEFAULT_WAIT_TIMEOUT))
+        self.cache_path = cache_dir("manifests", "flux", self.version)
+        self._stages: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        if templates is None:
+            from core.templates import Templates
+            templates = Templates(config)
+        self.templates = templates
+    
+    def _load_rendered(self) -> Optional[List[Dict[str, Any]]]:
+        """Read the rendered stage index if it matches the manifest URL."""
+        try:
+            index = json.loads((self.cache_path / "stages.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if index.get("url") != self.manifest_url:
+            return None
+        stages = index.get("stages") or []
+        if not all((self.cache_path / stage["file"]).exists() for stage in stages):
+            return None
+        return stages
+    
+    def _render(self) -> List[Dict[str, Any]]:
+        """Fetch the manifest and write one file per stage to the cache."""
+        import yaml
+        from utils.download import fetch_text
+        
+        log_info(f"Fetching Flux {self.version} manifests from {self.manifest_url}")
+        try:
+            text = fetch_text(self.manifest_url)
+        except ToolsCLIException as e:
+            raise ClusterOperationError(str(e))
+        
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        stages = []
+        for position, (stage, objects) in enumerate(render_stages(text).items()):
+            filename = f"{position:02d}-{stage}.yaml"
+            self._write(filename, yaml.dump_all(objects, Dumper=dumper, sort_keys=False))
+            stages.append({
+                "stage": stage,
+                "file": filename,
+                "objects": len(objects),
+                # Namespaces whose deployments must become available
+                "namespaces": sorted({
+                    obj.get("metadata", {}).get("namespace", "default")
+                    for obj in objects if obj["kind"] == "Deployment"
+                }),
+            })
+        if not stages:
+            raise ClusterOperationError(f"No Kubernetes objects in {self.manifest_url}")
+        
+        self._write("stages.json", json.dumps({"url": self.manifest_url, "stages": stages}, indent=2))
+        return stages
+    
+    def _write(self, filename: str, content: str):
+        """Atomically write a file into the version cache."""
+        path = self.cache_path / filename
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(content)
+        os.replace(tmp_path, path)
+    
+    def prepare(self) -> List[Dict[str, Any]]:
+        """
+        Get the rendered stages, fetching and rendering them on first use.
+        
+        Returns:
+            Stage entries with stage, file, objects and namespaces
+        
+        Raises:
+            ClusterOperationError: If the manifest cannot be fetched or parsed
+        """
+        with self._lock:
+            if self._stages is None:
+                self._stages = self._load_rendered() or self._render()
+            return self._stages
+    
+    def commands(self, name: str) -> List[Tuple[str, List[str]]]:
+        """
+        Build the kubectl commands that bootstrap one cluster, in order.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            Tuples of step description and kubectl command
+        """
+        context = ["kubectl", "--context", self.context_template.format(name=name)]
+        commands = []
+        for stage in self.prepare():
+            path = str(self.cache_path / stage["file"])
+            commands.append((
+                f"apply {stage['stage']}",
+                context + ["apply", "--server-side", "--force-conflicts", f"--field-manager={FIELD_MANAGER}", "-f", path],
+            ))
+            if stage["stage"] == "crds":
+                # Custom resources can only be applied once their CRDs are served
+                commands.append((
+                    "wait for CRDs",
+                    context + ["wait", "--for=condition=established", f"--timeout={self.wait_timeout:g}s", "-f", path],
+                ))
+            elif self.wait:
+                for namespace in stage["namespaces"]:
+                    commands.append((
+                        f"wait for deployments in {namespace}",
+                        context + [
+                            "wait", "--for=condition=available", f"--timeout={self.wait_timeout:g}s",
+                            "-n", namespace, "deployment", "--all",
+                        ],
+                    ))
+        
+        rendered = self.templates.render(name)
+        if rendered is not None and (rendered / "manifests").is_dir():
+            commands.append((
+                "apply template",
+                context + [
+                    "apply", "--server-side", "--force-conflicts", f"--field-manager={FIELD_MANAGER}",
+                    "--recursive", "-f", str(rendered / "manifests"),
+                ],
+            ))
+        return commands
+    
+    def _timeout_for(self, command: List[str]) -> float:
+        """Give waits their own timeout plus slack for kubectl itself."""
+        return self.wait_timeout + 30.0 if "wait" in command else APPLY_TIMEOUT
+    
+    @staticmethod
+    def _check(name: str, step: str, result: CommandResult):
+        """Raise if a bootstrap step failed."""
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).strip()
+            raise ClusterOperationError(f"Bootstrap of '{name}' failed at '{step}': {output}")
+    
+    def bootstrap(self, name: str) -> bool:
+        """
+        Install Flux into a cluster.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If a step fails
+        """
+        runner = get_runner()
+        for step, command in self.commands(name):
+            logger.debug("%s: %s", name, " ".join(command))
+            self._check(name, step, runner.run(command, timeout=self._timeout_for(command)))
+        return True
+    
+    async def abootstrap(self, name: str) -> bool:
+        """Install Flux into a cluster without blocking the event loop."""
+        import asyncio
+        
+        # Manifest preparation and template rendering touch the disk
+        commands = await asyncio.to_thread(self.commands, name)
+        runner = get_runner()
+        for step, command in commands:
+            logger.debug("%s: %s", name, " ".join(command))
+            self._check(name, step, await runner.arun(command, timeout=self._timeout_for(command)))
+        return True
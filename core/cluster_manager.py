@@ -1,16 +1,26 @@
 """Cluster management orchestration."""
 
-from typing import Dict, Any, Optional
+import importlib
+from typing import Callable, Dict, Any, List, Optional, Type
 from providers.base_provider import BaseProvider
-from providers.local_provider import LocalProvider
-from providers.aws_provider import AWSProvider
-from providers.azure_provider import AzureProvider
-from utils.exceptions import ProviderNotSupportedError, ClusterOperationError
-from utils.logger import setup_logger
+from utils.exceptions import ProviderNotSupportedError, ClusterOperationError, ToolsCLIException
+from utils import completion, profiler
+from utils.logger import queued_logging, setup_logger
 
 logger = setup_logger(__name__)
 
 
+# Operation name -> provider coroutine method used by gather_operations
+ASYNC_OPERATIONS = {
+    "create": "acreate_cluster",
+    "delete": "adelete_cluster",
+    "list": "alist_clusters",
+    "info": "aget_cluster_info",
+    "bootstrap": "abootstrap_cluster",
+    "preload": "apreload_images",
+}
+
+
 class ClusterManager:
     """
     Manages cluster lifecycle operations across different providers.
@@ -18,15 +28,21 @@ class ClusterManager:
     This class follows the Strategy Pattern and Dependency Inversion Principle.
     """
     
+    # Provider classes are referenced by import path and only imported
+    # when first used, so commands never pay for providers they don't touch.
     PROVIDER_MAP = {
-        "local": LocalProvider,
-        "k3d": LocalProvider,
-        "aws": AWSProvider,
-        "eks": AWSProvider,
-        "azure": AzureProvider,
-        "aks": AzureProvider,
+        "local": "providers.local_provider.LocalProvider",
+        "k3d": "providers.local_provider.LocalProvider",
+        "aws": "providers.aws_provider.AWSProvider",
+        "eks": "providers.aws_provider.AWSProvider",
+        "azure": "providers.azure_provider.AzureProvider",
+        "aks": "providers.azure_provider.AzureProvider",
     }
     
+    # Providers that benchmarks add to a manager's PROVIDER_MAP (see
+    # benchmarks/orchestration.py); never part of a "--provider all" fan-out
+    HIDDEN_PROVIDERS = {"simulated"}
+    
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize cluster manager.
@@ -36,16 +52,67 @@ class ClusterManager:
         """
         self.config = config
         self._providers: Dict[str, BaseProvider] = {}
+        self._inventory = None
+        self._pool = None
     
-    def _get_provider(self, provider_type: str) -> BaseProvider:
+    @property
+    def inventory(self):
+        """SQLite cluster inventory, opened on first use."""
+        if self._inventory is None:
+            from core.inventory import Inventory
+            self._inventory = Inventory()
+        return self._inventory
+    
+    @property
+    def pool(self):
+        """Warm pool of standby local clusters, opened on first use."""
+        if self._pool is None:
+            from core.pool import ClusterPool
+            self._pool = ClusterPool(self)
+        return self._pool
+    
+    def _record(self, update: str, provider_type: str, *args, **kwargs):
         """
-        Get or create a provider instance.
+        Apply the result of a provider call to the inventory.
+        
+        Inventory problems are logged and never fail the operation itself.
+        
+        Args:
+            update: Inventory method (record_list, record_info, ...)
+            provider_type: Provider type as given by the caller
+            *args: Further arguments for the inventory method
+            **kwargs: Keyword arguments for the inventory method
+        """
+        try:
+            getattr(self.inventory, update)(self.canonical_provider(provider_type), *args, **kwargs)
+        except Exception as e:
+            logger.debug(f"Inventory update failed: {e}")
+    
+    @staticmethod
+    def _load_provider_class(import_path: str) -> Type[BaseProvider]:
+        """
+        Import a provider class from its dotted import path.
+        
+        Args:
+            import_path: Module path and class name, e.g. "providers.aws_provider.AWSProvider"
+            
+        Returns:
+            Provider class
+        """
+        module_name, class_name = import_path.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    
+    def provider_key(self, provider_type: str) -> str:
+        """
+        Get the key identifying the provider class behind a provider type.
+        
+        Aliases such as "local" and "k3d" map to the same key.
         
         Args:
             provider_type: Type of provider (local, aws, azure)
             
         Returns:
-            Provider instance
+            Provider class import path
             
         Raises:
             ProviderNotSupportedError: If provider type is not supported
@@ -58,17 +125,99 @@ class ClusterManager:
                 f"Available providers: {', '.join(self.PROVIDER_MAP.keys())}"
             )
         
-        # Lazy initialization of providers
-        if provider_type not in self._providers:
-            provider_class = self.PROVIDER_MAP[provider_type]
-            self._providers[provider_type] = provider_class(self.config)
+        return self.PROVIDER_MAP[provider_type]
+    
+    def provider_names(self) -> List[str]:
+        """
+        Get one canonical name per distinct provider class.
+        
+        The first alias listed in PROVIDER_MAP is used, e.g. "local" rather
+        than "k3d". HIDDEN_PROVIDERS are left out.
         
-        return self._providers[provider_type]
+        Returns:
+            Provider names
+        """
+        names: Dict[str, str] = {}
+        for provider_type, import_path in self.PROVIDER_MAP.items():
+            if provider_type not in self.HIDDEN_PROVIDERS:
+                names.setdefault(import_path, provider_type)
+        return list(names.values())
+    
+    def canonical_provider(self, provider_type: str) -> str:
+        """
+        Get the canonical name of a provider type (e.g. "local" for "k3d").
+        
+        Raises:
+            ProviderNotSupportedError: If provider type is not supported
+        """
+        import_path = self.provider_key(provider_type)
+        return next(name for name, path in self.PROVIDER_MAP.items() if path == import_path)
+    
+    @staticmethod
+    def create_kwargs(cluster_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate ``clusterConfig``-style keys into create_cluster kwargs.
+        
+        Args:
+            cluster_config: Cluster settings (portsToOpen, useLocalRegistry)
+            
+        Returns:
+            Keyword arguments for create_cluster
+        """
+        kwargs = {}
+        if cluster_config.get("portsToOpen"):
+            kwargs["ports_to_open"] = str(cluster_config["portsToOpen"])
+        if cluster_config.get("useLocalRegistry"):
+            kwargs["use_registry"] = True
+        return kwargs
+    
+    def _get_provider(self, provider_type: str) -> BaseProvider:
+        """
+        Get or create a provider instance.
+        
+        Args:
+            provider_type: Type of provider (local, aws, azure)
+            
+        Returns:
+            Provider instance
+            
+        Raises:
+            ProviderNotSupportedError: If provider type is not supported
+        """
+        # Lazy initialization of providers; aliases of the same class share
+        # one instance so its cached state is reused within a process
+        import_path = self.provider_key(provider_type)
+        if import_path not in self._providers:
+            with profiler.span("ClusterManager._get_provider", "provider", provider=provider_type):
+                provider_class = self._load_provider_class(import_path)
+                self._providers[import_path] = provider_class(self.config)
+        
+        return self._providers[import_path]
+    
+    def on_config_change(self, config: Dict[str, Any]):
+        """
+        Switch to a new configuration (a ConfigWatcher subscriber).
+        
+        Providers were built from the old configuration, so they are
+        dropped and rebuilt on next use.
+        
+        Args:
+            config: New configuration dictionary
+        """
+        self.config = config
+        self._providers.clear()
+        self._pool = None
+    
+    def reset_provider_caches(self):
+        """Make constructed providers forget cached cluster state."""
+        for provider in self._providers.values():
+            provider.reset_cache()
     
     def create_cluster(
         self,
         name: str,
         provider_type: str = "local",
+        labels: Optional[Dict[str, str]] = None,
         **kwargs
     ) -> bool:
         """
@@ -77,23 +226,59 @@ class ClusterManager:
         Args:
             name: Cluster name
             provider_type: Cloud provider type
+            labels: Labels recorded for the cluster in the inventory
             **kwargs: Additional provider-specific parameters
             
         Returns:
             True if successful
         """
         provider = self._get_provider(provider_type)
-        return provider.create_cluster(name, **kwargs)
+        created = provider.create_cluster(name, **kwargs)
+        if created:
+            completion.update_index(provider_type, add=[name])
+            self._record("record_create", provider_type, name, labels)
+        return created
+    
+    def claim_cluster(self, name: Optional[str] = None, labels: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Take a standby local cluster from the warm pool.
+        
+        A refill is started in the background whether or not a cluster was
+        ready.
+        
+        Args:
+            name: Name the caller asked for, recorded as the "claim" label
+            labels: Labels recorded for the cluster in the inventory
+        
+        Returns:
+            Name of the claimed cluster, or None if none was ready
+        """
+        from core.pool import POOL_PROVIDER
+        
+        claimed = self.pool.claim(name)
+        if claimed:
+            labels = dict(labels or {}, pool="claimed", **({"claim": name} if name else {}))
+            completion.update_index(POOL_PROVIDER, add=[claimed])
+            self._record("record_create", POOL_PROVIDER, claimed, labels)
+        self.pool.refill_in_background()
+        return claimed
     
     def delete_cluster(self, name: str, provider_type: str = "local") -> bool:
         """Delete a cluster."""
         provider = self._get_provider(provider_type)
-        return provider.delete_cluster(name)
+        deleted = provider.delete_cluster(name)
+        if deleted:
+            completion.update_index(provider_type, remove=[name])
+            self._record("record_delete", provider_type, name)
+        return deleted
     
     def list_clusters(self, provider_type: str = "local") -> list:
-        """List clusters for a provider."""
+        """List clusters for a provider (and refresh the completion index and inventory)."""
         provider = self._get_provider(provider_type)
-        return provider.list_clusters()
+        clusters = provider.list_clusters()
+        completion.update_index(provider_type, clusters)
+        self._record("record_list", provider_type, clusters)
+        return clusters
     
     def get_cluster_info(
         self,
@@ -102,9 +287,250 @@ class ClusterManager:
     ) -> Dict[str, Any]:
         """Get cluster information."""
         provider = self._get_provider(provider_type)
-        return provider.get_cluster_info(name)
+        info = provider.get_cluster_info(name)
+        self._record("record_info", provider_type, name, info)
+        return info
     
     def bootstrap_cluster(self, name: str, provider_type: str = "local") -> bool:
         """Bootstrap cluster with GitOps tools."""
         provider = self._get_provider(provider_type)
         return provider.bootstrap_cluster(name)
+    
+    def preload_images(
+        self,
+        name: str,
+        provider_type: str = "local",
+        images: Optional[List[str]] = None,
+        parallel: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """Import image tarballs into a cluster's nodes."""
+        provider = self._get_provider(provider_type)
+        return provider.preload_images(name, images, parallel)
+    
+    async def arun_operation(self, operation: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one operation through the provider's async interface.
+        
+        Args:
+            operation: Dictionary with action, type, and (except for "list")
+                name, plus optional kwargs for "create" and "preload"
+            
+        Returns:
+            The operation dictionary extended with ok, result and error;
+            exceptions (not just ToolsCLIException) become failed results
+        """
+        outcome = dict(operation, ok=False, result=None, error=None)
+        action = operation["action"]
+        if action not in ASYNC_OPERATIONS:
+            outcome["error"] = f"Unknown operation '{action}'"
+            return outcome
+        
+        try:
+            provider = self._get_provider(operation.get("type", "local"))
+            method = getattr(provider, ASYNC_OPERATIONS[action])
+            provider_type = operation.get("type", "local")
+            if action == "list":
+                outcome["result"] = await method()
+                completion.update_index(provider_type, outcome["result"])
+                self._record("record_list", provider_type, outcome["result"])
+            elif action == "create":
+                outcome["result"] = await method(operation["name"], **operation.get("kwargs", {}))
+                if outcome["result"]:
+                    self._record("record_create", provider_type, operation["name"], operation.get("labels"))
+            elif action == "preload":
+                outcome["result"] = await method(operation["name"], **operation.get("kwargs", {}))
+            else:
+                outcome["result"] = await method(operation["name"])
+                if action == "delete" and outcome["result"]:
+                    self._record("record_delete", provider_type, operation["name"])
+                elif action == "info":
+                    self._record("record_info", provider_type, operation["name"], outcome["result"])
+            outcome["ok"] = True
+        except ToolsCLIException as e:
+            outcome["error"] = str(e)
+        except Exception as e:
+            # One broken operation must not abort the rest of a fan-out
+            logger.debug("%s %s failed unexpectedly", action, operation.get("name", ""), exc_info=True)
+            outcome["error"] = f"{type(e).__name__}: {e}"
+        return outcome
+    
+    async def gather_operations(
+        self,
+        operations: List[Dict[str, Any]],
+        concurrency: int = 8,
+        fail_fast: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run many operations across providers with bounded concurrency.
+        
+        Operations that are still waiting or running are cancelled when the
+        caller is cancelled, or on the first failure when ``fail_fast`` is
+        set; cancelled operations report the error "cancelled".
+        
+        Args:
+            operations: Operations as accepted by :meth:`arun_operation`
+            concurrency: Maximum operations in flight
+            fail_fast: Cancel outstanding operations after the first failure
+            
+        Returns:
+            Operation results in the order given
+        """
+        import asyncio
+        
+        # asyncio.wait rejects an empty set of tasks
+        if not operations:
+            return []
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def bounded(operation):
+            async with semaphore:
+                return await self.arun_operation(operation)
+        
+        # Operations log from worker threads; the listener does the writing
+        with queued_logging():
+            tasks = [asyncio.ensure_future(bounded(operation)) for operation in operations]
+            try:
+                if fail_fast:
+                    for next_done in asyncio.as_completed(tasks):
+                        if not (await next_done)["ok"]:
+                            break
+                else:
+                    await asyncio.wait(tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = []
+        for operation, task in zip(operations, tasks):
+            if task.cancelled():
+                results.append(dict(operation, ok=False, result=None, error="cancelled"))
+            else:
+                results.append(task.result())
+        return results
+    
+    def run_operations(
+        self,
+        operations: List[Dict[str, Any]],
+        concurrency: int = 8,
+        fail_fast: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Blocking wrapper around :meth:`gather_operations` for typer commands.
+        
+        Args:
+            operations: Operations as accepted by :meth:`arun_operation`
+            concurrency: Maximum operations in flight
+            fail_fast: Cancel outstanding operations after the first failure
+            
+        Returns:
+            Operation results in the order given
+        """
+        import asyncio
+        
+        if not operations:
+            return []
+        return asyncio.run(self.gather_operations(operations, concurrency, fail_fast))
+    
+    async def alist_all_clusters(
+        self,
+        timeout: float = 10.0,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        List clusters of every distinct provider concurrently.
+        
+        Each provider gets its own timeout, so a slow or failing provider
+        only affects its own entry.
+        
+        Args:
+            timeout: Seconds to wait for each provider
+            on_result: Called with each provider's result as soon as it is
+                available, e.g. to stream output
+            
+        Returns:
+            Dictionary of provider names and "list" operation results
+        """
+        import asyncio
+        
+        async def list_one(provider_type: str) -> Dict[str, Any]:
+            operation = {"action": "list", "type": provider_type}
+            try:
+                result = await asyncio.wait_for(self.arun_operation(operation), timeout)
+            except asyncio.TimeoutError:
+                result = dict(operation, ok=False, result=None, error=f"timed out after {timeout:g}s")
+            if on_result is not None:
+                on_result(result)
+            return result
+        
+        results = await asyncio.gather(*(list_one(name) for name in self.provider_names()))
+        return {result["type"]: result for result in results}
+    
+    def query_clusters(
+        self,
+        provider_type: Optional[str] = None,
+        max_age: Optional[float] = None,
+        status: Optional[str] = None,
+        older_than: Optional[float] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query clusters from the inventory.
+        
+        Providers whose last full listing is older than ``max_age`` are
+        re-listed (and their clusters' info fetched) first; otherwise no
+        provider is contacted.
+        
+        Args:
+            provider_type: Provider to query (default: every provider in the inventory)
+            max_age: Freshness bound in seconds (default: answer from the index as is)
+            status: Required cluster status
+            older_than: Minimum cluster age in seconds
+            labels: Labels that must all match
+        
+        Returns:
+            Cluster dictionaries as returned by Inventory.query
+        """
+        import time
+        
+        if provider_type:
+            providers = [self.canonical_provider(provider_type)]
+        else:
+            providers = self.inventory.providers() or [self.canonical_provider("local")]
+        
+        if max_age is not None:
+            stale = [
+                provider for provider in providers
+                if time.time() - (self.inventory.listed_at(provider) or 0.0) > max_age
+            ]
+            if stale:
+                self.refresh_inventory(stale)
+        
+        return self.inventory.query(providers, status=status, older_than=older_than, labels=labels)
+    
+    def refresh_inventory(self, providers: List[str], concurrency: int = 8):
+        """
+        Re-list providers and fetch info for each of their clusters.
+        
+        Args:
+            providers: Provider names
+            concurrency: Maximum provider calls in flight
+        """
+        listings = self.run_operations([{"action": "list", "type": provider} for provider in providers], concurrency)
+        self.run_operations(
+            [
+                {"action": "info", "type": listing["type"], "name": name}
+                for listing in listings if listing["ok"]
+                for name in listing["result"]
+            ],
+            concurrency,
+        )
+    
+    def list_all_clusters(
+        self,
+        timeout: float = 10.0,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Blocking wrapper around :meth:`alist_all_clusters`."""
+        import asyncio
+        return asyncio.run(self.alist_all_clusters(timeout, on_result))
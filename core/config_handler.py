@@ -1,31 +1,153 @@
 """Configuration file handling."""
 
-import yaml
+import hashlib
+import os
+import pickle
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from utils.exceptions import ConfigurationError
-from utils.logger import setup_logger
+from utils import profiler
+from utils.logger import setup_logger, log_warning
+from utils.paths import cache_dir
 
 logger = setup_logger(__name__)
 
+# Files modified this recently are not trusted on mtime/size alone, since a
+# second write within the same timestamp tick would go unnoticed.
+RACY_MTIME_WINDOW_NS = 2 * 1_000_000_000
+
+
+def parse_yaml(data: bytes) -> Any:
+    """
+    Parse YAML with the libyaml-backed CSafeLoader when available.
+    
+    Args:
+        data: Raw YAML document
+    
+    Returns:
+        Parsed document
+    
+    Raises:
+        ConfigurationError: If the document is not valid YAML
+    """
+    import yaml
+    
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return yaml.load(data, Loader=loader)
+    except yaml.YAMLError as e:
+        raise ConfigurationError(f"Invalid YAML in config file: {e}")
+
+
+def format_problems(problems: List[Dict[str, Any]]) -> str:
+    """Render validation problems one per line, with line numbers."""
+    return "\n".join(
+        f"  {'line ' + str(problem['line']) if problem['line'] else 'file'}: {problem['path']}: "
+        f"{'warning: ' if problem.get('warning') else ''}{problem['message']}"
+        for problem in problems
+    )
+
 
 class ConfigHandler:
     """Handles loading and managing configuration files."""
     
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, use_cache: bool = True):
         """
         Initialize config handler.
         
         Args:
             config_path: Path to configuration file
+            use_cache: Reuse the serialized parse cache for unchanged files
         """
         self.config_path = config_path or "config.yaml"
+        self.use_cache = use_cache
+        self.content_hash: Optional[str] = None
         self._config: Optional[Dict[str, Any]] = None
+        self._index: Optional[Dict[str, Any]] = None
+    
+    def _cache_path(self, path: Path) -> Path:
+        """Get the parse cache file for a config path."""
+        key = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:32]
+        return cache_dir("config") / f"{key}.pickle"
+    
+    @staticmethod
+    def _read_cache_entry(cache_path: Path) -> Optional[Dict[str, Any]]:
+        """Read a parse cache entry, treating any damage as a miss."""
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _write_cache_entry(cache_path: Path, entry: Dict[str, Any]):
+        """Write a parse cache entry atomically."""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write config cache {cache_path}: {e}")
+    
+    def _load_cached(self, path: Path) -> Any:
+        """
+        Load a config file through the parse cache.
+        
+        Entries are keyed on the resolved path and validated by mtime and
+        size; when those differ, the content hash decides whether the cached
+        parse can still be used before falling back to a full parse. If the
+        cache directory cannot be created, the file is parsed uncached.
+        """
+        stat = path.stat()
+        try:
+            cache_path = self._cache_path(path)
+        except OSError as e:
+            logger.debug("Config cache unavailable, parsing uncached: %s", e)
+            return self._load_uncached(path)
+        entry = self._read_cache_entry(cache_path)
+        
+        if (
+            entry is not None
+            and entry.get("trusted")
+            and entry.get("mtime") == stat.st_mtime_ns
+            and entry.get("size") == stat.st_size
+        ):
+            self.content_hash = entry["sha256"]
+            return entry["data"]
+        
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        self.content_hash = digest
+        
+        if entry is not None and entry.get("sha256") == digest:
+            parsed = entry["data"]
+        else:
+            parsed = parse_yaml(data)
+        
+        self._write_cache_entry(cache_path, {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "trusted": time.time_ns() - stat.st_mtime_ns > RACY_MTIME_WINDOW_NS,
+            "data": parsed,
+        })
+        return parsed
+    
+    def _load_uncached(self, path: Path) -> Any:
+        """Read and parse a config file, recording its content hash."""
+        data = path.read_bytes()
+        self.content_hash = hashlib.sha256(data).hexdigest()
+        return parse_yaml(data)
     
     def load(self) -> Dict[str, Any]:
         """
         Load configuration from YAML file.
         
+        Unchanged files are served from the parse cache; otherwise the file
+        is parsed with libyaml when available.
+        
         Returns:
             Configuration dictionary
             
@@ -37,21 +159,116 @@ class ConfigHandler:
             if not path.exists():
                 raise ConfigurationError(f"Configuration file not found: {self.config_path}")
             
-            with open(path, 'r') as f:
-                self._config = yaml.safe_load(f)
+            previous_hash, previous_config = self.content_hash, self._config
+            with profiler.span("ConfigHandler.load", "config", path=str(path), cached=self.use_cache):
+                if self.use_cache:
+                    self._config = self._load_cached(path)
+                else:
+                    self._config = self._load_uncached(path)
             
-            logger.info(f"Configuration loaded from {self.config_path}")
+            if previous_config is not None and self.content_hash == previous_hash:
+                # Unchanged content: keep the config object and its key index
+                self._config = previous_config
+            else:
+                self._index = None
+            
+            logger.debug("Configuration loaded from %s", self.config_path)
             return self._config
         
-        except yaml.YAMLError as e:
-            raise ConfigurationError(f"Invalid YAML in config file: {e}")
+        except ConfigurationError:
+            raise
         except Exception as e:
             raise ConfigurationError(f"Error loading configuration: {e}")
     
+    def validate(self) -> List[Dict[str, Any]]:
+        """
+        Validate the configuration against the config schema.
+        
+        Verdicts are cached by content hash, so an unchanged file is only
+        validated once.
+        
+        Returns:
+            Every problem found, as dictionaries with path, line, message and
+            warning (empty if the configuration is clean)
+        
+        Raises:
+            ConfigurationError: If the file cannot be loaded
+        """
+        from core import config_schema
+        
+        config = self._config if self._config is not None else self.load()
+        problems = config_schema.cached_verdict(self.content_hash)
+        if problems is None:
+            with profiler.span("ConfigHandler.validate", "config", path=self.config_path):
+                try:
+                    source = Path(self.config_path).read_bytes()
+                except OSError:
+                    source = None
+                problems = config_schema.validate(config, source)
+            config_schema.store_verdict(self.content_hash, problems)
+        return problems
+    
+    def require_valid(self) -> Dict[str, Any]:
+        """
+        Load the configuration and fail on any schema error.
+        
+        Warnings, such as unknown top-level keys, are logged instead.
+        
+        Returns:
+            Configuration dictionary
+        
+        Raises:
+            ConfigurationError: Listing every error found
+        """
+        config = self.load()
+        problems = self.validate()
+        errors = [problem for problem in problems if not problem.get("warning")]
+        if errors:
+            raise ConfigurationError(
+                f"Invalid configuration in {self.config_path}:\n" + format_problems(errors)
+            )
+        if problems:
+            log_warning(f"Configuration warnings in {self.config_path}:\n" + format_problems(problems))
+        return config
+    
+    @staticmethod
+    def build_index(config: Any) -> Dict[str, Any]:
+        """
+        Flatten a configuration into a dotted-key index.
+        
+        Every mapping and list along the way is indexed too, so
+        'clusterConfig', 'clusterConfig.name' and 'clusters.0.name' all
+        resolve with a single dictionary lookup.
+        
+        Args:
+            config: Parsed configuration
+        
+        Returns:
+            Dictionary of dotted keys and values
+        """
+        index: Dict[str, Any] = {}
+        stack = [("", config)]
+        while stack:
+            prefix, node = stack.pop()
+            if isinstance(node, dict):
+                items = node.items()
+            elif isinstance(node, list):
+                items = enumerate(node)
+            else:
+                continue
+            for key, value in items:
+                dotted = f"{prefix}{key}"
+                index[dotted] = value
+                stack.append((f"{dotted}.", value))
+        return index
+    
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get configuration value by key.
         
+        Falsy values such as 0, False and "" are returned as stored; only
+        missing keys and nulls fall back to the default.
+        
         Args:
             key: Configuration key (supports dot notation, e.g., 'clusterConfig.name')
             default: Default value if key not found
@@ -59,21 +276,28 @@ class ConfigHandler:
         Returns:
             Configuration value
         """
-        if self._config is None:
-            self.load()
+        index = self._index
+        if index is None:
+            if self._config is None:
+                self.load()
+            index = self._index = self.build_index(self._config)
         
-        keys = key.split('.')
-        value = self._config
+        value = index.get(key)
+        return default if value is None else value
         
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
-                return default
+    def reload(self) -> bool:
+        """
+        Load the file again if its content changed.
+        
+        Returns:
+            True if the content (by hash) differs from the last load
         
-        return value
+        Raises:
+            ConfigurationError: If config file is invalid or missing
+        """
+        previous = self.content_hash
+        self.load()
+        return self.content_hash != previous
     
     def save(self, config: Dict[str, Any], output_path: Optional[str] = None):
         """
@@ -83,6 +307,8 @@ class ConfigHandler:
             config: Configuration dictionary
             output_path: Output file path (default: self.config_path)
         """
+        import yaml
+        
         path = Path(output_path or self.config_path)
         
         try:
@@ -117,6 +343,24 @@ class ConfigHandler:
                 "useLocalRegistry": True,
                 "portsToOpen": "80,443"
             },
+            "fluxConfig": {
+                "version": "2.2.3",
+                "wait": True
+            },
+            "registryConfig": {
+                "shared": False,
+                "name": "tools-cli-cache",
+                "port": 5000
+            },
+            "preloadConfig": {
+                "images": [],
+                "maxParallel": 4
+            },
+            "poolConfig": {
+                "size": 0,
+                "maxAge": "24h",
+                "recycleAfter": "4h"
+            },
             "tools": ["kubectl", "helm", "k3d"]
         }
         
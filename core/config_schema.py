@@ -0,0 +1,389 @@
+"""Configuration schema and its compiled validator."""
+
+import hashlib
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.paths import cache_dir
+
+# Bump when the validator's checks or messages change; changes to the schema
+# itself (including its enums) already invalidate cached verdicts
+SCHEMA_VERSION = 5
+
+# Problems found in a document: (path, message) or (path, message, True) for
+# warnings; paths are tuples of keys and list indices
+Problems = List[Tuple]
+Check = Callable[[Any, Tuple, Problems], None]
+
+PORTS_PATTERN = r"^\s*\d{1,5}(\s*,\s*\d{1,5})*\s*$"
+# k3d cluster names end up in DNS names and container names
+CLUSTER_NAME_PATTERN = r"^[a-z0-9]([-a-z0-9]{0,30}[a-z0-9])?$"
+# Pool cluster names are <prefix>-<6 hex digits>
+POOL_PREFIX_PATTERN = r"^[a-z0-9]([-a-z0-9]{0,22}[a-z0-9])?$"
+DURATION_PATTERN = r"^\s*\d+(\.\d+)?\s*[smhdw]?\s*$"
+
+
+def build_schema() -> Dict[str, Any]:
+    """
+    Build the config schema.
+    
+    Nodes use a small JSON-Schema-like vocabulary: type (a name or a list of
+    names), properties, required, additionalProperties (bool, node, or
+    "warn" to report unknown keys as warnings), items, enum, ignoreCase,
+    pattern (with a human readable "format"), minimum and maximum.
+    
+    Returns:
+        Schema of a config or fleet file
+    """
+    from core.cluster_manager import ClusterManager
+    from core.registry import PRELOAD_MODES
+    from core.templates import TemplateStore
+    from core.tool_catalog import SUPPORTED_TOOLS
+    
+    string_map = {"type": "object", "additionalProperties": {"type": "string"}}
+    cluster = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "pattern": CLUSTER_NAME_PATTERN,
+                     "format": "lowercase letters, digits and '-', at most 32 characters"},
+            "type": {"type": "string", "enum": sorted(ClusterManager.PROVIDER_MAP), "ignoreCase": True},
+            "groupId": {"type": "integer", "minimum": 0},
+            "useLocalRegistry": {"type": "boolean"},
+            "portsToOpen": {"type": ["string", "integer"], "pattern": PORTS_PATTERN,
+                            "format": "comma-separated port numbers, e.g. 80,443"},
+            "labels": {"type": "object", "additionalProperties": {"type": ["string", "number", "boolean"]}},
+        },
+        "additionalProperties": False,
+    }
+    return {
+        "type": "object",
+        "properties": {
+            "credentials": string_map,
+            "templateConfig": {
+                "type": "object",
+                "properties": {
+                    "templateProvider": {"type": "string", "enum": list(TemplateStore.PROVIDERS)},
+                    "templateTag": {"type": ["string", "number"]},
+                    "templateUrl": {"type": "string"},
+                    "values": {"type": "object"},
+                },
+                "additionalProperties": False,
+            },
+            "clusterConfig": cluster,
+            "clusters": {"type": "array", "items": dict(cluster, required=["name"])},
+            "tools": {"type": "array", "items": {"type": "string", "enum": sorted(SUPPORTED_TOOLS)}},
+            "toolsConfig": {
+                "type": "object",
+                "properties": {
+                    "installDir": {"type": "string"},
+                    "mirrorUrl": {"type": "string"},
+                    "versions": string_map,
+                    "checksums": string_map,
+                    "maxParallel": {"type": "integer", "minimum": 1},
+                },
+                "additionalProperties": False,
+            },
+            "fluxConfig": {
+                "type": "object",
+                "properties": {
+                    "version": {"type": ["string", "number"]},
+                    "manifestUrl": {"type": "string"},
+                    "contextTemplate": {"type": "string"},
+                    "wait": {"type": "boolean"},
+                    "waitTimeout": {"type": "number", "minimum": 0},
+                },
+                "additionalProperties": False,
+            },
+            "registryConfig": {
+                "type": "object",
+                "properties": {
+                    "shared": {"type": "boolean"},
+                    "name": {"type": "string", "pattern": CLUSTER_NAME_PATTERN,
+                             "format": "lowercase letters, digits and '-', at most 32 characters"},
+                    "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+                    "proxyRemoteUrl": {"type": "string"},
+                    "mirrors": {"type": "array", "items": {"type": "string"}},
+                    "volume": {"type": "string"},
+                },
+                "additionalProperties": False,
+            },
+            "preloadConfig": {
+                "type": "object",
+                "properties": {
+                    "images": {"type": "array", "items": {"type": "string"}},
+                    "maxParallel": {"type": "integer", "minimum": 1},
+                    "mode": {"type": "string", "enum": list(PRELOAD_MODES)},
+                    "onCreate": {"type": "boolean"},
+                },
+                "additionalProperties": False,
+            },
+            "poolConfig": {
+                "type": "object",
+                "properties": {
+                    "size": {"type": "integer", "minimum": 0},
+                    "maxAge": {"type": ["string", "number"], "pattern": DURATION_PATTERN,
+                               "format": "a duration such as 30m, 12h or 1d"},
+                    "recycleAfter": {"type": ["string", "number"], "pattern": DURATION_PATTERN,
+                                     "format": "a duration such as 30m, 12h or 1d"},
+                    "prefix": {"type": "string", "pattern": POOL_PREFIX_PATTERN,
+                               "format": "lowercase letters, digits and '-', at most 24 characters"},
+                    "maxParallel": {"type": "integer", "minimum": 1},
+                    "clusterConfig": cluster,
+                },
+                "additionalProperties": False,
+            },
+        },
+        # Configs may carry settings of other tools or newer versions
+        "additionalProperties": "warn",
+    }
+
+
+TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    # bool is a subclass of int, but "yes" is not a number
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+}
+
+TYPE_NAMES = {str: "string", int: "integer", float: "number", bool: "boolean", dict: "mapping", list: "list"}
+
+
+def _describe(value: Any) -> str:
+    return "null" if value is None else TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def compile_schema(node: Dict[str, Any]) -> Check:
+    """
+    Compile a schema node into a checking function.
+    
+    Every keyword is turned into a closure once, so validating a document
+    is a walk over the document only.
+    
+    Args:
+        node: Schema node
+    
+    Returns:
+        Function (value, path, problems) appending every problem found
+    """
+    checks: List[Check] = []
+    
+    types = node.get("type")
+    if types:
+        types = [types] if isinstance(types, str) else list(types)
+        type_checks = [TYPE_CHECKS[name] for name in types]
+        expected = " or ".join("mapping" if t == "object" else "list" if t == "array" else t for t in types)
+        
+        def check_type(value, path, problems):
+            if not any(check(value) for check in type_checks):
+                problems.append((path, f"expected {expected}, got {_describe(value)}"))
+                return False
+            return True
+    else:
+        def check_type(value, path, problems):
+            return True
+    
+    if "enum" in node:
+        ignore_case = node.get("ignoreCase", False)
+        allowed = {str(item).lower() if ignore_case else item for item in node["enum"]}
+        choices = ", ".join(str(item) for item in node["enum"])
+        
+        def check_enum(value, path, problems):
+            key = str(value).lower() if ignore_case else value
+            if key not in allowed:
+                problems.append((path, f"'{value}' is not one of: {choices}"))
+        checks.append(check_enum)
+    
+    if "pattern" in node:
+        pattern = re.compile(node["pattern"])
+        expected_format = node.get("format", f"a value matching {node['pattern']}")
+        
+        def check_pattern(value, path, problems):
+            if not pattern.match(str(value)):
+                problems.append((path, f"'{value}' is not valid: expected {expected_format}"))
+        checks.append(check_pattern)
+    
+    if "minimum" in node or "maximum" in node:
+        minimum, maximum = node.get("minimum"), node.get("maximum")
+        
+        def check_range(value, path, problems):
+            if minimum is not None and value < minimum:
+                problems.append((path, f"{value} is less than {minimum}"))
+            if maximum is not None and value > maximum:
+                problems.append((path, f"{value} is greater than {maximum}"))
+        checks.append(check_range)
+    
+    if "properties" in node or "additionalProperties" in node or "required" in node:
+        properties = {key: compile_schema(child) for key, child in (node.get("properties") or {}).items()}
+        additional = node.get("additionalProperties", True)
+        check_additional = compile_schema(additional) if isinstance(additional, dict) else None
+        required = node.get("required") or []
+        
+        def check_object(value, path, problems):
+            for key in required:
+                if key not in value:
+                    problems.append((path, f"missing required key '{key}'"))
+            for key, item in value.items():
+                if key in properties:
+                    properties[key](item, path + (key,), problems)
+                elif check_additional is not None:
+                    check_additional(item, path + (key,), problems)
+                elif additional is False or additional == "warn":
+                    import difflib
+                    close = difflib.get_close_matches(str(key), properties, n=1)
+                    hint = f" (did you mean '{close[0]}'?)" if close else ""
+                    if additional is False:
+                        problems.append((path + (key,), f"unknown key '{key}'{hint}"))
+                    else:
+                        problems.append((path + (key,), f"unknown key '{key}' is ignored{hint}", True))
+        checks.append(check_object)
+    
+    if "items" in node:
+        check_item = compile_schema(node["items"])
+        
+        def check_items(value, path, problems):
+            for index, item in enumerate(value):
+                check_item(item, path + (index,), problems)
+        checks.append(check_items)
+    
+    def check(value, path, problems):
+        # Keyword checks assume the type matched
+        if check_type(value, path, problems):
+            for keyword_check in checks:
+                keyword_check(value, path, problems)
+    return check
+
+
+_schema: Optional[Dict[str, Any]] = None
+_validator: Optional[Check] = None
+
+
+def get_schema() -> Dict[str, Any]:
+    """Get the config schema, building it on first use."""
+    global _schema
+    if _schema is None:
+        _schema = build_schema()
+    return _schema
+
+
+def get_validator() -> Check:
+    """Get the compiled config validator, compiling it on first use."""
+    global _validator
+    if _validator is None:
+        _validator = compile_schema(get_schema())
+    return _validator
+
+
+def format_path(path: Tuple) -> str:
+    """Render a problem path like clusters[2].portsToOpen."""
+    text = ""
+    for part in path:
+        text += f"[{part}]" if isinstance(part, int) else f".{part}" if text else str(part)
+    return text or "(document)"
+
+
+def locate(source: bytes, paths: List[Tuple]) -> Dict[Tuple, int]:
+    """
+    Find the line numbers of document paths.
+    
+    Args:
+        source: Raw YAML document
+        paths: Paths to look up
+    
+    Returns:
+        Dictionary of paths and 1-based line numbers (the closest existing
+        ancestor's line for paths that are not in the document)
+    """
+    import yaml
+    
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        root = yaml.compose(source, Loader=loader)
+    except yaml.YAMLError:
+        return {}
+    
+    lines = {}
+    for path in paths:
+        node = root
+        line = node.start_mark.line + 1 if node is not None else None
+        for part in path:
+            child = None
+            if isinstance(node, yaml.MappingNode):
+                for key_node, value_node in node.value:
+                    if key_node.value == str(part):
+                        # Point at the key itself: it's where typos are
+                        line = key_node.start_mark.line + 1
+                        child = value_node
+                        break
+            elif isinstance(node, yaml.SequenceNode) and isinstance(part, int) and part < len(node.value):
+                child = node.value[part]
+                line = child.start_mark.line + 1
+            if child is None:
+                break
+            node = child
+        if line is not None:
+            lines[path] = line
+    return lines
+
+
+def validate(config: Any, source: Optional[bytes] = None) -> List[Dict[str, Any]]:
+    """
+    Validate a parsed config against the schema.
+    
+    Args:
+        config: Parsed document
+        source: Raw document, used to add line numbers
+    
+    Returns:
+        Every problem as a dictionary with path, line (or None), message and
+        warning (True for problems that do not make the document invalid),
+        in document order
+    """
+    if config is None:
+        config = {}
+    problems: Problems = []
+    get_validator()(config, (), problems)
+    lines = locate(source, [problem[0] for problem in problems]) if problems and source is not None else {}
+    return [
+        {"path": format_path(path), "line": lines.get(path), "message": message, "warning": bool(warning)}
+        for path, message, *warning in problems
+    ]
+
+
+def _verdict_path(content_hash: str):
+    # The built schema covers every enum source (providers, tools, template
+    # providers, preload modes), so a change to any of them is a cache miss
+    schema = hashlib.sha256(json.dumps(get_schema(), sort_keys=True).encode()).hexdigest()
+    key = f"{content_hash}:{SCHEMA_VERSION}:{schema}"
+    return cache_dir("config", "verdicts") / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+
+def cached_verdict(content_hash: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the validation result of a document seen before.
+    
+    Args:
+        content_hash: SHA-256 of the raw document
+    
+    Returns:
+        Problems as returned by validate, or None if not cached
+    """
+    try:
+        return json.loads(_verdict_path(content_hash).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def store_verdict(content_hash: str, problems: List[Dict[str, Any]]):
+    """Remember the validation result of a document; an unwritable cache is ignored."""
+    import os
+    
+    try:
+        path = _verdict_path(content_hash)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(problems))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
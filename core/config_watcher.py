@@ -0,0 +1,139 @@
+"""Polling watcher that reloads a config file when it changes."""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.config_handler import RACY_MTIME_WINDOW_NS, ConfigHandler
+from utils.exceptions import ConfigurationError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds between checks of the file
+DEFAULT_POLL_INTERVAL = 1.0
+
+Subscriber = Callable[[Dict[str, Any]], None]
+
+
+class ConfigWatcher:
+    """
+    Reloads a ConfigHandler when its file changes and notifies subscribers.
+    
+    Each check is a single ``stat``; the file is only read when its
+    modification time, size or inode changed (or it was modified within the
+    last two seconds), and subscribers are only called when the content
+    hash changed too (so ``touch`` is ignored).
+    Checks run on a daemon thread after :meth:`start`, or on demand via
+    :meth:`check` for callers that already have a loop of their own.
+    """
+    
+    def __init__(self, handler: ConfigHandler, interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Initialize watcher.
+        
+        Args:
+            handler: Config handler to keep current
+            interval: Seconds between checks when running in the background
+        """
+        self.handler = handler
+        self.interval = interval
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._stat()
+        self._rejected: Optional[Tuple[int, int, int]] = None
+    
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """Get the (mtime, size, inode) of the file, or None if it is missing."""
+        try:
+            stat = os.stat(self.handler.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+    
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        Register a callback for configuration changes.
+        
+        Args:
+            callback: Called with the new configuration dictionary
+        
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+    
+    def check(self) -> bool:
+        """
+        Check the file once, reloading and notifying on a content change.
+        
+        A file that is missing or fails to parse is logged and skipped; the
+        last good configuration stays in effect.
+        
+        Returns:
+            True if subscribers were notified
+        """
+        signature = self._stat()
+        if signature is None:
+            return False
+        # A second write within the same timestamp tick keeps the signature,
+        # so recently modified files are compared by content
+        recent = time.time_ns() - signature[0] < RACY_MTIME_WINDOW_NS
+        if signature == self._signature and not recent:
+            return False
+        self._signature = signature
+        
+        try:
+            changed = self.handler.reload()
+        except ConfigurationError as e:
+            if signature != self._rejected:
+                logger.warning(f"Ignoring change to {self.handler.config_path}: {e}")
+                self._rejected = signature
+            return False
+        if not changed:
+            return False
+        
+        logger.debug(f"Configuration {self.handler.config_path} changed, notifying subscribers")
+        config = self.handler.load()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(config)
+            except Exception as e:
+                logger.error(f"Config subscriber {callback!r} failed: {e}")
+        return True
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+    
+    def start(self) -> "ConfigWatcher":
+        """Start checking in a background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self) -> "ConfigWatcher":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
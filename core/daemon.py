@@ -0,0 +1,250 @@
+"""Resident process that runs CLI commands received over a Unix socket."""
+
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, Optional
+from utils.command_runner import reset_runner
+from utils.exceptions import ToolsCLIException
+from utils.daemon_client import peer_uid
+from utils.logger import configure_console, log_info, setup_logger
+from utils.paths import is_private_dir
+
+logger = setup_logger(__name__)
+
+# Modules imported up front so the first forwarded command is already warm
+WARM_MODULES = ("commands.cluster", "commands.tools", "commands.config", "rich.table", "yaml")
+
+
+class _SocketSink(io.RawIOBase):
+    """Binary stream that relays writes to the client as framed messages."""
+    
+    def __init__(self, send: Callable[[Dict[str, Any]], None], stream: str):
+        super().__init__()
+        self._send = send
+        self._stream = stream
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._send({"stream": self._stream, "data": bytes(data).decode("utf-8", errors="replace")})
+        return len(data)
+
+
+def _request_error(request: Any) -> Optional[str]:
+    """Describe what is wrong with a decoded request, or None if it is usable."""
+    if not isinstance(request, dict):
+        return "not an object"
+    if not isinstance(request.get("argv"), list) or not all(isinstance(arg, str) for arg in request["argv"]):
+        return "argv must be a list of strings"
+    if not isinstance(request.get("cwd"), str):
+        return "cwd must be a string"
+    env = request.get("env")
+    if not isinstance(env, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in env.items()):
+        return "env must map strings to strings"
+    return None
+
+
+class DaemonServer:
+    """
+    Serves CLI invocations from ``cli.py`` clients, one at a time.
+    
+    Requests carry the client's argv, working directory, environment and
+    terminal details. Each runs with those applied and its stdout/stderr
+    streamed back, so commands behave as if run in the client's shell,
+    while imports, parsed configs and constructed providers stay warm.
+    """
+    
+    def __init__(self, app: Callable, path: str, idle_timeout: Optional[float] = None):
+        """
+        Initialize daemon.
+        
+        Args:
+            app: Typer application that runs the commands
+            path: Unix socket path
+            idle_timeout: Exit after this many seconds without requests
+        """
+        self.app = app
+        self.path = path
+        self.idle_timeout = idle_timeout
+    
+    def _bind(self) -> socket.socket:
+        """
+        Create the listening socket, replacing a stale socket file.
+        
+        The socket's directory is created private if missing; clients only
+        connect to sockets in a private directory.
+        
+        Raises:
+            ToolsCLIException: If another daemon already serves this path or
+                the directory is not private to the current user
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not is_private_dir(directory):
+            raise ToolsCLIException(
+                f"{directory} must be owned by you and not group- or world-writable to hold the serve socket"
+            )
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise ToolsCLIException(f"Another serve process is already listening on {self.path}")
+            finally:
+                probe.close()
+        
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout)
+        return server
+    
+    def serve_forever(self):
+        """Accept and run requests until interrupted or idle for too long."""
+        import importlib
+        
+        for module in WARM_MODULES:
+            importlib.import_module(module)
+        
+        server = self._bind()
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        log_info(f"Serving on {self.path} (pid {os.getpid()})")
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    log_info(f"No requests for {self.idle_timeout:g}s, exiting")
+                    return
+                with connection:
+                    self._handle(connection)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+    
+    def _handle(self, connection: socket.socket):
+        """Read one request from a client, run it and report the exit code."""
+        client_uid = peer_uid(connection)
+        if client_uid is not None and client_uid != os.getuid():
+            logger.warning("Ignoring connection from uid %s", client_uid)
+            return
+        lock = threading.Lock()
+        connected = [True]
+        
+        def send(message: Dict[str, Any]):
+            # A client that went away must not abort the running command
+            with lock:
+                if not connected[0]:
+                    return
+                try:
+                    connection.sendall(json.dumps(message).encode() + b"\n")
+                except OSError:
+                    connected[0] = False
+        
+        try:
+            with connection.makefile("rb") as requests:
+                line = requests.readline()
+            if not line:
+                # Liveness probe from a starting serve process
+                return
+            request = json.loads(line)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring malformed request: {e}")
+            return
+        
+        error = _request_error(request)
+        if error:
+            logger.warning(f"Rejecting malformed request: {error}")
+            send({"stream": "stderr", "data": f"tools-cli: malformed request: {error}\n"})
+            send({"exit": 1})
+            return
+        
+        # Nothing one request does (a vanished cwd, an unexpected error
+        # while applying its context) may take the serve process down
+        try:
+            code = self.run(request, send)
+        except Exception as e:
+            logger.warning(f"Request failed: {e}", exc_info=True)
+            send({"stream": "stderr", "data": f"tools-cli: {type(e).__name__}: {e}\n"})
+            code = 1
+        send({"exit": code})
+    
+    def run(self, request: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> int:
+        """
+        Run one command with the client's context applied.
+        
+        Args:
+            request: Dictionary with argv, cwd, env (the forwarded subset),
+                tty, stderr_tty and width
+            send: Callable relaying framed output messages to the client
+        
+        Returns:
+            Exit code of the command
+        """
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        saved_argv = sys.argv
+        saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+        stdout = io.TextIOWrapper(_SocketSink(send, "stdout"), encoding="utf-8", write_through=True)
+        stderr = io.TextIOWrapper(_SocketSink(send, "stderr"), encoding="utf-8", write_through=True)
+        
+        try:
+            os.environ.clear()
+            os.environ.update(request["env"])
+            os.chdir(request["cwd"])
+            sys.argv = ["cli.py"] + request["argv"]
+            sys.stdin, sys.stdout, sys.stderr = io.StringIO(), stdout, stderr
+            
+            # Per-command state: deadlines and stats, cached cluster state,
+            # the output format, and a console matching the client's terminal
+            reset_runner()
+            if "commands.cluster" in sys.modules:
+                sys.modules["commands.cluster"].reset_cached_state()
+            if "utils.output" in sys.modules:
+                sys.modules["utils.output"].set_output_format("table")
+            configure_console(
+                log_terminal=True if request.get("stderr_tty") else None,
+                force_terminal=True if request.get("tty") else None,
+                width=request.get("width"),
+            )
+            
+            try:
+                self.app(args=request["argv"], prog_name="cli.py")
+                code = 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    code = 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            reset_runner()
+            return code
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            sys.argv = saved_argv
+            try:
+                os.chdir(saved_cwd)
+            except OSError as e:
+                logger.warning(f"Cannot return to {saved_cwd}: {e}")
+            os.environ.clear()
+            os.environ.update(saved_env)
+            configure_console()
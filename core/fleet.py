@@ -0,0 +1,140 @@
+"""Declarative multi-cluster reconciliation."""
+
+from typing import Dict, Any, List, Optional
+from core.cluster_manager import ClusterManager
+from utils.exceptions import ConfigurationError, ClusterOperationError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class FleetReconciler:
+    """
+    Diffs a list of desired clusters against provider state and applies the
+    resulting create/delete operations with bounded parallelism.
+    
+    Only cluster existence is reconciled; a cluster whose settings changed
+    is left alone until it is deleted and re-applied.
+    """
+    
+    def __init__(self, manager: ClusterManager, parallelism: int = 4):
+        """
+        Initialize fleet reconciler.
+        
+        Args:
+            manager: Cluster manager used for listing and mutations
+            parallelism: Maximum number of concurrent operations
+        """
+        self.manager = manager
+        self.parallelism = max(1, parallelism)
+    
+    @staticmethod
+    def desired_clusters(fleet: Any) -> List[Dict[str, Any]]:
+        """
+        Extract the desired cluster list from a fleet document.
+        
+        Accepts either a mapping with a ``clusters`` list or a bare list.
+        Each entry uses the same keys as ``clusterConfig``.
+        
+        Args:
+            fleet: Parsed fleet document
+            
+        Returns:
+            List of cluster specs with ``name`` and ``type`` set
+            
+        Raises:
+            ConfigurationError: If the document has no usable cluster list
+        """
+        clusters = fleet.get("clusters") if isinstance(fleet, dict) else fleet
+        if not isinstance(clusters, list):
+            raise ConfigurationError("Fleet file must contain a 'clusters' list")
+        
+        desired = []
+        seen = set()
+        for index, spec in enumerate(clusters):
+            if not isinstance(spec, dict) or not spec.get("name"):
+                raise ConfigurationError(f"Fleet entry {index} must be a mapping with a 'name'")
+            spec = dict(spec, type=str(spec.get("type", "local")).lower())
+            key = (spec["type"], spec["name"])
+            if key in seen:
+                raise ConfigurationError(f"Cluster '{spec['name']}' is listed twice for provider '{spec['type']}'")
+            seen.add(key)
+            desired.append(spec)
+        return desired
+    
+    def plan(self, desired: List[Dict[str, Any]], prune: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compute the operations needed to converge on the desired fleet.
+        
+        Each provider class referenced by the fleet is listed exactly once,
+        so provider aliases (local/k3d) are treated as the same backend.
+        
+        Args:
+            desired: Desired cluster specs
+            prune: Also delete clusters the fleet does not mention, except
+                warm pool clusters, which the pool manages itself
+            
+        Returns:
+            Dictionary with "create", "delete" and "unchanged" lists
+        """
+        providers: Dict[str, str] = {}
+        for spec in desired:
+            backend = self.manager.provider_key(spec["type"])
+            providers.setdefault(backend, spec["type"])
+        
+        listings = self.manager.run_operations(
+            [{"action": "list", "type": provider_type} for provider_type in providers.values()],
+            concurrency=self.parallelism,
+        )
+        actual = {}
+        for backend, listing in zip(providers, listings):
+            if not listing["ok"]:
+                raise ClusterOperationError(f"Could not list {listing['type']} clusters: {listing['error']}")
+            actual[backend] = set(listing["result"])
+        
+        plan = {"create": [], "delete": [], "unchanged": []}
+        wanted = {backend: set() for backend in providers}
+        for spec in desired:
+            backend = self.manager.provider_key(spec["type"])
+            wanted[backend].add(spec["name"])
+            if spec["name"] in actual[backend]:
+                plan["unchanged"].append(spec)
+            else:
+                plan["create"].append(spec)
+        
+        if prune:
+            from core.pool import POOL_PROVIDER
+            
+            pool_backend = self.manager.provider_key(POOL_PROVIDER)
+            for backend, names in actual.items():
+                if backend == pool_backend:
+                    names = names - self.manager.pool.names()
+                for name in sorted(names - wanted[backend]):
+                    plan["delete"].append({"name": name, "type": providers[backend]})
+        
+        return plan
+    
+    def apply(self, plan: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Execute a plan: deletions first, then creations.
+        
+        Deletions run before creations so that freed resources such as
+        host ports are available to the new clusters.
+        
+        Args:
+            plan: Plan returned by :meth:`plan`
+            
+        Returns:
+            List of operation results with action, name, type, ok and error
+        """
+        results = []
+        for action in ("delete", "create"):
+            operations = []
+            for spec in plan.get(action) or []:
+                operation = {"action": action, "name": spec["name"], "type": spec["type"]}
+                if action == "create":
+                    operation["kwargs"] = ClusterManager.create_kwargs(spec)
+                    operation["labels"] = spec.get("labels")
+                operations.append(operation)
+            results.extend(self.manager.run_operations(operations, concurrency=self.parallelism))
+        return results
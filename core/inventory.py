@@ -0,0 +1,278 @@
+"""Local SQLite inventory of clusters across providers."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+from utils.exceptions import ConfigurationError
+from utils.paths import cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clusters (
+    provider TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT,
+    created_at REAL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    info TEXT,
+    PRIMARY KEY (provider, name)
+);
+CREATE INDEX IF NOT EXISTS clusters_status ON clusters (status);
+CREATE INDEX IF NOT EXISTS clusters_age ON clusters (COALESCE(created_at, first_seen));
+CREATE TABLE IF NOT EXISTS labels (
+    provider TEXT NOT NULL,
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (provider, name, key),
+    FOREIGN KEY (provider, name) REFERENCES clusters (provider, name) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS labels_key_value ON labels (key, value);
+CREATE TABLE IF NOT EXISTS providers (
+    provider TEXT PRIMARY KEY,
+    listed_at REAL NOT NULL
+);
+"""
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(text: str) -> float:
+    """
+    Parse a duration such as "90s", "30m", "2h" or "1d" into seconds.
+    
+    Args:
+        text: Duration; a bare number means seconds
+    
+    Returns:
+        Seconds
+    
+    Raises:
+        ConfigurationError: If the duration cannot be parsed
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", text.lower())
+    if not match:
+        raise ConfigurationError(f"Invalid duration '{text}' (expected e.g. 90s, 30m, 2h, 1d)")
+    return float(match.group(1)) * DURATION_UNITS.get(match.group(2) or "s")
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Parse an ISO 8601 timestamp as reported by providers.
+    
+    Handles a trailing "Z" and nanosecond fractions (as k3d emits them).
+    
+    Args:
+        value: Timestamp string
+    
+    Returns:
+        Seconds since the epoch, or None if the value is not a timestamp
+    """
+    if not isinstance(value, str):
+        return None
+    text = re.sub(r"(\.\d{6})\d+", r"\1", value.strip()).replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+class Inventory:
+    """
+    Persistent index of known clusters, labels and listing freshness.
+    
+    Rows are updated incrementally from the results of provider calls;
+    queries never contact a provider.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize inventory.
+        
+        Args:
+            path: Database file (default: <cache dir>/inventory.db)
+        """
+        self.path = Path(path) if path else cache_dir() / "inventory.db"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        with self._db:
+            self._db.executescript(SCHEMA)
+    
+    def close(self):
+        """Close the database connection."""
+        self._db.close()
+    
+    def _upsert(self, provider: str, name: str, now: float, status: Optional[str] = None,
+                created_at: Optional[float] = None, info: Optional[Dict[str, Any]] = None):
+        """Insert a cluster or update the given fields of an existing one."""
+        self._db.execute(
+            """
+            INSERT INTO clusters (provider, name, status, created_at, first_seen, updated_at, info)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (provider, name) DO UPDATE SET
+                status = COALESCE(excluded.status, status),
+                created_at = COALESCE(excluded.created_at, created_at),
+                updated_at = excluded.updated_at,
+                info = COALESCE(excluded.info, info)
+            """,
+            (provider, name, status, created_at, now, now, json.dumps(info) if info is not None else None),
+        )
+    
+    def record_list(self, provider: str, names: Iterable[str]):
+        """
+        Record a full listing of a provider: add new clusters, drop vanished ones.
+        
+        Args:
+            provider: Canonical provider name
+            names: Every cluster the provider reported
+        """
+        names = list(names)
+        now = time.time()
+        with self._lock, self._db:
+            for name in names:
+                self._upsert(provider, name, now)
+            # Every listed cluster was just stamped with `now`
+            self._db.execute("DELETE FROM clusters WHERE provider = ? AND updated_at < ?", (provider, now))
+            self._db.execute(
+                "INSERT INTO providers (provider, listed_at) VALUES (?, ?) "
+                "ON CONFLICT (provider) DO UPDATE SET listed_at = excluded.listed_at",
+                (provider, now),
+            )
+    
+    def record_info(self, provider: str, name: str, info: Dict[str, Any]):
+        """
+        Record the result of a cluster info call.
+        
+        Args:
+            provider: Canonical provider name
+            name: Cluster name
+            info: Info dictionary; empty means the cluster does not exist
+        """
+        if not info:
+            self.record_delete(provider, name)
+            return
+        with self._lock, self._db:
+            self._upsert(
+                provider, name, time.time(),
+                status=info.get("status"), created_at=parse_timestamp(info.get("created")), info=info,
+            )
+    
+    def record_create(self, provider: str, name: str, labels: Optional[Dict[str, str]] = None):
+        """
+        Record a cluster created through the CLI.
+        
+        Args:
+            provider: Canonical provider name
+            name: Cluster name
+            labels: Labels to attach
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._upsert(provider, name, now, status="running", created_at=now)
+            for key, value in (labels or {}).items():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO labels (provider, name, key, value) VALUES (?, ?, ?, ?)",
+                    (provider, name, key, str(value)),
+                )
+    
+    def record_delete(self, provider: str, name: str):
+        """Forget a deleted cluster."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM clusters WHERE provider = ? AND name = ?", (provider, name))
+    
+    def listed_at(self, provider: str) -> Optional[float]:
+        """
+        Get the time of the last full listing of a provider.
+        
+        Returns:
+            Seconds since the epoch, or None if it was never listed
+        """
+        with self._lock:
+            row = self._db.execute("SELECT listed_at FROM providers WHERE provider = ?", (provider,)).fetchone()
+        return row["listed_at"] if row else None
+    
+    def providers(self) -> List[str]:
+        """Get every provider with a recorded listing."""
+        with self._lock:
+            return [row["provider"] for row in self._db.execute("SELECT provider FROM providers ORDER BY provider")]
+    
+    def query(
+        self,
+        providers: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        older_than: Optional[float] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query clusters from the index.
+        
+        Clusters without a reported creation time count from when they were
+        first seen.
+        
+        Args:
+            providers: Canonical provider names (default: all)
+            status: Required status
+            older_than: Minimum age in seconds
+            labels: Labels that must all match
+        
+        Returns:
+            Cluster dictionaries with provider, name, status, created_at,
+            age (seconds), labels and info, oldest first
+        """
+        clauses, params = [], []
+        if providers:
+            clauses.append(f"c.provider IN ({','.join('?' * len(providers))})")
+            params.extend(providers)
+        if status:
+            clauses.append("c.status = ?")
+            params.append(status)
+        if older_than is not None:
+            clauses.append("COALESCE(c.created_at, c.first_seen) <= ?")
+            params.append(time.time() - older_than)
+        for key, value in (labels or {}).items():
+            clauses.append(
+                "EXISTS (SELECT 1 FROM labels l WHERE l.provider = c.provider AND l.name = c.name "
+                "AND l.key = ? AND l.value = ?)"
+            )
+            params.extend([key, str(value)])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT c.*, COALESCE(c.created_at, c.first_seen) AS born FROM clusters c {where} "
+                "ORDER BY born, c.provider, c.name",
+                params,
+            ).fetchall()
+            # Same filter, so only labels of the clusters returned are read
+            label_rows = self._db.execute(
+                "SELECT l.provider, l.name, l.key, l.value FROM clusters c "
+                f"JOIN labels l ON l.provider = c.provider AND l.name = c.name {where}",
+                params,
+            ).fetchall() if rows else []
+        
+        cluster_labels: Dict[tuple, Dict[str, str]] = {}
+        for row in label_rows:
+            cluster_labels.setdefault((row["provider"], row["name"]), {})[row["key"]] = row["value"]
+        
+        now = time.time()
+        return [
+            {
+                "provider": row["provider"],
+                "name": row["name"],
+                "status": row["status"] or "unknown",
+                "created_at": row["created_at"],
+                "age": now - row["born"],
+                "labels": cluster_labels.get((row["provider"], row["name"]), {}),
+                "info": json.loads(row["info"]) if row["info"] else {},
+            }
+            for row in rows
+        ]
@@ -0,0 +1,346 @@
+"""Warm pool of standby local clusters handed out by ``cluster create --from-pool``."""
+
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+from core.inventory import parse_duration
+from utils.exceptions import ToolsCLIException
+from utils.logger import setup_logger, log_info, log_warning
+from utils.paths import cache_dir
+
+logger = setup_logger(__name__)
+
+POOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pool (
+    name TEXT PRIMARY KEY,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    claimed_as TEXT
+);
+CREATE INDEX IF NOT EXISTS pool_state ON pool (state, spec, created_at);
+"""
+
+# Cluster states: being created, standing by, handed out
+BUILDING, READY, CLAIMED = "building", "ready", "claimed"
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_AGE = "24h"
+DEFAULT_PREFIX = "pool"
+DEFAULT_POOL_PARALLEL = 2
+# Seconds after which a "building" row is considered abandoned by its filler
+BUILD_TIMEOUT = 900.0
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Only the local provider is pooled: clusters are cheap to keep around
+POOL_PROVIDER = "local"
+
+
+def _seconds(value: Any) -> Optional[float]:
+    """Read a duration setting given as "12h" or a number of seconds; 0 means unset."""
+    if value in (None, "", 0):
+        return None
+    return float(value) if isinstance(value, (int, float)) else parse_duration(str(value))
+
+
+class ClusterPool:
+    """
+    Keeps standby k3d clusters built to the configured spec.
+    
+    Pool state lives in ``<cache>/pool/pool.db``. Claiming a cluster is one
+    SQLite update, so handing one out takes milliseconds no matter how long
+    k3d needs to build it; :meth:`fill` then rebuilds the pool, usually in a
+    detached process started by :meth:`refill_in_background`.
+    k3d cannot rename clusters, so a claimed cluster keeps its pool name
+    (``<prefix>-<random>``) and the requested name is recorded with it.
+    """
+    
+    def __init__(self, manager, path: Optional[str] = None):
+        """
+        Initialize pool.
+        
+        Args:
+            manager: ClusterManager used to create and delete pool clusters
+            path: Database file (default: <cache dir>/pool/pool.db)
+        """
+        from core.cluster_manager import ClusterManager
+        
+        self.manager = manager
+        settings = manager.config.get("poolConfig") or {}
+        self.size = int(settings.get("size", DEFAULT_POOL_SIZE))
+        self.max_age = _seconds(settings.get("maxAge", DEFAULT_MAX_AGE))
+        self.recycle_after = _seconds(settings.get("recycleAfter"))
+        self.prefix = settings.get("prefix") or DEFAULT_PREFIX
+        self.max_parallel = int(settings.get("maxParallel") or DEFAULT_POOL_PARALLEL)
+        
+        # Spec: clusterConfig with poolConfig.clusterConfig overrides
+        spec = dict(manager.config.get("clusterConfig") or {})
+        spec.update(settings.get("clusterConfig") or {})
+        self.create_kwargs = ClusterManager.create_kwargs(spec)
+        self.spec = hashlib.sha256(json.dumps(self.create_kwargs, sort_keys=True).encode()).hexdigest()[:12]
+        
+        self.path = Path(path) if path else cache_dir("pool") / "pool.db"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.executescript(POOL_SCHEMA)
+    
+    def close(self):
+        """Close the database connection."""
+        self._db.close()
+    
+    def _fresh_after(self, now: float) -> float:
+        """Creation time before which standby clusters are too old to hand out."""
+        return now - self.max_age if self.max_age else 0.0
+    
+    def claim(self, claimed_as: Optional[str] = None) -> Optional[str]:
+        """
+        Hand out the oldest fresh standby cluster built to the current spec.
+        
+        Safe against concurrent claims from other processes: a cluster is
+        only claimed by the update that moves it out of the ready state.
+        
+        Args:
+            claimed_as: Name the caller asked for, recorded with the claim
+        
+        Returns:
+            Name of the claimed cluster, or None if none is ready
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [
+                row["name"] for row in self._db.execute(
+                    "SELECT name FROM pool WHERE state = ? AND spec = ? AND created_at >= ? ORDER BY created_at",
+                    (READY, self.spec, self._fresh_after(now)),
+                )
+            ]
+            for name in candidates:
+                with self._db:
+                    claimed = self._db.execute(
+                        "UPDATE pool SET state = ?, claimed_at = ?, claimed_as = ? WHERE name = ? AND state = ?",
+                        (CLAIMED, now, claimed_as, name, READY),
+                    ).rowcount
+                if claimed:
+                    return name
+        return None
+    
+    def names(self) -> Set[str]:
+        """Get the names of every cluster the pool tracks, claimed or not."""
+        with self._lock:
+            return {row["name"] for row in self._db.execute("SELECT name FROM pool")}
+    
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Get every pool cluster.
+        
+        Returns:
+            Dictionaries with name, state, age (seconds), claimed_as and
+            current (built to the current spec)
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM pool ORDER BY state, created_at").fetchall()
+        return [
+            {
+                "name": row["name"],
+                "state": row["state"],
+                "age": now - row["created_at"],
+                "claimed_as": row["claimed_as"],
+                "current": row["spec"] == self.spec,
+            }
+            for row in rows
+        ]
+    
+    def _recyclable(self, row: sqlite3.Row, now: float) -> bool:
+        """Check whether a pool cluster should be deleted by the next fill."""
+        if row["state"] == READY:
+            return row["spec"] != self.spec or row["created_at"] < self._fresh_after(now)
+        if row["state"] == CLAIMED:
+            # Claimed clusters are dirty; they never return to the pool
+            return self.recycle_after is not None and now - row["claimed_at"] > self.recycle_after
+        return now - row["created_at"] > BUILD_TIMEOUT
+    
+    def _forget(self, names: List[str]):
+        with self._lock, self._db:
+            self._db.executemany("DELETE FROM pool WHERE name = ?", [(name,) for name in names])
+    
+    def _delete(self, names: List[str]) -> List[str]:
+        """
+        Delete pool clusters.
+        
+        Clusters k3d no longer has are forgotten too; ones whose delete
+        failed stay in the pool so a later fill can retry them.
+        
+        Returns:
+            Names of the clusters that are gone
+        """
+        if not names:
+            return []
+        results = self.manager.run_operations(
+            [{"action": "delete", "type": POOL_PROVIDER, "name": name} for name in names],
+            self.max_parallel,
+        )
+        gone = []
+        for result in results:
+            if result["ok"] or "does not exist" in (result["error"] or ""):
+                gone.append(result["name"])
+            else:
+                log_warning(f"Could not delete pool cluster {result['name']}: {result['error']}")
+        self._forget(gone)
+        return gone
+    
+    def fill(self) -> Dict[str, int]:
+        """
+        Bring the pool to its configured size.
+        
+        Forgets clusters deleted behind the pool's back, deletes standby
+        clusters that are too old or built to an outdated spec (and claimed
+        ones past ``recycleAfter``), then creates the missing standby
+        clusters concurrently. Only one fill runs at a time; a concurrent
+        call returns immediately, as does a fill whose cluster listing fails.
+        
+        Returns:
+            Counts of created, recycled and failed clusters
+        """
+        import fcntl
+        
+        counts = {"created": 0, "recycled": 0, "failed": 0}
+        with open(cache_dir("pool") / "fill.lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                logger.debug("Another pool fill is running")
+                return counts
+            
+            try:
+                existing = set(self.manager.list_clusters(POOL_PROVIDER))
+            except ToolsCLIException as e:
+                # Without a listing every row would look deleted: leave the
+                # pool as it is rather than forget clusters that still exist
+                log_warning(f"Pool fill skipped: {e}")
+                return counts
+            now = time.time()
+            with self._lock:
+                rows = self._db.execute("SELECT * FROM pool").fetchall()
+            # Clusters deleted behind the pool's back, and abandoned builds
+            self._forget([
+                row["name"] for row in rows
+                if row["name"] not in existing and (row["state"] != BUILDING or self._recyclable(row, now))
+            ])
+            
+            recycle = [row["name"] for row in rows if row["name"] in existing and self._recyclable(row, now)]
+            if recycle:
+                log_info(f"Recycling {len(recycle)} pool cluster(s): {', '.join(recycle)}")
+                counts["recycled"] = len(self._delete(recycle))
+            
+            # Claims made while building leave the pool short: build again
+            # until it is full or a round fails
+            while True:
+                created, failed = self._build()
+                counts["created"] += created
+                counts["failed"] += failed
+                if not created or failed:
+                    break
+        return counts
+    
+    def _build(self) -> tuple:
+        """
+        Create the missing standby clusters concurrently.
+        
+        Returns:
+            Tuple of (created, failed) cluster counts
+        """
+        with self._lock:
+            standby = self._db.execute(
+                "SELECT COUNT(*) FROM pool WHERE state IN (?, ?)", (READY, BUILDING)
+            ).fetchone()[0]
+        missing = max(0, self.size - standby)
+        if not missing:
+            return 0, 0
+        
+        names = [f"{self.prefix}-{secrets.token_hex(3)}" for _ in range(missing)]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO pool (name, spec, state, created_at) VALUES (?, ?, ?, ?)",
+                [(name, self.spec, BUILDING, time.time()) for name in names],
+            )
+        log_info(f"Creating {missing} standby cluster(s)")
+        results = self.manager.run_operations(
+            [
+                {
+                    "action": "create", "type": POOL_PROVIDER, "name": name,
+                    "kwargs": self.create_kwargs, "labels": {"pool": "standby"},
+                }
+                for name in names
+            ],
+            self.max_parallel,
+        )
+        
+        created = failed = 0
+        for result in results:
+            if result["ok"]:
+                with self._lock, self._db:
+                    self._db.execute(
+                        "UPDATE pool SET state = ?, created_at = ? WHERE name = ?",
+                        (READY, time.time(), result["name"]),
+                    )
+                created += 1
+            else:
+                log_warning(f"Could not create standby cluster {result['name']}: {result['error']}")
+                self._forget([result["name"]])
+                failed += 1
+        return created, failed
+    
+    def release(self, name: str) -> bool:
+        """
+        Delete a claimed cluster once its user is done with it.
+        
+        Args:
+            name: Pool cluster name
+        
+        Returns:
+            True if the cluster belonged to the pool
+        """
+        with self._lock:
+            row = self._db.execute("SELECT state FROM pool WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return False
+        self._delete([name])
+        return True
+    
+    def drain(self) -> int:
+        """
+        Delete every standby cluster; claimed clusters are left alone.
+        
+        Returns:
+            Number of clusters deleted
+        """
+        with self._lock:
+            names = [row["name"] for row in self._db.execute("SELECT name FROM pool WHERE state != ?", (CLAIMED,))]
+        return len(self._delete(names))
+    
+    def refill_in_background(self):
+        """Start a detached ``cluster pool fill`` in the current directory."""
+        log_path = cache_dir("pool") / "fill.log"
+        env = dict(os.environ, TOOLS_CLI_NO_DAEMON="1")
+        with open(log_path, "ab") as log:
+            subprocess.Popen(
+                [sys.executable, str(REPO_ROOT / "cli.py"), "cluster", "pool", "fill"],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+            )
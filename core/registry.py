@@ -0,0 +1,235 @@
+"""Shared pull-through registry and image preloading for k3d clusters."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from utils.command_runner import get_runner
+from utils.exceptions import ClusterOperationError, ConfigurationError
+from utils.logger import setup_logger, log_info, log_success
+from utils.paths import cache_dir
+
+logger = setup_logger(__name__)
+
+DEFAULT_REGISTRY_NAME = "tools-cli-cache"
+DEFAULT_REGISTRY_PORT = 5000
+DEFAULT_PROXY_REMOTE_URL = "https://registry-1.docker.io"
+# Registries whose pulls are redirected to the shared registry
+DEFAULT_MIRRORS = ("docker.io",)
+
+# Seconds before k3d registry/image commands are considered hung
+REGISTRY_TIMEOUT = 120.0
+IMPORT_TIMEOUT = 600.0
+DEFAULT_PRELOAD_PARALLEL = 4
+PRELOAD_MODES = ("auto", "direct", "tools-node")
+
+
+class SharedRegistry:
+    """
+    One long-lived k3d registry that every cluster pulls through.
+    
+    The registry runs as a pull-through cache of ``proxyRemoteUrl`` with its
+    storage on a named volume, so it outlives the clusters attached to it
+    and a deleted and recreated cluster pulls from the cache instead of the
+    internet. Clusters are attached with ``--registry-use`` plus a
+    registries.yaml that mirrors the configured registries through it.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize shared registry.
+        
+        Args:
+            config: Configuration dictionary with an optional registryConfig
+                section (shared, name, port, proxyRemoteUrl, mirrors, volume)
+        """
+        settings = (config or {}).get("registryConfig") or {}
+        self.enabled = bool(settings.get("shared", False))
+        self.name = settings.get("name") or DEFAULT_REGISTRY_NAME
+        self.port = int(settings.get("port") or DEFAULT_REGISTRY_PORT)
+        self.proxy_remote_url = settings.get("proxyRemoteUrl") or DEFAULT_PROXY_REMOTE_URL
+        self.mirrors = list(settings.get("mirrors") or DEFAULT_MIRRORS)
+        self.volume = settings.get("volume") or f"{self.name}-data"
+        self._ready = False
+        self._lock = threading.Lock()
+    
+    @property
+    def container_name(self) -> str:
+        """Name of the registry container; k3d prefixes registry names."""
+        return self.name if self.name.startswith("k3d-") else f"k3d-{self.name}"
+    
+    def _exists(self) -> bool:
+        """Check whether k3d already knows the registry."""
+        result = get_runner().run(
+            ["k3d", "registry", "list", "-o", "json"], timeout=REGISTRY_TIMEOUT, read_only=True
+        )
+        if result.returncode != 0:
+            raise ClusterOperationError(f"Could not list k3d registries: {(result.stderr or result.stdout).strip()}")
+        try:
+            registries = json.loads(result.stdout or "[]")
+        except ValueError:
+            raise ClusterOperationError("k3d returned an invalid registry list")
+        return any(registry.get("name") == self.container_name for registry in registries or [])
+    
+    def ensure(self):
+        """
+        Create the registry unless it exists; checked once per process.
+        
+        Raises:
+            ClusterOperationError: If k3d fails
+        """
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            if not self._exists():
+                log_info(f"Creating shared registry '{self.container_name}' (pull-through for {self.proxy_remote_url})")
+                command = [
+                    "k3d", "registry", "create", self.name,
+                    "--port", str(self.port),
+                    "--proxy-remote-url", self.proxy_remote_url,
+                    "--volume", f"{self.volume}:/var/lib/registry",
+                ]
+                result = get_runner().run(command, timeout=REGISTRY_TIMEOUT)
+                if result.returncode != 0:
+                    output = (result.stderr or result.stdout).strip()
+                    raise ClusterOperationError(f"Shared registry creation failed: {output}")
+            self._ready = True
+    
+    async def aensure(self):
+        """Create the registry unless it exists, without blocking the event loop."""
+        import asyncio
+        
+        if not self._ready:
+            await asyncio.to_thread(self.ensure)
+    
+    def registries_file(self) -> Path:
+        """
+        Write the k3s registries.yaml that mirrors pulls through the registry.
+        
+        Returns:
+            Path of the file, rewritten only when its content changes
+        """
+        endpoint = f"http://{self.container_name}:{self.port}"
+        lines = ["mirrors:"]
+        for mirror in self.mirrors:
+            lines += [f'  "{mirror}":', "    endpoint:", f'      - "{endpoint}"']
+        content = "\n".join(lines) + "\n"
+        
+        path = cache_dir("registry") / f"{self.name}.yaml"
+        try:
+            if path.read_text() == content:
+                return path
+        except OSError:
+            pass
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content)
+        os.replace(tmp_path, path)
+        return path
+    
+    def create_args(self) -> List[str]:
+        """Arguments attaching a new cluster to the registry."""
+        return [
+            "--registry-use", f"{self.container_name}:{self.port}",
+            "--registry-config", str(self.registries_file()),
+        ]
+
+
+class ImagePreloader:
+    """
+    Imports image tarballs into the nodes of k3d clusters.
+    
+    Each tarball is one ``k3d image import`` and up to ``maxParallel`` run
+    at once, so preloading takes about as long as the largest image rather
+    than the sum of all of them.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize preloader.
+        
+        Args:
+            config: Configuration dictionary with an optional preloadConfig
+                section (images, maxParallel, mode, onCreate)
+        """
+        settings = (config or {}).get("preloadConfig") or {}
+        self.images = [str(image) for image in settings.get("images") or []]
+        self.max_parallel = int(settings.get("maxParallel") or DEFAULT_PRELOAD_PARALLEL)
+        self.mode = settings.get("mode") or "auto"
+        self.on_create = bool(settings.get("onCreate", False))
+    
+    def _resolve(self, images: Optional[List[str]]) -> List[str]:
+        """
+        Get the tarballs to import.
+        
+        Raises:
+            ConfigurationError: If no images are given or a tarball is missing
+        """
+        images = list(images or self.images)
+        if not images:
+            raise ConfigurationError("No images to preload: pass --image or set preloadConfig.images")
+        missing = [image for image in images if not os.path.isfile(os.path.expanduser(image))]
+        if missing:
+            raise ConfigurationError(f"Image tarball(s) not found: {', '.join(missing)}")
+        return [os.path.expanduser(image) for image in images]
+    
+    def _command(self, name: str, image: str) -> List[str]:
+        return ["k3d", "image", "import", image, "--cluster", name, "--mode", self.mode]
+    
+    async def apreload(
+        self,
+        name: str,
+        images: Optional[List[str]] = None,
+        parallel: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """
+        Import image tarballs into a cluster concurrently.
+        
+        Args:
+            name: Cluster name
+            images: Tarball paths (default: preloadConfig.images)
+            parallel: Imports in flight (default: preloadConfig.maxParallel)
+        
+        Returns:
+            Dictionary of tarballs and whether they were imported
+        
+        Raises:
+            ConfigurationError: If no images are given or a tarball is missing
+            ClusterOperationError: If any import fails
+        """
+        import asyncio
+        
+        images = self._resolve(images)
+        semaphore = asyncio.Semaphore(max(1, parallel or self.max_parallel))
+        runner = get_runner()
+        
+        async def import_one(image: str):
+            async with semaphore:
+                command = self._command(name, image)
+                logger.debug("%s: %s", name, " ".join(command))
+                return await runner.arun(command, timeout=IMPORT_TIMEOUT)
+        
+        log_info(f"Preloading {len(images)} image(s) into '{name}'")
+        results = await asyncio.gather(*(import_one(image) for image in images))
+        
+        failures = {
+            image: (result.stderr or result.stdout).strip()
+            for image, result in zip(images, results) if result.returncode != 0
+        }
+        if failures:
+            details = "; ".join(f"{os.path.basename(image)}: {output}" for image, output in failures.items())
+            raise ClusterOperationError(f"Image preload into '{name}' failed: {details}")
+        log_success(f"Preloaded {len(images)} image(s) into '{name}'")
+        return {image: True for image in images}
+    
+    def preload(
+        self,
+        name: str,
+        images: Optional[List[str]] = None,
+        parallel: Optional[int] = None,
+    ) -> Dict[str, bool]:
+        """Blocking wrapper around :meth:`apreload`."""
+        import asyncio
+        return asyncio.run(self.apreload(name, images, parallel))
@@ -0,0 +1,410 @@
+"""Cluster templates: content-addressed fetch cache and incremental rendering."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from string import Template
+from typing import Dict, Any, Iterator, Optional, Tuple
+from core.config_schema import CLUSTER_NAME_PATTERN
+from utils.exceptions import ConfigurationError, ToolsCLIException
+from utils.logger import setup_logger, log_info
+from utils.paths import cache_dir
+
+logger = setup_logger(__name__)
+
+# Files with this suffix are rendered (and the suffix dropped); all other
+# files are copied verbatim
+TEMPLATE_SUFFIX = ".tmpl"
+
+RENDER_STATE = ".render-state.json"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _local_path(url: str) -> Path:
+    """Turn a file:// URL or plain path into a Path."""
+    if url.startswith("file:"):
+        import urllib.parse
+        import urllib.request
+        return Path(urllib.request.url2pathname(urllib.parse.urlparse(url).path))
+    return Path(url).expanduser()
+
+
+class TemplateStore:
+    """
+    Content-addressed cache of template trees.
+    
+    File contents are stored once by SHA-256 under ``blobs/``; a tree maps
+    relative paths to blob digests and is itself stored by digest under
+    ``trees/``. ``index.json`` maps a (provider, url, tag) key to the tree
+    digest, so resolving a tag that was seen before reads no template files.
+    """
+    
+    # Template providers: "local" is a directory (or a tarball on disk),
+    # "url" a tarball behind an http(s):// or file:// URL. Tags of "url"
+    # templates are treated as immutable.
+    PROVIDERS = ("local", "url")
+    
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize template store.
+        
+        Args:
+            root: Store directory (default: <cache dir>/templates)
+        """
+        self.root = Path(root) if root else cache_dir("templates")
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+    
+    def blob_path(self, digest: str) -> Path:
+        """Get the path of a blob by its SHA-256 digest."""
+        return self.root / "blobs" / digest[:2] / digest
+    
+    def _tree_path(self, digest: str) -> Path:
+        return self.root / "trees" / f"{digest}.json"
+    
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """Write a file via a temporary sibling and rename."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def _update_index(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            index = self._read_index()
+            index[key] = entry
+            self._write_atomic(self.index_path, json.dumps(index, indent=2, sort_keys=True).encode())
+    
+    def load_tree(self, digest: str) -> Optional[Dict[str, str]]:
+        """
+        Read a stored tree.
+        
+        Returns:
+            Dictionary of relative paths and blob digests, or None if the
+            tree or one of its blobs is missing
+        """
+        try:
+            tree = json.loads(self._tree_path(digest).read_text())
+        except (OSError, ValueError):
+            return None
+        if not all(self.blob_path(blob).exists() for blob in tree.values()):
+            return None
+        return tree
+    
+    def _ingest(self, files: Iterator[Tuple[str, bytes]]) -> Tuple[str, Dict[str, str]]:
+        """Store file contents and their tree; return the tree digest and tree."""
+        tree = {}
+        for relative, data in files:
+            digest = _digest(data)
+            blob = self.blob_path(digest)
+            if not blob.exists():
+                self._write_atomic(blob, data)
+            tree[relative] = digest
+        if not tree:
+            raise ConfigurationError("Template contains no files")
+        
+        encoded = json.dumps(tree, sort_keys=True).encode()
+        tree_digest = _digest(encoded)
+        if not self._tree_path(tree_digest).exists():
+            self._write_atomic(self._tree_path(tree_digest), encoded)
+        return tree_digest, tree
+    
+    @staticmethod
+    def _template_paths(root: Path) -> Iterator[Tuple[str, Path]]:
+        """List the files of a local template; dotfiles and dot directories are skipped."""
+        for path in sorted(root.rglob("*")):
+            relative = path.relative_to(root).as_posix()
+            if path.is_file() and not any(part.startswith(".") for part in relative.split("/")):
+                yield relative, path
+    
+    @classmethod
+    def _directory_files(cls, root: Path) -> Iterator[Tuple[str, bytes]]:
+        for relative, path in cls._template_paths(root):
+            yield relative, path.read_bytes()
+    
+    @classmethod
+    def _directory_signature(cls, root: Path) -> str:
+        """Cheap change detector for a local template: paths, sizes and mtimes."""
+        entries = []
+        for relative, path in cls._template_paths(root):
+            stat = path.stat()
+            entries.append(f"{relative}:{stat.st_size}:{stat.st_mtime_ns}")
+        return _digest("\n".join(entries).encode())
+    
+    @staticmethod
+    def _archive_files(archive: Path) -> Iterator[Tuple[str, bytes]]:
+        """
+        Read the files of a tarball, dropping a single top-level directory.
+        
+        Raises:
+            ConfigurationError: If the archive cannot be read, or has links or
+                member names that are absolute, empty or contain ".."
+        """
+        import tarfile
+        
+        try:
+            with tarfile.open(archive, "r:*") as tar:
+                members = []
+                for member in tar.getmembers():
+                    if member.issym() or member.islnk():
+                        raise ConfigurationError(f"Template archive {archive} contains a link: {member.name}")
+                    name = member.name[2:] if member.name.startswith("./") else member.name
+                    parts = name.rstrip("/").split("/")
+                    if not name or name.startswith("/") or ".." in parts or "" in parts:
+                        raise ConfigurationError(f"Template archive {archive} contains an unsafe path: {member.name!r}")
+                    if member.isfile():
+                        members.append(member)
+                names = [member.name[2:] if member.name.startswith("./") else member.name for member in members]
+                tops = {name.split("/", 1)[0] for name in names}
+                strip = len(tops) == 1 and all("/" in name for name in names)
+                for member, name in zip(members, names):
+                    relative = name.split("/", 1)[1] if strip else name
+                    if any(part.startswith(".") for part in relative.split("/")):
+                        continue
+                    yield relative, tar.extractfile(member).read()
+        except (tarfile.TarError, OSError) as e:
+            raise ConfigurationError(f"Could not read template archive {archive}: {e}")
+    
+    def resolve(self, provider: str, url: str, tag: str, refresh: bool = False) -> Tuple[str, Dict[str, str]]:
+        """
+        Get the tree of a template version, fetching it only when needed.
+        
+        Args:
+            provider: Template provider ("local" or "url")
+            url: Directory, tarball path or URL; "{tag}" is replaced by the tag.
+                A local directory with a sub-directory named after the tag
+                uses that sub-directory.
+            tag: Template tag
+            refresh: Fetch again even if the tag is cached
+        
+        Returns:
+            Tuple of tree digest and tree
+        
+        Raises:
+            ConfigurationError: If the provider is unknown or the template
+                cannot be fetched
+        """
+        if provider not in self.PROVIDERS:
+            raise ConfigurationError(
+                f"Template provider '{provider}' is not supported. Available providers: {', '.join(self.PROVIDERS)}"
+            )
+        url = url.replace("{tag}", tag)
+        key = f"{provider}|{url}|{tag}"
+        entry = self._read_index().get(key)
+        
+        if provider == "local":
+            source = _local_path(url)
+            if (source / tag).is_dir():
+                source = source / tag
+            if not source.exists():
+                raise ConfigurationError(f"Template not found: {source}")
+            signature = self._directory_signature(source) if source.is_dir() else str(source.stat().st_mtime_ns)
+            if entry and not refresh and entry.get("signature") == signature:
+                tree = self.load_tree(entry["tree"])
+                if tree is not None:
+                    return entry["tree"], tree
+            log_info(f"Indexing template {source}")
+            files = self._directory_files(source) if source.is_dir() else self._archive_files(source)
+            tree_digest, tree = self._ingest(files)
+        else:
+            if entry and not refresh:
+                tree = self.load_tree(entry["tree"])
+                if tree is not None:
+                    return entry["tree"], tree
+            from utils.download import download
+            
+            log_info(f"Fetching template {url}")
+            partial = cache_dir("downloads") / f"template-{_digest(key.encode())[:16]}.part"
+            partial.unlink(missing_ok=True)
+            try:
+                archive = download(url, partial)
+            except ToolsCLIException as e:
+                raise ConfigurationError(f"Could not fetch template: {e}")
+            try:
+                tree_digest, tree = self._ingest(self._archive_files(archive))
+            finally:
+                archive.unlink(missing_ok=True)
+            signature = None
+        
+        self._update_index(key, {"tree": tree_digest, "signature": signature})
+        return tree_digest, tree
+
+
+class TemplateRenderer:
+    """
+    Renders a template tree into a directory, incrementally.
+    
+    ``*.tmpl`` files are rendered with ``string.Template`` (``$name`` /
+    ``${name}`` placeholders, ``$$`` for a literal dollar); other files are
+    copied. Every output remembers the blob digest and variables it was
+    produced from, so unchanged outputs are left alone and outputs whose
+    source disappeared are removed.
+    """
+    
+    def __init__(self, store: TemplateStore):
+        """
+        Initialize renderer.
+        
+        Args:
+            store: Store holding the template blobs
+        """
+        self.store = store
+    
+    def render(self, tree: Dict[str, str], output: Path, variables: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Render a tree into a directory.
+        
+        Args:
+            tree: Relative paths and blob digests
+            output: Output directory
+            variables: Placeholder values
+        
+        Returns:
+            Dictionary with the number of rendered, reused and removed files
+        
+        Raises:
+            ConfigurationError: If a template uses an unknown placeholder or
+                a path would land outside the output directory
+        """
+        output.mkdir(parents=True, exist_ok=True)
+        root = output.resolve()
+        
+        def inside(target: str) -> bool:
+            path = (output / target).resolve()
+            return path != root and path.is_relative_to(root)
+        
+        state_path = output / RENDER_STATE
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            state = {}
+        variables_digest = _digest(json.dumps(variables, sort_keys=True, default=str).encode())
+        
+        counts = {"rendered": 0, "reused": 0, "removed": 0}
+        new_state = {}
+        for relative, digest in sorted(tree.items()):
+            is_template = relative.endswith(TEMPLATE_SUFFIX)
+            target = relative[:-len(TEMPLATE_SUFFIX)] if is_template else relative
+            # Copied files don't depend on the variables
+            key = f"{digest}:{variables_digest}" if is_template else digest
+            if not inside(target):
+                raise ConfigurationError(f"Template path {relative!r} leaves the output directory")
+            new_state[target] = key
+            if state.get(target) == key and (output / target).exists():
+                counts["reused"] += 1
+                continue
+            
+            data = self.store.blob_path(digest).read_bytes()
+            if is_template:
+                try:
+                    data = Template(data.decode("utf-8")).substitute(variables).encode("utf-8")
+                except KeyError as e:
+                    raise ConfigurationError(f"Template {relative} uses undefined variable {e}")
+                except ValueError as e:
+                    raise ConfigurationError(f"Invalid placeholder in template {relative}: {e}")
+            TemplateStore._write_atomic(output / target, data)
+            counts["rendered"] += 1
+        
+        for target in set(state) - set(new_state):
+            if not inside(target):
+                continue
+            try:
+                (output / target).unlink()
+                counts["removed"] += 1
+            except OSError:
+                pass
+        
+        TemplateStore._write_atomic(state_path, json.dumps(new_state, indent=2, sort_keys=True).encode())
+        return counts
+
+
+class Templates:
+    """
+    Resolves and renders the template described by ``templateConfig``.
+    
+    The template is resolved at most once per process; per-cluster outputs
+    live under ``<cache dir>/templates/rendered/<cluster>``.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, store: Optional[TemplateStore] = None):
+        """
+        Initialize templates.
+        
+        Args:
+            config: Configuration dictionary with an optional templateConfig
+                section (templateProvider, templateTag, templateUrl, values)
+            store: Template store (default: the one in the cache directory)
+        """
+        settings = (config or {}).get("templateConfig") or {}
+        self.provider = settings.get("templateProvider") or "local"
+        self.tag = str(settings.get("templateTag") or "latest")
+        self.url = settings.get("templateUrl") or ""
+        self.values = settings.get("values") or {}
+        self._store = store
+        self._resolved: Optional[Tuple[str, Dict[str, str]]] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether a template is configured."""
+        return bool(self.url)
+    
+    @property
+    def store(self) -> TemplateStore:
+        if self._store is None:
+            self._store = TemplateStore()
+        return self._store
+    
+    def resolve(self, refresh: bool = False) -> Tuple[str, Dict[str, str]]:
+        """
+        Resolve the configured template.
+        
+        Returns:
+            Tuple of tree digest and tree
+        """
+        with self._lock:
+            if self._resolved is None or refresh:
+                self._resolved = self.store.resolve(self.provider, self.url, self.tag, refresh=refresh)
+            return self._resolved
+    
+    def render(self, cluster_name: str) -> Optional[Path]:
+        """
+        Render the template for a cluster.
+        
+        Args:
+            cluster_name: Cluster name, available as $cluster_name
+        
+        Returns:
+            Output directory, or None when no template is configured
+        
+        Raises:
+            ConfigurationError: If the cluster name is not a valid k3d name,
+                or the template cannot be fetched or rendered
+        """
+        if not self.enabled:
+            return None
+        # The name becomes a directory under the cache
+        if not re.match(CLUSTER_NAME_PATTERN, cluster_name):
+            raise ConfigurationError(
+                f"Invalid cluster name '{cluster_name}': expected lowercase letters, digits and '-', at most 32 characters"
+            )
+        
+        _, tree = self.resolve()
+        variables = {**self.values, "cluster_name": cluster_name, "template_tag": self.tag}
+        output = cache_dir("templates", "rendered", cluster_name)
+        counts = TemplateRenderer(self.store).render(tree, output, variables)
+        logger.debug("Template for '%s': %s", cluster_name, counts)
+        return output
@@ -0,0 +1,141 @@
+"""Persistent cache of tool detection results."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+from utils.paths import cache_dir
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ToolDetectionCache:
+    """
+    On-disk cache of tool probe results keyed on binary identity.
+    
+    An entry is only reused while the resolved binary keeps the same path,
+    mtime, size and inode, and while it is younger than the TTL.
+    """
+    
+    DEFAULT_TTL = 24 * 60 * 60
+    
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        """
+        Initialize detection cache.
+        
+        Args:
+            path: Cache file path (default: <cache dir>/tools.json)
+            ttl: Maximum entry age in seconds
+        """
+        self.path = Path(path) if path else cache_dir() / "tools.json"
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def binary_identity(binary_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the identity of a binary on disk.
+        
+        Args:
+            binary_path: Path to the binary (symlinks are resolved)
+            
+        Returns:
+            Identity dictionary, or None if the binary cannot be stat'ed
+        """
+        try:
+            resolved = os.path.realpath(binary_path)
+            stat = os.stat(resolved)
+        except OSError:
+            return None
+        return {
+            "path": resolved,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "inode": stat.st_ino,
+        }
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read cache entries from disk once."""
+        with self._lock:
+            if self._entries is None:
+                try:
+                    with open(self.path, "r") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+            return self._entries
+    
+    def get(self, tool_name: str, binary_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached probe result.
+        
+        Args:
+            tool_name: Name of the tool
+            binary_path: Path the tool currently resolves to on PATH
+            
+        Returns:
+            Cached probe result, or None on miss, expiry or identity change
+        """
+        entry = self._load().get(tool_name)
+        if not entry:
+            return None
+        if time.time() - entry.get("checked_at", 0) > self.ttl:
+            return None
+        if entry.get("identity") != self.binary_identity(binary_path):
+            return None
+        return entry["result"]
+    
+    def put(self, tool_name: str, binary_path: str, result: Dict[str, Any]):
+        """
+        Store a probe result.
+        
+        Args:
+            tool_name: Name of the tool
+            binary_path: Path the tool resolved to when probed
+            result: Probe result dictionary
+        """
+        identity = self.binary_identity(binary_path)
+        if identity is None:
+            return
+        with self._lock:
+            self._load()[tool_name] = {
+                "identity": identity,
+                "checked_at": time.time(),
+                "result": result,
+            }
+            self._dirty = True
+    
+    def invalidate(self, tool_name: Optional[str] = None):
+        """
+        Drop one entry, or every entry when no tool name is given.
+        
+        Args:
+            tool_name: Name of the tool to invalidate
+        """
+        with self._lock:
+            entries = self._load()
+            if tool_name is None:
+                entries.clear()
+            else:
+                entries.pop(tool_name, None)
+            self._dirty = True
+            self.save()
+    
+    def save(self):
+        """Write pending changes to disk atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                logger.debug(f"Could not write tool cache {self.path}: {e}")
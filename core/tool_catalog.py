@@ -0,0 +1,45 @@
+"""
+Catalog of the tools the CLI can install.
+
+Kept free of imports: shell completion reads it on every TAB.
+"""
+
+SUPPORTED_TOOLS = {
+    "kubectl": {
+        "description": "Kubernetes command-line tool",
+        "check_command": ["kubectl", "version", "--client"],
+        "version": "v1.29.2",
+        "download": {
+            "url": "https://dl.k8s.io/release/{version}/bin/{os}/{arch}/kubectl",
+            "checksum_url": "https://dl.k8s.io/release/{version}/bin/{os}/{arch}/kubectl.sha256",
+        },
+    },
+    "helm": {
+        "description": "Kubernetes package manager",
+        "check_command": ["helm", "version"],
+        "version": "v3.14.0",
+        "download": {
+            "url": "https://get.helm.sh/helm-{version}-{os}-{arch}.tar.gz",
+            "checksum_url": "https://get.helm.sh/helm-{version}-{os}-{arch}.tar.gz.sha256sum",
+            "archive_member": "{os}-{arch}/helm",
+        },
+    },
+    "k3d": {
+        "description": "k3s in Docker - lightweight Kubernetes",
+        "check_command": ["k3d", "version"],
+        "version": "v5.6.0",
+        "download": {
+            "url": "https://github.com/k3d-io/k3d/releases/download/{version}/k3d-{os}-{arch}",
+            "checksum_url": "https://github.com/k3d-io/k3d/releases/download/{version}/checksums.txt",
+        },
+    },
+    "argocd": {
+        "description": "GitOps toolkit for Kubernetes",
+        "check_command": ["argocd", "version", "--client"],
+        "version": "v2.10.1",
+        "download": {
+            "url": "https://github.com/argoproj/argo-cd/releases/download/{version}/argocd-{os}-{arch}",
+            "checksum_url": "https://github.com/argoproj/argo-cd/releases/download/{version}/cli_checksums.txt",
+        },
+    },
+}
@@ -1,33 +1,75 @@
 """Tool installation and management."""
 
-import subprocess
-from typing import List, Dict
-from utils.logger import setup_logger, log_success, log_error, log_info
+import os
+import platform
+import re
+import shutil
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from core.artifact_store import ArtifactStore
+from core.tool_cache import ToolDetectionCache
+from core.tool_catalog import SUPPORTED_TOOLS
+from utils.download import download, fetch_text
+from utils.exceptions import ToolInstallationError
+from utils.logger import queued_logging, setup_logger, log_success, log_error, log_info, log_warning
+from utils.paths import cache_dir
 
 logger = setup_logger(__name__)
 
+# Matches the first semantic-looking version in a tool's version output,
+# e.g. "v1.29.2", "v3.14.0+g3fc9f4b" or "5.6.0".
+VERSION_PATTERN = re.compile(r"v?(\d+\.\d+(?:\.\d+)?(?:[-+][0-9A-Za-z.-]+)?)")
+
 
 class ToolManager:
     """Manages installation and listing of development tools."""
     
-    SUPPORTED_TOOLS = {
-        "kubectl": {
-            "description": "Kubernetes command-line tool",
-            "check_command": ["kubectl", "version", "--client"],
-        },
-        "helm": {
-            "description": "Kubernetes package manager",
-            "check_command": ["helm", "version"],
-        },
-        "k3d": {
-            "description": "k3s in Docker - lightweight Kubernetes",
-            "check_command": ["k3d", "version"],
-        },
-        "argocd": {
-            "description": "GitOps toolkit for Kubernetes",
-            "check_command": ["argocd", "version", "--client"],
-        },
-    }
+    SUPPORTED_TOOLS = SUPPORTED_TOOLS
+    
+    # Bounds for the concurrent probe engine
+    PROBE_MAX_WORKERS = 8
+    PROBE_TIMEOUT = 5.0
+    
+    # Maximum concurrent installs in install_multiple_tools
+    INSTALL_MAX_WORKERS = 4
+    
+    def __init__(
+        self,
+        refresh: bool = False,
+        cache: Optional[ToolDetectionCache] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize tool manager.
+        
+        Args:
+            refresh: Ignore cached detection results and re-probe every tool
+            cache: Detection cache (default: the on-disk cache)
+            config: Configuration dictionary; the optional ``toolsConfig``
+                section sets mirrorUrl, installDir, versions, checksums
+                and maxParallel
+        """
+        self.refresh = refresh
+        self.cache = cache if cache is not None else ToolDetectionCache()
+        self.tools_config = (config or {}).get("toolsConfig") or {}
+        self.install_dir = Path(
+            os.path.expanduser(self.tools_config.get("installDir", "~/.local/bin"))
+        )
+        self._store: Optional[ArtifactStore] = None
+        self._store_lock = threading.Lock()
+    
+    @property
+    def store(self) -> ArtifactStore:
+        """Content-addressed artifact store (created on first use)."""
+        # Parallel installs reach this from worker threads; they must all
+        # share one store
+        with self._store_lock:
+            if self._store is None:
+                self._store = ArtifactStore()
+            return self._store
     
     def list_tools(self) -> Dict[str, Dict]:
         """
@@ -48,28 +90,242 @@ class ToolManager:
         Returns:
             True if installed, False otherwise
         """
+        return self.probe_tool(tool_name)["installed"]
+    
+    @staticmethod
+    def parse_version(output: str) -> Optional[str]:
+        """
+        Extract a version string from a tool's version output.
+        
+        Args:
+            output: Combined stdout/stderr of the check command
+            
+        Returns:
+            Version string without a leading "v", or None if not found
+        """
+        match = VERSION_PATTERN.search(output or "")
+        return match.group(1) if match else None
+    
+    def _new_probe_result(self, tool_name: str) -> Dict[str, Any]:
+        """Create an empty probe result for a tool."""
+        return {
+            "name": tool_name,
+            "installed": False,
+            "version": None,
+            "path": None,
+            "error": None,
+        }
+    
+    def _resolve(self, tool_name: str) -> Dict[str, Any]:
+        """
+        Resolve a tool on PATH and consult the detection cache.
+        
+        Returns a complete result when no process needs to be spawned, or a
+        partial result with only the path filled in when the tool must be run.
+        """
+        result = self._new_probe_result(tool_name)
+        
         if tool_name not in self.SUPPORTED_TOOLS:
-            return False
+            result["error"] = "not supported"
+            return result
         
         check_command = self.SUPPORTED_TOOLS[tool_name]["check_command"]
+        path = shutil.which(check_command[0])
+        if path is None:
+            result["error"] = "not found on PATH"
+            return result
+        result["path"] = path
         
-        try:
-            result = subprocess.run(
-                check_command,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
+        if not self.refresh:
+            cached = self.cache.get(tool_name, path)
+            if cached is not None:
+                return dict(cached, cached=True)
+        return result
+    
+    def _run_probe(self, result: Dict[str, Any], timeout: Optional[float]) -> bool:
+        """
+        Run a tool's check command and fill in the probe result.
+        
+        Returns:
+            True if the result may be cached; timeouts and spawn errors are
+            treated as transient and are not
+        """
+        # Imported here: it loads asyncio, which tool name completion avoids
+        from utils.command_runner import get_runner
+        
+        check_command = self.SUPPORTED_TOOLS[result["name"]]["check_command"]
+        
+        completed = get_runner().run(
+            [result["path"]] + check_command[1:],
+            timeout=timeout if timeout is not None else self.PROBE_TIMEOUT,
+            retries=0,
+        )
+        if completed.timed_out:
+            result["error"] = "timed out"
+            return False
+        if completed.error:
+            result["error"] = completed.error
             return False
+        
+        result["installed"] = completed.returncode == 0
+        result["version"] = self.parse_version(completed.stdout + completed.stderr)
+        if not result["installed"]:
+            result["error"] = f"exited with code {completed.returncode}"
+        return True
     
-    def install_tool(self, tool_name: str) -> bool:
+    @staticmethod
+    def _needs_probe(result: Dict[str, Any]) -> bool:
+        """Check whether a resolved result still requires running the tool."""
+        return result["path"] is not None and not result["installed"] and result["error"] is None
+    
+    def probe_tool(self, tool_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
-        Install a tool (placeholder - actual implementation would vary by OS).
+        Probe a single tool for presence and version.
+        
+        A PATH lookup and the detection cache are consulted first, so that
+        missing or unchanged tools never spawn a process.
+        
+        Args:
+            tool_name: Name of the tool
+            timeout: Seconds to wait for the check command (default: PROBE_TIMEOUT)
+            
+        Returns:
+            Dictionary with name, installed, version, path and error keys
+        """
+        return self.probe_tools([tool_name], timeout=timeout)[tool_name]
+    
+    def probe_tools(
+        self,
+        tool_names: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Probe several tools concurrently with a bounded worker pool.
+        
+        Args:
+            tool_names: Tools to probe (default: all supported tools)
+            max_workers: Maximum concurrent probes (default: PROBE_MAX_WORKERS)
+            timeout: Per-probe timeout in seconds (default: PROBE_TIMEOUT)
+            
+        Returns:
+            Dictionary of tool names and probe results, in the requested order
+        """
+        names = list(tool_names) if tool_names is not None else list(self.SUPPORTED_TOOLS)
+        results = {name: self._resolve(name) for name in names}
+        pending = [result for result in results.values() if self._needs_probe(result)]
+        
+        if pending:
+            workers = min(max_workers or self.PROBE_MAX_WORKERS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                cacheable = list(executor.map(lambda result: self._run_probe(result, timeout), pending))
+            for result, ok in zip(pending, cacheable):
+                if ok:
+                    self.cache.put(result["name"], result["path"], result)
+            self.cache.save()
+        
+        return results
+    
+    @staticmethod
+    def _platform() -> Dict[str, str]:
+        """Get the os/arch pair used in release download URLs."""
+        machine = platform.machine().lower()
+        arch = {"x86_64": "amd64", "aarch64": "arm64"}.get(machine, machine)
+        return {"os": platform.system().lower(), "arch": arch}
+    
+    def _download_spec(self, tool_name: str) -> Dict[str, Any]:
+        """
+        Resolve download URLs and the expected checksum source for a tool.
+        
+        With ``toolsConfig.mirrorUrl`` set, files are fetched from
+        ``<mirror>/<tool>/<version>/<filename>`` instead of upstream.
+        """
+        tool_info = self.SUPPORTED_TOOLS[tool_name]
+        values = dict(self._platform())
+        values["version"] = self.tools_config.get("versions", {}).get(tool_name, tool_info["version"])
+        
+        download_info = tool_info["download"]
+        url = download_info["url"].format(**values)
+        checksum_url = download_info["checksum_url"].format(**values)
+        
+        mirror = self.tools_config.get("mirrorUrl")
+        if mirror:
+            base = f"{mirror.rstrip('/')}/{tool_name}/{values['version']}"
+            url = f"{base}/{url.rsplit('/', 1)[-1]}"
+            checksum_url = f"{base}/{checksum_url.rsplit('/', 1)[-1]}"
+        
+        member = download_info.get("archive_member")
+        return {
+            "url": url,
+            "checksum_url": checksum_url,
+            "sha256": self.tools_config.get("checksums", {}).get(tool_name),
+            "archive_member": member.format(**values) if member else None,
+            "key": f"{tool_name}/{values['version']}/{values['os']}-{values['arch']}",
+        }
+    
+    @staticmethod
+    def _parse_checksum(text: str, filename: str) -> str:
+        """
+        Extract a SHA-256 from a checksum file.
+        
+        Handles bare digests as well as ``sha256sum`` style listings that
+        cover several files.
+        """
+        for line in text.splitlines():
+            fields = line.split()
+            if len(fields) == 1 and len(fields[0]) == 64:
+                return fields[0]
+            if len(fields) >= 2 and fields[-1].lstrip("*") == filename:
+                return fields[0]
+        raise ToolInstallationError(f"No checksum for {filename} found")
+    
+    def _fetch_artifact(self, tool_name: str) -> Path:
+        """
+        Get the verified binary for a tool from the store, downloading it
+        on a store miss.
+        """
+        spec = self._download_spec(tool_name)
+        # A pinned checksum must match the download the stored blob came from
+        blob = self.store.lookup(spec["key"], spec["sha256"])
+        if blob is not None:
+            log_info(f"Using stored artifact for {spec['key']}")
+            return blob
+        
+        filename = spec["url"].rsplit("/", 1)[-1]
+        expected = spec["sha256"] or self._parse_checksum(fetch_text(spec["checksum_url"]), filename)
+        
+        downloads = cache_dir("downloads")
+        partial = downloads / f"{filename}.{expected[:12]}.part"
+        log_info(f"Downloading {spec['url']}")
+        archive = download(spec["url"], partial, expected_sha256=expected)
+        
+        if spec["archive_member"]:
+            binary = downloads / f"{tool_name}.{expected[:12]}.bin"
+            try:
+                with tarfile.open(archive, "r:*") as tar:
+                    member = tar.extractfile(spec["archive_member"])
+                    if member is None:
+                        raise KeyError(spec["archive_member"])
+                    with open(binary, "wb") as f:
+                        shutil.copyfileobj(member, f)
+            except (KeyError, tarfile.TarError) as e:
+                raise ToolInstallationError(f"Could not extract {tool_name} from {filename}: {e}")
+            os.unlink(archive)
+            archive = binary
+        
+        return self.store.add(spec["key"], archive, expected)
+    
+    def install_tool(self, tool_name: str, force: bool = False) -> bool:
+        """
+        Install a tool from its release binaries.
+        
+        The download is verified against its SHA-256 and kept in the
+        content-addressed store, so installing the same version again only
+        links or copies the stored binary into the install directory.
         
         Args:
             tool_name: Name of the tool to install
+            force: Install even if the tool is already present
             
         Returns:
             True if successful
@@ -78,30 +334,44 @@ class ToolManager:
             log_error(f"Tool '{tool_name}' is not supported")
             return False
         
-        if self.check_tool_installed(tool_name):
+        if not force and self.check_tool_installed(tool_name):
             log_info(f"Tool '{tool_name}' is already installed")
             return True
         
         log_info(f"Installing {tool_name}...")
         
-        # Placeholder: Real implementation would use package managers
-        # or download binaries based on OS
-        log_info(f"Placeholder: Would install {tool_name} here")
-        log_info(f"Please install {tool_name} manually for now")
+        try:
+            blob = self._fetch_artifact(tool_name)
+            destination = self.install_dir / tool_name
+            ArtifactStore.materialize(blob, destination)
+        except (ToolInstallationError, OSError) as e:
+            log_error(f"Failed to install {tool_name}: {e}")
+            return False
+        finally:
+            self.cache.invalidate(tool_name)
         
-        return False
+        if str(self.install_dir) not in os.environ.get("PATH", "").split(os.pathsep):
+            log_warning(f"{self.install_dir} is not on PATH")
+        logger.debug(f"Installed {tool_name} to {destination}")
+        return True
     
-    def install_multiple_tools(self, tool_names: List[str]) -> Dict[str, bool]:
+    def install_multiple_tools(self, tool_names: List[str], force: bool = False) -> Dict[str, bool]:
         """
-        Install multiple tools.
+        Install multiple tools concurrently.
         
         Args:
             tool_names: List of tool names
+            force: Install even if tools are already present
             
         Returns:
             Dictionary of tool names and installation status
         """
-        results = {}
-        for tool_name in tool_names:
-            results[tool_name] = self.install_tool(tool_name)
-        return results
+        # Installs of the same tool would share one partial download
+        tool_names = list(dict.fromkeys(tool_names))
+        if not tool_names:
+            return {}
+        
+        workers = min(int(self.tools_config.get("maxParallel", self.INSTALL_MAX_WORKERS)), len(tool_names))
+        with queued_logging(), ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            results = executor.map(lambda name: self.install_tool(name, force=force), tool_names)
+            return dict(zip(tool_names, results))
@@ -1,11 +1,25 @@
 """Abstract base class for cloud providers."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+
+async def _to_thread(func, *args, **kwargs):
+    """Run a blocking provider method in a worker thread."""
+    # Imported here: asyncio is only needed once an event loop is running,
+    # and keeping it off the import path speeds up shell completion
+    import asyncio
+    return await asyncio.to_thread(func, *args, **kwargs)
 
 
 class BaseProvider(ABC):
-    """Abstract base class for cluster providers following Open/Closed Principle."""
+    """
+    Abstract base class for cluster providers following Open/Closed Principle.
+    
+    Every blocking operation has an ``a``-prefixed coroutine counterpart.
+    The defaults run the blocking method in a worker thread; providers that
+    can await their I/O natively override them.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         """
@@ -78,3 +92,55 @@ class BaseProvider(ABC):
             True if successful, False otherwise
         """
         pass
+    
+    def preload_images(self, name: str, images: Optional[List[str]] = None, parallel: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Import image tarballs into a cluster's nodes.
+        
+        Args:
+            name: Cluster name
+            images: Tarball paths (default: from preloadConfig)
+            parallel: Imports in flight
+        
+        Returns:
+            Dictionary of tarballs and whether they were imported
+        
+        Raises:
+            ClusterOperationError: If the provider cannot preload images
+        """
+        from utils.exceptions import ClusterOperationError
+        raise ClusterOperationError(f"{type(self).__name__} does not support image preloading")
+    
+    def reset_cache(self):
+        """
+        Forget state cached from earlier calls.
+        
+        Called between commands by long-lived processes; providers that
+        cache cluster state override it.
+        """
+    
+    async def acreate_cluster(self, name: str, **kwargs) -> bool:
+        """Async variant of create_cluster."""
+        return await _to_thread(self.create_cluster, name, **kwargs)
+    
+    async def adelete_cluster(self, name: str) -> bool:
+        """Async variant of delete_cluster."""
+        return await _to_thread(self.delete_cluster, name)
+    
+    async def alist_clusters(self) -> list:
+        """Async variant of list_clusters."""
+        return await _to_thread(self.list_clusters)
+    
+    async def aget_cluster_info(self, name: str) -> Dict[str, Any]:
+        """Async variant of get_cluster_info."""
+        return await _to_thread(self.get_cluster_info, name)
+    
+    async def abootstrap_cluster(self, name: str) -> bool:
+        """Async variant of bootstrap_cluster."""
+        return await _to_thread(self.bootstrap_cluster, name)
+    
+    async def apreload_images(
+        self, name: str, images: Optional[List[str]] = None, parallel: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """Async variant of preload_images."""
+        return await _to_thread(self.preload_images, name, images, parallel)
@@ -1,58 +1,189 @@
 """Local k3d cluster provider implementation."""
 
-import subprocess
-from typing import Dict, Any, List
+import json
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
 from providers.base_provider import BaseProvider
-from utils.exceptions import ClusterOperationError
-from utils.logger import setup_logger, log_success, log_error, log_info
+from utils.command_runner import get_runner
+from utils.exceptions import ClusterOperationError, ToolsCLIException
+from utils.logger import get_log_console, log_format, setup_logger, log_success, log_error, log_info, log_warning
 
 logger = setup_logger(__name__)
 
+# k3d log lines -> create phase, checked in order (registry nodes mention
+# "node" too, so registry and load balancer come first)
+CREATE_PHASES = [
+    ("registry", re.compile(r"registry", re.IGNORECASE)),
+    ("loadbalancer", re.compile(r"loadbalancer|serverlb", re.IGNORECASE)),
+    ("network", re.compile(r"network", re.IGNORECASE)),
+    ("volumes", re.compile(r"volume", re.IGNORECASE)),
+    ("nodes", re.compile(r"node|servers|agents|starting cluster", re.IGNORECASE)),
+    ("finalize", re.compile(r"inject|kubeconfig|created successfully", re.IGNORECASE)),
+]
+
+
+# A console shows one live display at a time; concurrent creates past the
+# first one report their phases as log lines
+_live_lock = threading.Lock()
+_live_busy = False
+
+
+class CreateProgress:
+    """
+    Turns streamed ``k3d cluster create`` output into phase progress.
+    
+    On a terminal the current phase is shown on one live status line of the
+    shared log console; otherwise each phase change is a log line. The time
+    spent in every phase is accumulated for a closing summary.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Initialize progress tracker.
+        
+        Args:
+            name: Cluster name used to prefix progress lines
+        """
+        self.name = name
+        self.started = time.monotonic()
+        self.phase: Optional[str] = None
+        self.phase_started = self.started
+        self.timings: Dict[str, float] = {}
+        self._status = None
+        self._status_checked = False
+    
+    def _start_status(self):
+        """Start the live status line if logs go to a terminal and no other create has one."""
+        global _live_busy
+        if log_format() != "rich" or not get_log_console().is_terminal:
+            return None
+        with _live_lock:
+            if _live_busy:
+                return None
+            _live_busy = True
+        status = get_log_console().status(f"{self.name}: starting")
+        status.start()
+        return status
+    
+    def _stop_status(self):
+        """Remove the live status line, if this create has one."""
+        global _live_busy
+        if self._status is not None:
+            self._status.stop()
+            self._status = None
+            with _live_lock:
+                _live_busy = False
+    
+    def _close_phase(self, now: float):
+        """Add the time since the last phase change to the current phase."""
+        if self.phase is not None:
+            self.timings[self.phase] = self.timings.get(self.phase, 0.0) + now - self.phase_started
+        self.phase_started = now
+    
+    def on_line(self, line: str):
+        """Handle one line of k3d output."""
+        logger.debug(line)
+        for phase, pattern in CREATE_PHASES:
+            if pattern.search(line):
+                break
+        else:
+            return
+        
+        if phase != self.phase:
+            now = time.monotonic()
+            self._close_phase(now)
+            self.phase = phase
+            message = f"[{now - self.started:6.1f}s] {self.name}: {phase}"
+            if not self._status_checked:
+                self._status_checked = True
+                self._status = self._start_status()
+            if self._status is not None:
+                self._status.update(message)
+            else:
+                log_info(message)
+    
+    def finish(self) -> Dict[str, float]:
+        """
+        Close the current phase and report per-phase timings.
+        
+        Returns:
+            Dictionary of phase names and seconds spent in them
+        """
+        self._close_phase(time.monotonic())
+        self._stop_status()
+        if self.timings:
+            summary = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.timings.items())
+            log_info(f"{self.name}: phase timings: {summary}")
+        return self.timings
+
 
 class LocalProvider(BaseProvider):
     """Local k3d cluster provider."""
     
+    # Seconds before a k3d sub-command is considered hung
+    COMMAND_TIMEOUTS = {
+        "create": 600.0,
+        "delete": 300.0,
+        "list": 60.0,
+        "default": 120.0,
+    }
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize local provider."""
         super().__init__(config)
         self.provider_type = "k3d"
+        self._snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+        self._flux = None
+        self._templates = None
+        self._registry = None
+        self._preloader = None
     
-    def _run_command(self, command: List[str]) -> tuple:
+    def _run_command(self, command: List[str], timeout: Optional[float] = None, read_only: bool = False) -> tuple:
         """
         Run shell command and return output.
         
         Args:
             command: Command as list of strings
+            timeout: Seconds before the command is killed (default: by sub-command)
+            read_only: Retry transient failures (only safe for reads)
             
         Returns:
             Tuple of (stdout, stderr, return_code)
         """
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return result.stdout, result.stderr, result.returncode
-        except Exception as e:
-            logger.error(f"Command execution failed: {e}")
-            return "", str(e), 1
+        result = get_runner().run(command, timeout=timeout or self._timeout_for(command), read_only=read_only)
+        return result.stdout, result.stderr, result.returncode
     
-    def create_cluster(self, name: str, **kwargs) -> bool:
+    async def _arun_command(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        read_only: bool = False,
+    ) -> tuple:
         """
-        Create a local k3d cluster.
+        Run shell command without blocking the event loop.
+        
+        The child process group is killed if the awaiting task is cancelled.
         
         Args:
-            name: Cluster name
-            **kwargs: Additional parameters (ports_to_open, registry, etc.)
+            command: Command as list of strings
+            timeout: Seconds before the command is killed (default: by sub-command)
+            read_only: Retry transient failures (only safe for reads)
             
         Returns:
-            True if successful
+            Tuple of (stdout, stderr, return_code)
         """
-        log_info(f"Creating local k3d cluster: {name}")
+        result = await get_runner().arun(command, timeout=timeout or self._timeout_for(command), read_only=read_only)
+        return result.stdout, result.stderr, result.returncode
         
-        # Build k3d command
+    def _timeout_for(self, command: List[str]) -> float:
+        """Get the timeout for a k3d command from its sub-command."""
+        action = command[2] if len(command) > 2 else ""
+        return self.COMMAND_TIMEOUTS.get(action, self.COMMAND_TIMEOUTS["default"])
+    
+    def _create_command(self, name: str, **kwargs) -> List[str]:
+        """Build the k3d command for create_cluster."""
         command = ["k3d", "cluster", "create", name]
         
         # Add port mappings if specified
@@ -61,32 +192,117 @@ class LocalProvider(BaseProvider):
             for port in ports.split(","):
                 command.extend(["-p", f"{port.strip()}:{port.strip()}@loadbalancer"])
         
-        # Add registry if specified
-        if kwargs.get("use_registry", self.config.get("useLocalRegistry", False)):
+        # Add registry if specified: the shared pull-through registry when
+        # configured, otherwise one registry per cluster
+        if self._uses_shared_registry(**kwargs):
+            command.extend(self.registry.create_args())
+        elif kwargs.get("use_registry", self.config.get("useLocalRegistry", False)):
             registry_name = f"{name}-registry"
             command.extend(["--registry-create", registry_name])
         
-        stdout, stderr, returncode = self._run_command(command)
+        # A k3d config file rendered from the cluster template
+        rendered = self.templates.render(name)
+        if rendered is not None and (rendered / "k3d.yaml").exists():
+            command.extend(["--config", str(rendered / "k3d.yaml")])
+        
+        return command
+    
+    def _uses_shared_registry(self, **kwargs) -> bool:
+        """Check whether a create attaches the cluster to the shared registry."""
+        return self.registry.enabled and bool(kwargs.get("use_registry", self.config.get("useLocalRegistry", False)))
+    
+    def _finish_create(self, name: str, stdout: str, stderr: str, returncode: int) -> bool:
+        """Interpret the result of a k3d cluster create."""
+        self.invalidate_snapshot()
         
         if returncode == 0:
             log_success(f"Cluster '{name}' created successfully")
             return True
         else:
-            log_error(f"Failed to create cluster: {stderr}")
-            raise ClusterOperationError(f"Cluster creation failed: {stderr}")
+            output = (stderr or stdout).strip()
+            log_error(f"Failed to create cluster: {output}")
+            raise ClusterOperationError(f"Cluster creation failed: {output}")
+    
+    def create_cluster(self, name: str, **kwargs) -> bool:
+        """
+        Create a local k3d cluster.
+        
+        Args:
+            name: Cluster name
+            **kwargs: Additional parameters (ports_to_open, registry, etc.)
+            
+        Returns:
+            True if successful
+        """
+        log_info(f"Creating local k3d cluster: {name}")
+        if self._uses_shared_registry(**kwargs):
+            self.registry.ensure()
+        command = self._create_command(name, **kwargs)
+        
+        # Stream k3d's output so long creates report progress as they go
+        progress = CreateProgress(name)
+        try:
+            result = get_runner().stream(command, on_line=progress.on_line, timeout=self._timeout_for(command))
+        finally:
+            progress.finish()
+        created = self._finish_create(name, result.stdout, result.stderr, result.returncode)
+        if self.preloader.on_create and self.preloader.images:
+            # The cluster exists either way; a failed preload must not make
+            # callers treat the create as failed and skip recording it
+            try:
+                self.preloader.preload(name)
+            except ToolsCLIException as e:
+                log_warning(f"Cluster '{name}' created, but image preload failed: {e}")
+        return created
+    
+    async def acreate_cluster(self, name: str, **kwargs) -> bool:
+        """Create a local k3d cluster without blocking the event loop."""
+        log_info(f"Creating local k3d cluster: {name}")
+        if self._uses_shared_registry(**kwargs):
+            await self.registry.aensure()
+        command = self._create_command(name, **kwargs)
+        
+        progress = CreateProgress(name)
+        try:
+            result = await get_runner().astream(command, on_line=progress.on_line, timeout=self._timeout_for(command))
+        finally:
+            progress.finish()
+        created = self._finish_create(name, result.stdout, result.stderr, result.returncode)
+        if self.preloader.on_create and self.preloader.images:
+            try:
+                await self.preloader.apreload(name)
+            except ToolsCLIException as e:
+                log_warning(f"Cluster '{name}' created, but image preload failed: {e}")
+        return created
+    
+    def _check_exists(self, name: str, snapshot: Dict[str, Dict[str, Any]]):
+        """Raise if a cluster is missing from the snapshot."""
+        if name not in snapshot:
+            log_error(f"Cluster '{name}' not found")
+            raise ClusterOperationError(f"Cluster '{name}' does not exist")
     
     def delete_cluster(self, name: str) -> bool:
         """Delete a local k3d cluster."""
         log_info(f"Deleting local k3d cluster: {name}")
         
         # First check if cluster exists
-        existing_clusters = self.list_clusters()
-        if name not in existing_clusters:
-            log_error(f"Cluster '{name}' not found")
-            raise ClusterOperationError(f"Cluster '{name}' does not exist")
+        self._check_exists(name, self._get_snapshot())
         
         command = ["k3d", "cluster", "delete", name]
-        stdout, stderr, returncode = self._run_command(command)
+        return self._finish_delete(name, *self._run_command(command))
+    
+    async def adelete_cluster(self, name: str) -> bool:
+        """Delete a local k3d cluster without blocking the event loop."""
+        log_info(f"Deleting local k3d cluster: {name}")
+        
+        self._check_exists(name, await self._aget_snapshot())
+        
+        command = ["k3d", "cluster", "delete", name]
+        return self._finish_delete(name, *(await self._arun_command(command)))
+    
+    def _finish_delete(self, name: str, stdout: str, stderr: str, returncode: int) -> bool:
+        """Interpret the result of a k3d cluster delete."""
+        self.invalidate_snapshot()
         
         if returncode == 0:
             # Check if deletion actually happened (k3d returns 0 even for non-existent clusters)
@@ -99,42 +315,229 @@ class LocalProvider(BaseProvider):
             log_error(f"Failed to delete cluster: {stderr}")
             raise ClusterOperationError(f"Cluster deletion failed: {stderr}")
     
-    def list_clusters(self) -> list:
-        """List all local k3d clusters."""
-        command = ["k3d", "cluster", "list", "--no-headers"]
-        stdout, stderr, returncode = self._run_command(command)
+    @staticmethod
+    def _summarize_cluster(cluster: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce one entry of ``k3d cluster list -o json`` to the fields we use.
         
-        if returncode == 0:
-            clusters = [line.split()[0] for line in stdout.strip().split("\n") if line]
-            return clusters
+        Args:
+            cluster: Cluster object as emitted by k3d
+            
+        Returns:
+            Dictionary with server/agent counts, image, ports, registry and status
+        """
+        nodes = cluster.get("nodes") or []
+        servers = [node for node in nodes if node.get("role") == "server"]
+        agents = [node for node in nodes if node.get("role") == "agent"]
+        
+        def running(node_list):
+            return sum(1 for node in node_list if (node.get("State") or {}).get("Running"))
+        
+        servers_count = cluster.get("serversCount", len(servers))
+        servers_running = cluster.get("serversRunning", running(servers))
+        
+        ports = []
+        registry = None
+        for node in nodes:
+            if node.get("role") == "loadbalancer":
+                for container_port, bindings in (node.get("portMappings") or {}).items():
+                    for binding in bindings or []:
+                        ports.append(f"{binding.get('HostPort')}:{container_port}")
+            elif node.get("role") == "registry":
+                registry = node.get("name")
+        
+        if servers_count and servers_running == servers_count:
+            status = "running"
+        elif servers_running:
+            status = "degraded"
         else:
+            status = "stopped"
+        
+        created = sorted(node["created"] for node in nodes if node.get("created"))
+        
+        return {
+            "name": cluster.get("name"),
+            "servers": servers_count,
+            "servers_running": servers_running,
+            "agents": cluster.get("agentsCount", len(agents)),
+            "agents_running": cluster.get("agentsRunning", running(agents)),
+            "image": servers[0].get("image") if servers else None,
+            "ports": ports,
+            "registry": registry,
+            "status": status,
+            "created": created[0] if created else None,
+        }
+    
+    SNAPSHOT_COMMAND = ["k3d", "cluster", "list", "-o", "json"]
+    
+    def _get_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the indexed k3d state, querying k3d at most once until invalidated.
+        
+        Returns:
+            Dictionary of cluster names and their summaries
+        """
+        if self._snapshot is not None:
+            return self._snapshot
+        return self._index_snapshot(*self._run_command(self.SNAPSHOT_COMMAND, read_only=True))
+        
+    async def _aget_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Async variant of _get_snapshot."""
+        if self._snapshot is not None:
+            return self._snapshot
+        return self._index_snapshot(*(await self._arun_command(self.SNAPSHOT_COMMAND, read_only=True)))
+        
+    def _index_snapshot(self, stdout: str, stderr: str, returncode: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse ``k3d cluster list -o json`` output into the snapshot.
+        
+        Raises:
+            ClusterOperationError: If k3d failed or its output is invalid, so
+                callers never mistake a failed listing for "no clusters"
+        """
+        if returncode != 0:
             log_error(f"Failed to list clusters: {stderr}")
-            return []
+            raise ClusterOperationError(f"Cluster listing failed: {stderr.strip()}")
+        
+        try:
+            clusters = json.loads(stdout or "[]")
+        except ValueError as e:
+            log_error(f"Failed to parse k3d cluster list output: {e}")
+            raise ClusterOperationError(f"Invalid k3d cluster list output: {e}")
+        
+        self._snapshot = {}
+        for cluster in clusters or []:
+            summary = self._summarize_cluster(cluster)
+            self._snapshot[summary["name"]] = summary
+        return self._snapshot
+    
+    def invalidate_snapshot(self):
+        """Drop the cached k3d state so the next read queries k3d again."""
+        self._snapshot = None
+    
+    def reset_cache(self):
+        """Drop the cached k3d state between commands."""
+        self.invalidate_snapshot()
+    
+    def list_clusters(self) -> list:
+        """List all local k3d clusters."""
+        return list(self._get_snapshot())
+    
+    async def alist_clusters(self) -> list:
+        """List all local k3d clusters without blocking the event loop."""
+        return list(await self._aget_snapshot())
     
     def get_cluster_info(self, name: str) -> Dict[str, Any]:
         """Get information about a specific cluster."""
-        clusters = self.list_clusters()
+        return self._format_info(name, self._get_snapshot().get(name))
         
-        if name in clusters:
+    async def aget_cluster_info(self, name: str) -> Dict[str, Any]:
+        """Get information about a specific cluster without blocking the event loop."""
+        return self._format_info(name, (await self._aget_snapshot()).get(name))
+    
+    @staticmethod
+    def _format_info(name: str, cluster: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the get_cluster_info result from a snapshot entry."""
+        if cluster:
             return {
                 "name": name,
                 "type": "local",
                 "provider": "k3d",
-                "status": "running"
+                "status": cluster["status"],
+                "servers": f"{cluster['servers_running']}/{cluster['servers']}",
+                "agents": f"{cluster['agents_running']}/{cluster['agents']}",
+                "image": cluster["image"] or "-",
+                "ports": ", ".join(cluster["ports"]) or "-",
+                "registry": cluster["registry"] or "-",
+                "created": cluster["created"] or "-",
             }
         else:
             return {}
     
+    @property
+    def templates(self):
+        """Cluster template from templateConfig, resolved on first use."""
+        if self._templates is None:
+            from core.templates import Templates
+            self._templates = Templates(self.config)
+        return self._templates
+    
+    @property
+    def registry(self):
+        """Shared pull-through registry from registryConfig, created on first use."""
+        if self._registry is None:
+            from core.registry import SharedRegistry
+            self._registry = SharedRegistry(self.config)
+        return self._registry
+    
+    @property
+    def preloader(self):
+        """Image preloader from preloadConfig, created on first use."""
+        if self._preloader is None:
+            from core.registry import ImagePreloader
+            self._preloader = ImagePreloader(self.config)
+        return self._preloader
+    
+    @property
+    def flux(self):
+        """Flux bootstrap pipeline, created on first use."""
+        if self._flux is None:
+            from core.bootstrap import FluxBootstrap
+            self._flux = FluxBootstrap(self.config, templates=self.templates)
+        return self._flux
+    
     def bootstrap_cluster(self, name: str) -> bool:
         """
-        Bootstrap cluster with Flux CD and other GitOps tools.
+        Bootstrap cluster with Flux CD.
         
-        This is a placeholder for Flux installation logic.
-        """
-        log_info(f"Bootstrapping cluster '{name}' with Flux CD")
+        Applies the cached Flux component manifests stage by stage through
+        the cluster's k3d kubeconfig context.
         
-        # Placeholder: In real implementation, install Flux CD
-        # flux bootstrap github --owner=<org> --repository=<repo> --path=clusters/<name>
+        Args:
+            name: Cluster name
         
-        log_success(f"Cluster '{name}' bootstrapped successfully (placeholder)")
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster does not exist or a step fails
+        """
+        log_info(f"Bootstrapping cluster '{name}' with Flux CD {self.flux.version}")
+        self._check_exists(name, self._get_snapshot())
+        self.flux.bootstrap(name)
+        log_success(f"Cluster '{name}' bootstrapped successfully")
+        return True
+        
+    async def abootstrap_cluster(self, name: str) -> bool:
+        """Bootstrap cluster with Flux CD without blocking the event loop."""
+        log_info(f"Bootstrapping cluster '{name}' with Flux CD {self.flux.version}")
+        self._check_exists(name, await self._aget_snapshot())
+        await self.flux.abootstrap(name)
+        log_success(f"Cluster '{name}' bootstrapped successfully")
         return True
+    
+    def preload_images(self, name: str, images: Optional[List[str]] = None, parallel: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Import image tarballs into a cluster's nodes concurrently.
+        
+        Args:
+            name: Cluster name
+            images: Tarball paths (default: preloadConfig.images)
+            parallel: Imports in flight (default: preloadConfig.maxParallel)
+        
+        Returns:
+            Dictionary of tarballs and whether they were imported
+        
+        Raises:
+            ConfigurationError: If no images are given or a tarball is missing
+            ClusterOperationError: If the cluster does not exist or an import fails
+        """
+        self._check_exists(name, self._get_snapshot())
+        return self.preloader.preload(name, images, parallel)
+    
+    async def apreload_images(
+        self, name: str, images: Optional[List[str]] = None, parallel: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """Import image tarballs into a cluster without blocking the event loop."""
+        self._check_exists(name, await self._aget_snapshot())
+        return await self.preloader.apreload(name, images, parallel)
@@ -0,0 +1,399 @@
+"""Simulated cluster provider for load-testing orchestration without Docker or a cloud."""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Any, Optional
+from providers.base_provider import BaseProvider
+from utils.exceptions import ClusterOperationError, ConfigurationError
+from utils.logger import log_success, setup_logger
+
+logger = setup_logger(__name__)
+
+OPERATIONS = ("create", "delete", "list", "info", "bootstrap")
+
+# Defaults loosely modelled on a managed Kubernetes service
+DEFAULT_LATENCY = {
+    "create": {"distribution": "lognormal", "median": 2.0, "sigma": 0.3},
+    "delete": {"distribution": "lognormal", "median": 1.0, "sigma": 0.3},
+    "list": {"distribution": "uniform", "min": 0.05, "max": 0.15},
+    "info": {"distribution": "uniform", "min": 0.02, "max": 0.08},
+    "bootstrap": {"distribution": "lognormal", "median": 1.5, "sigma": 0.4},
+}
+DEFAULT_CONCURRENCY = {"create": 10, "delete": 10, "bootstrap": 10}
+
+# Latency distribution name -> sampler(random, spec) returning seconds
+DISTRIBUTIONS = {
+    "fixed": lambda rng, spec: spec.get("value", spec.get("mean", 0.0)),
+    "uniform": lambda rng, spec: rng.uniform(spec.get("min", 0.0), spec.get("max", 1.0)),
+    "normal": lambda rng, spec: rng.gauss(spec.get("mean", 1.0), spec.get("stddev", 0.0)),
+    "lognormal": lambda rng, spec: rng.lognormvariate(0.0, spec.get("sigma", 0.5)) * spec.get("median", 1.0),
+    "exponential": lambda rng, spec: rng.expovariate(1.0 / spec.get("mean", 1.0)),
+}
+
+
+class SimulatedProvider(BaseProvider):
+    """
+    In-process provider with configurable latency, failures and concurrency limits.
+    
+    Configured through the ``simulatedConfig`` section::
+        
+        simulatedConfig:
+          stateFile: .simulated-clusters.json   # omit to keep state in memory
+          timeScale: 0.01                       # multiply every latency
+          seed: 42
+          latency:                              # seconds, or a distribution
+            create: {distribution: lognormal, median: 2.0, sigma: 0.3}
+            list: 0.1
+          failureRate: {create: 0.02}
+          concurrency: {create: 10}             # operations in flight per type
+    
+    Operations over a concurrency limit wait for a free slot, as they would
+    when a cloud API throttles requests. Only the blocking methods print
+    progress, so fan-outs through the async interface measure orchestration
+    rather than console rendering.
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize simulated provider.
+        
+        Args:
+            config: Configuration dictionary with an optional simulatedConfig section
+        
+        Raises:
+            ConfigurationError: If a latency distribution is unknown
+        """
+        super().__init__(config)
+        settings = (config or {}).get("simulatedConfig") or {}
+        self.time_scale = float(settings.get("timeScale", 1.0))
+        self.latency = {**DEFAULT_LATENCY, **(settings.get("latency") or {})}
+        self.failure_rate = {op: 0.0 for op in OPERATIONS}
+        self.failure_rate.update(settings.get("failureRate") or {})
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(settings.get("concurrency") or {})}
+        self.state_file = Path(settings["stateFile"]) if settings.get("stateFile") else None
+        
+        for op, spec in self.latency.items():
+            if isinstance(spec, dict) and spec.get("distribution", "fixed") not in DISTRIBUTIONS:
+                raise ConfigurationError(f"Unknown latency distribution for '{op}': {spec['distribution']}")
+        
+        self._random = random.Random(settings.get("seed"))
+        self._lock = threading.RLock()
+        self._limits = {
+            op: threading.BoundedSemaphore(int(limit)) for op, limit in self.concurrency.items() if limit
+        }
+        # Event loop -> operation -> semaphore; a semaphore is bound to the
+        # loop it is used on, and entries go away with their loop
+        self._async_limits = weakref.WeakKeyDictionary()
+        self._clusters: Dict[str, Dict[str, Any]] = self._load_state()
+        self.stats = {op: {"calls": 0, "failures": 0, "simulated_seconds": 0.0} for op in OPERATIONS}
+    
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """Read clusters from the state file, if one is configured."""
+        if self.state_file and self.state_file.exists():
+            try:
+                return json.loads(self.state_file.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable simulated state {self.state_file}: {e}")
+        return {}
+    
+    def reset_cache(self):
+        """Re-read the state file, which other processes may have changed."""
+        if self.state_file:
+            with self._lock:
+                self._clusters = self._load_state()
+    
+    def _save_state(self):
+        """Atomically write clusters to the state file, if one is configured."""
+        if not self.state_file:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_file.parent, prefix=".simulated-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._clusters, f)
+        os.replace(tmp_path, self.state_file)
+    
+    def _draw(self, op: str):
+        """
+        Draw latency and failure for one operation and record them.
+        
+        Returns:
+            Tuple of (delay in seconds, whether the operation fails)
+        """
+        spec = self.latency.get(op, 0.0)
+        with self._lock:
+            if isinstance(spec, dict):
+                sampler = DISTRIBUTIONS[spec.get("distribution", "fixed")]
+                delay = max(0.0, sampler(self._random, spec)) * self.time_scale
+            else:
+                delay = float(spec) * self.time_scale
+            fails = self._random.random() < float(self.failure_rate.get(op, 0.0))
+            stats = self.stats[op]
+            stats["calls"] += 1
+            stats["failures"] += fails
+            stats["simulated_seconds"] += delay
+        return delay, fails
+    
+    def _async_limit(self, op: str) -> Optional[asyncio.Semaphore]:
+        """Get the asyncio semaphore for an operation type on the running loop."""
+        limit = self.concurrency.get(op)
+        if not limit:
+            return None
+        with self._lock:
+            limits = self._async_limits.setdefault(asyncio.get_running_loop(), {})
+            if op not in limits:
+                limits[op] = asyncio.Semaphore(int(limit))
+            return limits[op]
+    
+    def _simulate(self, op: str, name: Optional[str]):
+        """Wait out a simulated operation in the calling thread."""
+        limit = self._limits.get(op)
+        if limit:
+            limit.acquire()
+        try:
+            delay, fails = self._draw(op)
+            time.sleep(delay)
+        finally:
+            if limit:
+                limit.release()
+        if fails:
+            raise ClusterOperationError(f"Simulated {op} failure for cluster '{name}'")
+    
+    async def _asimulate(self, op: str, name: Optional[str]):
+        """Wait out a simulated operation without blocking the event loop."""
+        limit = self._async_limit(op)
+        if limit:
+            await limit.acquire()
+        try:
+            delay, fails = self._draw(op)
+            await asyncio.sleep(delay)
+        finally:
+            if limit:
+                limit.release()
+        if fails:
+            raise ClusterOperationError(f"Simulated {op} failure for cluster '{name}'")
+    
+    def _apply_create(self, name: str, **kwargs) -> bool:
+        """Record a created cluster."""
+        with self._lock:
+            if name in self._clusters:
+                raise ClusterOperationError(f"Cluster '{name}' already exists")
+            self._clusters[name] = {
+                "status": "running",
+                "servers": int(kwargs.get("servers", 1)),
+                "agents": int(kwargs.get("agents", 0)),
+                "ports": kwargs.get("ports_to_open") or "",
+                "bootstrapped": False,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            self._save_state()
+        return True
+    
+    def _check_exists(self, name: str):
+        """Raise if a cluster does not exist."""
+        if name not in self._clusters:
+            raise ClusterOperationError(f"Cluster '{name}' does not exist")
+    
+    def _apply_delete(self, name: str) -> bool:
+        """Remove a deleted cluster."""
+        with self._lock:
+            self._check_exists(name)
+            del self._clusters[name]
+            self._save_state()
+        return True
+    
+    def _apply_bootstrap(self, name: str) -> bool:
+        """Mark a cluster as bootstrapped."""
+        with self._lock:
+            self._check_exists(name)
+            self._clusters[name]["bootstrapped"] = True
+            self._save_state()
+        return True
+    
+    def _format_info(self, name: str) -> Dict[str, Any]:
+        """Build the get_cluster_info result for a cluster."""
+        with self._lock:
+            cluster = self._clusters.get(name)
+            if not cluster:
+                return {}
+            return {
+                "name": name,
+                "type": "simulated",
+                "provider": "simulated",
+                "status": cluster["status"],
+                "servers": f"{cluster['servers']}/{cluster['servers']}",
+                "agents": f"{cluster['agents']}/{cluster['agents']}",
+                "ports": cluster["ports"] or "-",
+                "bootstrapped": cluster["bootstrapped"],
+                "created": cluster["created"],
+            }
+    
+    def create_cluster(self, name: str, **kwargs) -> bool:
+        """
+        Create a simulated cluster after the simulated create latency.
+        
+        Args:
+            name: Cluster name
+            **kwargs: servers, agents and ports_to_open, as for k3d
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster exists or a failure is drawn
+        """
+        self._simulate("create", name)
+        self._apply_create(name, **kwargs)
+        log_success(f"Simulated cluster '{name}' created")
+        return True
+    
+    async def acreate_cluster(self, name: str, **kwargs) -> bool:
+        """
+        Create a simulated cluster without blocking the event loop.
+        
+        Args:
+            name: Cluster name
+            **kwargs: servers, agents and ports_to_open, as for k3d
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster exists or a failure is drawn
+        """
+        await self._asimulate("create", name)
+        return self._apply_create(name, **kwargs)
+    
+    def delete_cluster(self, name: str) -> bool:
+        """
+        Delete a simulated cluster after the simulated delete latency.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster does not exist or a failure is drawn
+        """
+        self._simulate("delete", name)
+        self._apply_delete(name)
+        log_success(f"Simulated cluster '{name}' deleted")
+        return True
+    
+    async def adelete_cluster(self, name: str) -> bool:
+        """
+        Delete a simulated cluster without blocking the event loop.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster does not exist or a failure is drawn
+        """
+        await self._asimulate("delete", name)
+        return self._apply_delete(name)
+    
+    def list_clusters(self) -> list:
+        """
+        List simulated clusters after the simulated list latency.
+        
+        Returns:
+            Cluster names
+        
+        Raises:
+            ClusterOperationError: If a failure is drawn
+        """
+        self._simulate("list", None)
+        with self._lock:
+            return list(self._clusters)
+    
+    async def alist_clusters(self) -> list:
+        """
+        List simulated clusters without blocking the event loop.
+        
+        Returns:
+            Cluster names
+        
+        Raises:
+            ClusterOperationError: If a failure is drawn
+        """
+        await self._asimulate("list", None)
+        with self._lock:
+            return list(self._clusters)
+    
+    def get_cluster_info(self, name: str) -> Dict[str, Any]:
+        """
+        Get information about a simulated cluster.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            Cluster information, or an empty dictionary if it does not exist
+        
+        Raises:
+            ClusterOperationError: If a failure is drawn
+        """
+        self._simulate("info", name)
+        return self._format_info(name)
+    
+    async def aget_cluster_info(self, name: str) -> Dict[str, Any]:
+        """
+        Get information about a simulated cluster without blocking the event loop.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            Cluster information, or an empty dictionary if it does not exist
+        
+        Raises:
+            ClusterOperationError: If a failure is drawn
+        """
+        await self._asimulate("info", name)
+        return self._format_info(name)
+    
+    def bootstrap_cluster(self, name: str) -> bool:
+        """
+        Mark a simulated cluster as bootstrapped after the simulated latency.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster does not exist or a failure is drawn
+        """
+        self._simulate("bootstrap", name)
+        self._apply_bootstrap(name)
+        log_success(f"Simulated cluster '{name}' bootstrapped")
+        return True
+    
+    async def abootstrap_cluster(self, name: str) -> bool:
+        """
+        Mark a simulated cluster as bootstrapped without blocking the event loop.
+        
+        Args:
+            name: Cluster name
+        
+        Returns:
+            True if successful
+        
+        Raises:
+            ClusterOperationError: If the cluster does not exist or a failure is drawn
+        """
+        await self._asimulate("bootstrap", name)
+        return self._apply_bootstrap(name)
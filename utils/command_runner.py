@@ -0,0 +1,626 @@
+"""Shared subprocess execution with timeouts, retries and latency statistics."""
+
+import atexit
+import json
+import math
+import os
+import random
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, NamedTuple, Optional, Sequence
+from utils import profiler
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Return code reported for commands killed on timeout (as coreutils timeout does)
+TIMEOUT_RETURNCODE = 124
+# Return code reported when a command cannot be started at all
+SPAWN_ERROR_RETURNCODE = 127
+
+# Output lines kept for error reports by the streaming mode
+DEFAULT_TAIL_LINES = 200
+
+# Errors from k3d/Docker that usually succeed when retried
+TRANSIENT_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"cannot connect to the docker daemon",
+        r"connection refused",
+        r"connection reset by peer",
+        r"i/o timeout",
+        r"tls handshake timeout",
+        r"context deadline exceeded",
+        r"temporary failure in name resolution",
+        r"too many requests",
+        r"error response from daemon: .*(conflict|in progress)",
+    )
+]
+
+
+class CommandResult(NamedTuple):
+    """Outcome of a command run through CommandRunner."""
+    
+    stdout: str
+    stderr: str
+    returncode: int
+    duration: float
+    attempts: int = 1
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+def command_key(command: Sequence[str]) -> str:
+    """
+    Get the statistics key for a command.
+    
+    The program name plus up to two leading sub-commands are used, so
+    "k3d cluster create my-cluster -p 80:80" becomes "k3d cluster create".
+    
+    Args:
+        command: Command as list of strings
+    
+    Returns:
+        Statistics key
+    """
+    words = [os.path.basename(command[0])] if command else []
+    for word in command[1:3]:
+        if word.startswith("-"):
+            break
+        words.append(word)
+    return " ".join(words)
+
+
+class CommandStats:
+    """Thread-safe per-command latency and exit statistics."""
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, command: Sequence[str], result: CommandResult):
+        """
+        Record the outcome of one command.
+        
+        Args:
+            command: Command as list of strings
+            result: Result of running it
+        """
+        key = command_key(command)
+        with self._lock:
+            entry = self._samples.setdefault(key, {
+                "durations": [], "failures": 0, "timeouts": 0, "retries": 0, "exit_codes": {},
+            })
+            entry["durations"].append(result.duration)
+            entry["retries"] += result.attempts - 1
+            entry["timeouts"] += int(result.timed_out)
+            entry["failures"] += int(result.returncode != 0)
+            code = str(result.returncode)
+            entry["exit_codes"][code] = entry["exit_codes"].get(code, 0) + 1
+    
+    @staticmethod
+    def _percentile(ordered: List[float], fraction: float) -> float:
+        """Nearest-rank percentile of an ordered list."""
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize recorded commands.
+        
+        Returns:
+            Dictionary of command keys and their count, failures, timeouts,
+            retries, exit codes and latency percentiles in milliseconds
+        """
+        with self._lock:
+            samples = {key: dict(entry, durations=list(entry["durations"])) for key, entry in self._samples.items()}
+        
+        summary = {}
+        for key, entry in samples.items():
+            ordered = sorted(entry["durations"])
+            summary[key] = {
+                "count": len(ordered),
+                "failures": entry["failures"],
+                "timeouts": entry["timeouts"],
+                "retries": entry["retries"],
+                "exit_codes": entry["exit_codes"],
+                "total_ms": round(sum(ordered) * 1000, 3),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 3),
+                "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 3),
+                "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return summary
+    
+    def export(self, path: str):
+        """
+        Write the summary as JSON.
+        
+        Args:
+            path: Output file path
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+    
+    def reset(self):
+        """Forget all recorded commands."""
+        with self._lock:
+            self._samples.clear()
+
+
+class CommandRunner:
+    """
+    Runs external commands with per-call timeouts, a process-wide deadline
+    and jittered exponential backoff for known-transient failures.
+    
+    Children run in their own process group, so a timeout or cancellation
+    kills the whole tree rather than leaving grandchildren holding pipes.
+    """
+    
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+        stats: Optional[CommandStats] = None,
+    ):
+        """
+        Initialize command runner.
+        
+        Args:
+            timeout: Default per-call timeout in seconds (None: no limit)
+            retries: Default number of retries for transient failures of
+                read-only commands; other commands are not retried by default
+            backoff: Base delay before the first retry, in seconds
+            max_backoff: Upper bound for a single retry delay
+            stats: Statistics collector (default: a new one)
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = stats if stats is not None else CommandStats()
+        self._deadline: Optional[float] = None
+    
+    def set_deadline(self, seconds: Optional[float]):
+        """
+        Set a deadline shared by every later call, or clear it.
+        
+        Args:
+            seconds: Seconds from now, or None to remove the deadline
+        """
+        self._deadline = time.monotonic() + seconds if seconds is not None else None
+    
+    def _effective_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """Combine a per-call timeout with the remaining global budget."""
+        timeout = timeout if timeout is not None else self.timeout
+        if self._deadline is None:
+            return timeout
+        remaining = self._deadline - time.monotonic()
+        return remaining if timeout is None else min(timeout, remaining)
+    
+    @staticmethod
+    def is_transient(result: CommandResult) -> bool:
+        """Check whether a failed result matches a known-transient error."""
+        if result.returncode == 0 or result.timed_out or result.error:
+            return False
+        output = f"{result.stderr}\n{result.stdout}"
+        return any(pattern.search(output) for pattern in TRANSIENT_PATTERNS)
+    
+    def _retry_delay(self, attempt: int) -> float:
+        """Jittered exponential backoff for the given (1-based) attempt."""
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.5)
+    
+    @staticmethod
+    def _kill_group(pid: int):
+        """Kill a child's whole process group."""
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    def _record(self, command: List[str], result: CommandResult, overlapping: bool = False):
+        """Record a finished command in the statistics and the profile trace."""
+        self.stats.record(command, result)
+        if profiler.is_enabled():
+            profiler.record(
+                command_key(command),
+                time.perf_counter() - result.duration,
+                result.duration,
+                "command",
+                overlapping=overlapping,
+                command=" ".join(command),
+                returncode=result.returncode,
+                attempts=result.attempts,
+            )
+    
+    def _run_once(self, command: List[str], timeout: Optional[float], **popen_kwargs) -> CommandResult:
+        """Run a command a single time."""
+        start = time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            return CommandResult("", "deadline exceeded before start", TIMEOUT_RETURNCODE, 0.0, timed_out=True)
+        
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True,
+                **popen_kwargs,
+            )
+        except OSError as e:
+            logger.error(f"Command execution failed: {e}")
+            return CommandResult("", str(e), SPAWN_ERROR_RETURNCODE, time.perf_counter() - start, error=str(e))
+        
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_group(process.pid)
+            stdout, stderr = process.communicate()
+            stderr = f"{stderr}\ncommand timed out after {timeout:.1f}s".lstrip()
+            return CommandResult(stdout, stderr, TIMEOUT_RETURNCODE, time.perf_counter() - start, timed_out=True)
+        except BaseException:
+            self._kill_group(process.pid)
+            process.wait()
+            raise
+        
+        return CommandResult(stdout, stderr, process.returncode, time.perf_counter() - start)
+    
+    def run(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        read_only: bool = False,
+        **popen_kwargs,
+    ) -> CommandResult:
+        """
+        Run a command, retrying known-transient failures.
+        
+        Args:
+            command: Command as list of strings
+            timeout: Per-attempt timeout in seconds (default: runner timeout)
+            retries: Retries for transient failures (default: runner retries
+                if ``read_only``, else none)
+            read_only: The command changes nothing, so repeating it is safe;
+                a retried create or delete may have half-succeeded before
+            **popen_kwargs: Extra arguments for subprocess.Popen (cwd, env)
+        
+        Returns:
+            CommandResult of the last attempt; duration covers all attempts
+        """
+        if retries is None:
+            retries = self.retries if read_only else 0
+        start = time.perf_counter()
+        attempt = 1
+        while True:
+            result = self._run_once(command, self._effective_timeout(timeout), **popen_kwargs)
+            if attempt > retries or not self.is_transient(result):
+                break
+            delay = self._retry_delay(attempt)
+            remaining = self._effective_timeout(None)
+            if remaining is not None and remaining <= delay:
+                break
+            logger.debug("Retrying %s in %.2fs: %s", command_key(command), delay, result.stderr.strip())
+            time.sleep(delay)
+            attempt += 1
+        
+        result = result._replace(duration=time.perf_counter() - start, attempts=attempt)
+        self._record(command, result)
+        return result
+    
+    async def _arun_once(self, command: List[str], timeout: Optional[float], **kwargs) -> CommandResult:
+        """Run a command a single time without blocking the event loop."""
+        # Imported here: blocking commands such as `cluster list` never
+        # start an event loop and skip the asyncio import
+        import asyncio
+        
+        start = time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            return CommandResult("", "deadline exceeded before start", TIMEOUT_RETURNCODE, 0.0, timed_out=True)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+                **kwargs,
+            )
+        except OSError as e:
+            logger.error(f"Command execution failed: {e}")
+            return CommandResult("", str(e), SPAWN_ERROR_RETURNCODE, time.perf_counter() - start, error=str(e))
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            self._kill_group(process.pid)
+            await process.wait()
+            message = f"command timed out after {timeout:.1f}s"
+            return CommandResult("", message, TIMEOUT_RETURNCODE, time.perf_counter() - start, timed_out=True)
+        except BaseException:
+            if process.returncode is None:
+                self._kill_group(process.pid)
+                await process.wait()
+            raise
+        
+        return CommandResult(
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+            process.returncode,
+            time.perf_counter() - start,
+        )
+    
+    async def arun(
+        self,
+        command: List[str],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        read_only: bool = False,
+        **kwargs,
+    ) -> CommandResult:
+        """
+        Async variant of :meth:`run`.
+        
+        The child process group is killed if the awaiting task is cancelled.
+        
+        Args:
+            command: Command as list of strings
+            timeout: Per-attempt timeout in seconds (default: runner timeout)
+            retries: Retries for transient failures (default: runner retries
+                if ``read_only``, else none)
+            read_only: The command changes nothing, so repeating it is safe;
+                a retried create or delete may have half-succeeded before
+            **kwargs: Extra arguments for asyncio.create_subprocess_exec
+        
+        Returns:
+            CommandResult of the last attempt; duration covers all attempts
+        """
+        import asyncio
+        
+        if retries is None:
+            retries = self.retries if read_only else 0
+        start = time.perf_counter()
+        attempt = 1
+        while True:
+            result = await self._arun_once(command, self._effective_timeout(timeout), **kwargs)
+            if attempt > retries or not self.is_transient(result):
+                break
+            delay = self._retry_delay(attempt)
+            remaining = self._effective_timeout(None)
+            if remaining is not None and remaining <= delay:
+                break
+            logger.debug("Retrying %s in %.2fs: %s", command_key(command), delay, result.stderr.strip())
+            await asyncio.sleep(delay)
+            attempt += 1
+        
+        result = result._replace(duration=time.perf_counter() - start, attempts=attempt)
+        self._record(command, result, overlapping=True)
+        return result
+
+    def stream(
+        self,
+        command: List[str],
+        on_line: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = None,
+        tail_lines: int = DEFAULT_TAIL_LINES,
+        **popen_kwargs,
+    ) -> CommandResult:
+        """
+        Run a command and hand each line of output to a callback as it arrives.
+        
+        stdout and stderr are merged. Only the last ``tail_lines`` lines are
+        kept, so memory stays bounded however chatty the command is.
+        Streaming commands are not retried.
+        
+        Args:
+            command: Command as list of strings
+            on_line: Called with each output line (without trailing newline)
+            timeout: Seconds before the command is killed (default: runner timeout)
+            tail_lines: Size of the output ring buffer
+            **popen_kwargs: Extra arguments for subprocess.Popen (cwd, env)
+        
+        Returns:
+            CommandResult whose stdout holds the buffered tail and whose
+            stderr is empty
+        """
+        timeout = self._effective_timeout(timeout)
+        start = time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            return CommandResult("", "deadline exceeded before start", TIMEOUT_RETURNCODE, 0.0, timed_out=True)
+        
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                errors="replace",
+                start_new_session=True,
+                **popen_kwargs,
+            )
+        except OSError as e:
+            logger.error(f"Command execution failed: {e}")
+            result = CommandResult("", str(e), SPAWN_ERROR_RETURNCODE, time.perf_counter() - start, error=str(e))
+            self._record(command, result)
+            return result
+        
+        tail: Deque[str] = deque(maxlen=tail_lines)
+        expired = threading.Event()
+        
+        def expire():
+            expired.set()
+            self._kill_group(process.pid)
+        
+        timer = threading.Timer(timeout, expire) if timeout is not None else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        try:
+            for line in process.stdout:
+                line = line.rstrip("\n")
+                tail.append(line)
+                if on_line:
+                    on_line(line)
+            process.wait()
+        except BaseException:
+            self._kill_group(process.pid)
+            process.wait()
+            raise
+        finally:
+            if timer:
+                timer.cancel()
+            process.stdout.close()
+        
+        returncode = TIMEOUT_RETURNCODE if expired.is_set() else process.returncode
+        if expired.is_set():
+            tail.append(f"command timed out after {timeout:.1f}s")
+        result = CommandResult(
+            "\n".join(tail), "", returncode, time.perf_counter() - start, timed_out=expired.is_set()
+        )
+        self._record(command, result)
+        return result
+    
+    async def astream(
+        self,
+        command: List[str],
+        on_line: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = None,
+        tail_lines: int = DEFAULT_TAIL_LINES,
+        **kwargs,
+    ) -> CommandResult:
+        """
+        Async variant of :meth:`stream`.
+        
+        The child process group is killed if the awaiting task is cancelled.
+        
+        Args:
+            command: Command as list of strings
+            on_line: Called with each output line (without trailing newline)
+            timeout: Seconds before the command is killed (default: runner timeout)
+            tail_lines: Size of the output ring buffer
+            **kwargs: Extra arguments for asyncio.create_subprocess_exec
+        
+        Returns:
+            CommandResult whose stdout holds the buffered tail and whose
+            stderr is empty
+        """
+        import asyncio
+        
+        timeout = self._effective_timeout(timeout)
+        start = time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            return CommandResult("", "deadline exceeded before start", TIMEOUT_RETURNCODE, 0.0, timed_out=True)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+                **kwargs,
+            )
+        except OSError as e:
+            logger.error(f"Command execution failed: {e}")
+            result = CommandResult("", str(e), SPAWN_ERROR_RETURNCODE, time.perf_counter() - start, error=str(e))
+            self._record(command, result, overlapping=True)
+            return result
+        
+        tail: Deque[str] = deque(maxlen=tail_lines)
+        
+        async def pump():
+            async for raw in process.stdout:
+                line = raw.decode(errors="replace").rstrip("\n")
+                tail.append(line)
+                if on_line:
+                    on_line(line)
+            await process.wait()
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(pump(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            self._kill_group(process.pid)
+            await process.wait()
+            tail.append(f"command timed out after {timeout:.1f}s")
+        except BaseException:
+            if process.returncode is None:
+                self._kill_group(process.pid)
+                await process.wait()
+            raise
+        
+        returncode = TIMEOUT_RETURNCODE if timed_out else process.returncode
+        result = CommandResult("\n".join(tail), "", returncode, time.perf_counter() - start, timed_out=timed_out)
+        self._record(command, result, overlapping=True)
+        return result
+
+
+_runner: Optional[CommandRunner] = None
+_runner_lock = threading.Lock()
+
+
+def _env_float(name: str) -> Optional[float]:
+    """Read an optional float from the environment."""
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def get_runner() -> CommandRunner:
+    """
+    Get the process-wide command runner.
+    
+    It is configured from the environment on first use:
+    TOOLS_CLI_COMMAND_TIMEOUT (default per-call timeout, seconds),
+    TOOLS_CLI_DEADLINE (budget for the whole process, seconds),
+    TOOLS_CLI_RETRIES (retries for transient errors of read-only commands) and
+    TOOLS_CLI_STATS_FILE (write command statistics as JSON at exit).
+    
+    Returns:
+        Shared CommandRunner
+    """
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                runner = CommandRunner(
+                    timeout=_env_float("TOOLS_CLI_COMMAND_TIMEOUT"),
+                    retries=int(os.environ.get("TOOLS_CLI_RETRIES", "2")),
+                )
+                runner.set_deadline(_env_float("TOOLS_CLI_DEADLINE"))
+                stats_file = os.environ.get("TOOLS_CLI_STATS_FILE")
+                if stats_file:
+                    atexit.register(runner.stats.export, stats_file)
+                _runner = runner
+    return _runner
+
+
+def reset_runner():
+    """
+    Discard the process-wide runner so the next get_runner() call re-reads
+    the environment (used between commands of a long-lived process).
+    
+    Statistics collected so far are written to TOOLS_CLI_STATS_FILE first.
+    """
+    global _runner
+    with _runner_lock:
+        runner, _runner = _runner, None
+    stats_file = os.environ.get("TOOLS_CLI_STATS_FILE")
+    if runner is not None:
+        atexit.unregister(runner.stats.export)
+        if stats_file:
+            runner.stats.export(stats_file)
@@ -0,0 +1,273 @@
+"""
+Shell completion callbacks backed by a small on-disk index.
+
+Completion runs on every TAB, so the callbacks only read
+``<cache>/completion/clusters.json`` and never import rich or providers.
+Plain requests are answered by :func:`fast_complete` before ``cli.py``
+even imports typer.
+When the index is missing or stale a detached process refreshes it
+(``python -m utils.completion PROVIDER...``); cluster commands also keep it
+current as a side effect of listing, creating and deleting clusters.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+from utils.paths import cache_dir
+
+# Seconds after which completion triggers a background refresh
+INDEX_TTL = 60.0
+# Seconds after which a refresh lock is considered abandoned
+REFRESH_LOCK_TTL = 60.0
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Arguments fast_complete answers: command path -> (completed values, takes a
+# single argument, --provider default). A default of None completes every
+# indexed provider, like commands that read the provider from config.
+FAST_COMPLETIONS = {
+    ("cluster", "info"): ("cluster", True, "local"),
+    ("cluster", "delete"): ("cluster", True, None),
+    ("cluster", "bootstrap"): ("cluster", False, "local"),
+    ("cluster", "preload"): ("cluster", False, "local"),
+    ("cluster", "pool", "release"): ("cluster", False, None),
+    ("tools", "install"): ("tool", False, None),
+    ("tools", "check"): ("tool", True, None),
+}
+# Commands among them that take a --provider option
+PROVIDER_COMMANDS = {("cluster", "info"), ("cluster", "delete"), ("cluster", "bootstrap"), ("cluster", "preload")}
+
+
+def _index_path() -> Path:
+    return cache_dir("completion") / "clusters.json"
+
+
+def load_index() -> Dict[str, Dict]:
+    """
+    Read the cluster name index.
+    
+    Returns:
+        Dictionary of provider names and {"updated": timestamp, "clusters": [...]}
+    """
+    try:
+        return json.loads(_index_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def update_index(provider: str, clusters: Optional[Iterable[str]] = None, add: Iterable[str] = (),
+                 remove: Iterable[str] = ()):
+    """
+    Update the cluster names of one provider.
+    
+    Best effort: an unwritable cache leaves the index as it is. Only pass
+    ``clusters`` for listings that succeeded.
+    
+    Args:
+        provider: Provider name as given on the command line
+        clusters: Complete list of cluster names (replaces the entry)
+        add: Names to add to the entry
+        remove: Names to remove from the entry
+    """
+    index = load_index()
+    entry = index.get(provider, {"updated": 0.0, "clusters": []})
+    if clusters is not None:
+        names = set(clusters)
+        entry["updated"] = time.time()
+    else:
+        names = set(entry["clusters"])
+    names = (names | set(add)) - set(remove)
+    entry["clusters"] = sorted(names)
+    index[provider] = entry
+    
+    try:
+        path = _index_path()
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(index))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _refresh_in_background(providers: List[str]):
+    """Start a detached refresh unless one is already running."""
+    try:
+        lock = cache_dir("completion") / "refresh.lock"
+    except OSError:
+        return
+    try:
+        if time.time() - lock.stat().st_mtime < REFRESH_LOCK_TTL:
+            return
+        lock.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return
+    import subprocess
+    
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    for name in list(env):
+        # Don't let the refresh think it is a completion request
+        if name.startswith("_") and name.endswith("_COMPLETE"):
+            del env[name]
+    subprocess.Popen(
+        [sys.executable, "-m", "utils.completion"] + providers,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def cluster_names(provider: Optional[str]) -> List[str]:
+    """
+    Get known cluster names, scheduling a refresh when they are stale.
+    
+    Args:
+        provider: Provider name, or None for every indexed provider
+    
+    Returns:
+        Sorted cluster names
+    """
+    index = load_index()
+    providers = [provider] if provider else (list(index) or ["local"])
+    stale = [name for name in providers if time.time() - index.get(name, {}).get("updated", 0.0) > INDEX_TTL]
+    if stale:
+        _refresh_in_background(stale)
+    return sorted({cluster for name in providers for cluster in index.get(name, {}).get("clusters", [])})
+
+
+def complete_cluster_name(ctx, incomplete: str) -> List[str]:
+    """Typer autocompletion callback for cluster names of the --provider in use."""
+    provider = ctx.params.get("provider")
+    return [name for name in cluster_names(provider) if name.startswith(incomplete)]
+
+
+def complete_tool_name(incomplete: str) -> List[tuple]:
+    """Typer autocompletion callback for supported tool names."""
+    from core.tool_catalog import SUPPORTED_TOOLS
+    
+    return [(name, spec["description"]) for name, spec in SUPPORTED_TOOLS.items() if name.startswith(incomplete)]
+
+
+def _completion_request(shell: str, environ: Mapping[str, str]) -> Optional[tuple]:
+    """Get (args, incomplete) of a bash or zsh request, split the way typer does."""
+    if shell == "complete_bash":
+        line, cword = environ.get("COMP_WORDS", ""), environ.get("COMP_CWORD", "")
+        if not cword.isdigit():
+            return None
+        words = line.split()
+        args = words[1:int(cword)]
+        incomplete = words[int(cword)] if int(cword) < len(words) else ""
+    elif shell == "complete_zsh":
+        line = environ.get("_TYPER_COMPLETE_ARGS", "")
+        args = line.split()[1:]
+        incomplete = ""
+        if args and not line.endswith(" "):
+            incomplete = args.pop()
+    else:
+        return None
+    # Quoted words need click's parser
+    if any(char in line for char in "'\"\\"):
+        return None
+    return args, incomplete
+
+
+def fast_complete(prog_name: str, environ: Mapping[str, str] = os.environ) -> Optional[str]:
+    """
+    Answer a shell completion request for cluster or tool names without typer.
+    
+    Only bash and zsh requests for the arguments in FAST_COMPLETIONS are
+    answered, formatted as typer would; anything else (other options,
+    quoting, other shells) is left to the full CLI.
+    
+    Args:
+        prog_name: Program name the completion variable is derived from
+        environ: Environment of the request
+    
+    Returns:
+        The completion output, or None to fall back to typer
+    """
+    shell = environ.get(f"_{prog_name}_COMPLETE".replace("-", "_").upper(), "")
+    request = _completion_request(shell, environ)
+    if request is None:
+        return None
+    args, incomplete = request
+    path = next((path for path in FAST_COMPLETIONS if tuple(args[:len(path)]) == path), None)
+    if path is None or incomplete.startswith("-"):
+        return None
+    kind, single, provider = FAST_COMPLETIONS[path]
+    
+    rest = args[len(path):]
+    given = 0
+    while rest:
+        arg = rest.pop(0)
+        if path in PROVIDER_COMMANDS and arg == "--provider" and rest:
+            provider = rest.pop(0)
+        elif path in PROVIDER_COMMANDS and arg.startswith("--provider="):
+            provider = arg.split("=", 1)[1]
+        elif arg.startswith("-"):
+            return None
+        else:
+            given += 1
+    if single and given:
+        return None
+    
+    if kind == "cluster":
+        items = [(name, None) for name in cluster_names(provider) if name.startswith(incomplete)]
+    else:
+        items = complete_tool_name(incomplete)
+    
+    if shell == "complete_bash":
+        return "\n".join(value for value, _ in items)
+    if not items:
+        return "_files"
+    
+    def escape(text: str) -> str:
+        return text.replace('"', '""').replace("'", "''").replace("$", "\\$").replace("`", "\\`")
+    
+    choices = "\n".join(
+        f'"{escape(value)}":"{escape(help)}"' if help else f'"{escape(value)}"' for value, help in items
+    )
+    return f"_arguments '*: :(({choices}))'"
+
+
+def refresh(providers: List[str]):
+    """
+    Re-list clusters of the given providers and rewrite their index entries.
+    
+    Listing through ClusterManager updates the index itself.
+    
+    Args:
+        providers: Provider names
+    """
+    from core.cluster_manager import ClusterManager
+    from core.config_handler import ConfigHandler
+    from utils.exceptions import ToolsCLIException
+    
+    try:
+        config = ConfigHandler().load()
+    except ToolsCLIException:
+        config = {}
+    manager = ClusterManager(config)
+    for provider in providers:
+        try:
+            manager.list_clusters(provider)
+        except ToolsCLIException:
+            continue
+
+
+if __name__ == "__main__":
+    try:
+        refresh(sys.argv[1:] or ["local"])
+    finally:
+        try:
+            (cache_dir("completion") / "refresh.lock").unlink()
+        except OSError:
+            pass
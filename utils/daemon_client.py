@@ -0,0 +1,172 @@
+"""Thin client that runs CLI commands in a resident ``serve`` process."""
+
+import os
+import sys
+from typing import Dict, List, Optional
+from utils.paths import is_private_dir, socket_path
+
+# Arguments that always run in-process: help and completion setup render
+# with rich here, and --profile measures this process
+LOCAL_ARGS = {"--help", "--install-completion", "--show-completion", "--profile"}
+
+# Seconds to wait for the daemon to accept a connection
+CONNECT_TIMEOUT = 0.5
+
+# Environment forwarded to the daemon: what commands and the tools they run
+# (k3d, kubectl, helm, docker) read. Everything else, credentials included,
+# stays in the client; TOOLS_CLI_FORWARD_ENV adds comma-separated names,
+# with a trailing "*" for prefixes.
+FORWARD_ENV = {
+    "PATH", "HOME", "USER", "LOGNAME", "SHELL", "TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR",
+    "COLUMNS", "LINES", "LANG", "LANGUAGE", "TZ", "TMPDIR", "KUBECONFIG", "PYTHONPATH",
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "no_proxy",
+    "SSL_CERT_FILE", "SSL_CERT_DIR",
+}
+FORWARD_ENV_PREFIXES = ("TOOLS_CLI_", "XDG_", "LC_", "DOCKER_")
+
+
+def should_forward(argv: List[str]) -> bool:
+    """
+    Check whether a command line may be sent to the daemon.
+    
+    Args:
+        argv: CLI arguments without the program name
+    
+    Returns:
+        True unless the command must run in this process
+    """
+    if not argv or argv[0] == "serve" or os.environ.get("TOOLS_CLI_NO_DAEMON"):
+        return False
+    return not any(arg in LOCAL_ARGS or arg.startswith("--profile=") for arg in argv)
+
+
+def forwarded_env() -> Dict[str, str]:
+    """
+    Get the part of the environment sent along with a command.
+    
+    Returns:
+        Variables in FORWARD_ENV, with a FORWARD_ENV_PREFIXES prefix, or
+        listed in TOOLS_CLI_FORWARD_ENV
+    """
+    names = set(FORWARD_ENV)
+    prefixes = list(FORWARD_ENV_PREFIXES)
+    for entry in os.environ.get("TOOLS_CLI_FORWARD_ENV", "").split(","):
+        entry = entry.strip()
+        if entry.endswith("*"):
+            prefixes.append(entry[:-1])
+        elif entry:
+            names.add(entry)
+    prefixes = tuple(prefixes)
+    return {name: value for name, value in os.environ.items() if name in names or name.startswith(prefixes)}
+
+
+def is_trusted_socket(path: str) -> bool:
+    """
+    Check that a socket file was created by the current user in a private
+    directory, so no other local user can pose as the daemon.
+    
+    Args:
+        path: Socket path
+    
+    Returns:
+        True if the socket may be connected to
+    """
+    import stat
+    
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISSOCK(info.st_mode)
+        and info.st_uid == os.getuid()
+        and is_private_dir(os.path.dirname(os.path.abspath(path)))
+    )
+
+
+def peer_uid(sock) -> Optional[int]:
+    """User id of the process on the other end of a Unix socket, where the OS reports it."""
+    import socket
+    import struct
+    
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)[1]
+
+
+def _terminal_width() -> Optional[int]:
+    """Width of the client's terminal, if stdout is one."""
+    try:
+        # Terminals without a size report 0 columns
+        return os.get_terminal_size(sys.stdout.fileno()).columns or None
+    except (OSError, ValueError):
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Run a command in the daemon, relaying its output.
+    
+    Args:
+        argv: CLI arguments without the program name
+    
+    Returns:
+        The command's exit code, or None when no daemon is reachable and the
+        command should run in-process
+    """
+    if not should_forward(argv):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    if not is_trusted_socket(path):
+        print(f"tools-cli: ignoring {path}: not a socket owned by you in a private directory", file=sys.stderr)
+        return None
+    
+    # Only paid when a daemon may be running
+    import json
+    import socket
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+        server_uid = peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if server_uid is not None and server_uid != os.getuid():
+        sock.close()
+        print(f"tools-cli: ignoring {path}: served by another user (uid {server_uid})", file=sys.stderr)
+        return None
+    sock.settimeout(None)
+    
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": forwarded_env(),
+        "tty": sys.stdout.isatty(),
+        "stderr_tty": sys.stderr.isatty(),
+        "width": _terminal_width(),
+    }
+    try:
+        with sock, sock.makefile("rb") as replies:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            for line in replies:
+                message = json.loads(line)
+                if "exit" in message:
+                    return message["exit"]
+                stream = sys.stdout if message["stream"] == "stdout" else sys.stderr
+                stream.write(message["data"])
+                stream.flush()
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # Our stdout was closed (e.g. piped into head); exit like SIGPIPE
+        sys.stdout = open(os.devnull, "w")
+        return 141
+    except OSError:
+        pass
+    print("tools-cli: lost connection to the serve process", file=sys.stderr)
+    return 1
@@ -0,0 +1,120 @@
+"""Resumable, checksum-verified downloads."""
+
+import hashlib
+import os
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Optional
+from urllib.error import HTTPError, URLError
+from utils.exceptions import ToolInstallationError
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 30.0
+
+
+def sha256_file(path: Path) -> str:
+    """
+    Compute the SHA-256 of a file.
+    
+    Args:
+        path: File to hash
+    
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_text(url: str, timeout: float = DOWNLOAD_TIMEOUT) -> str:
+    """
+    Fetch a small text document such as a checksum file.
+    
+    Args:
+        url: http(s):// or file:// URL
+        timeout: Socket timeout in seconds
+    
+    Returns:
+        Document contents
+    
+    Raises:
+        ToolInstallationError: If the document cannot be fetched
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read().decode("utf-8", errors="replace")
+    except (HTTPError, URLError, OSError) as e:
+        raise ToolInstallationError(f"Could not fetch {url}: {e}")
+
+
+def download(
+    url: str,
+    partial_path: Path,
+    expected_sha256: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> Path:
+    """
+    Download a URL in chunks, resuming from an existing partial file.
+    
+    Bytes already present in ``partial_path`` are kept and only the
+    remainder is requested (HTTP Range, or a seek for file:// URLs). The
+    completed file is verified against ``expected_sha256`` and removed if it
+    does not match, so the next attempt starts clean.
+    
+    Args:
+        url: http(s):// or file:// URL
+        partial_path: Where the (partial) download is kept
+        expected_sha256: Expected hex digest of the complete file
+        chunk_size: Bytes read per chunk
+        timeout: Socket timeout in seconds
+    
+    Returns:
+        Path to the completed, verified download
+    
+    Raises:
+        ToolInstallationError: If the download fails or the checksum mismatches
+    """
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+    offset = partial_path.stat().st_size if partial_path.exists() else 0
+    
+    try:
+        if url.startswith("file:"):
+            source_path = urllib.request.url2pathname(urllib.parse.urlparse(url).path)
+            with open(source_path, "rb") as source, open(partial_path, "ab") as f:
+                source.seek(offset)
+                for chunk in iter(lambda: source.read(chunk_size), b""):
+                    f.write(chunk)
+        else:
+            request = urllib.request.Request(url)
+            if offset:
+                request.add_header("Range", f"bytes={offset}-")
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if offset and response.status != 206:
+                    # Server ignored the range request; start over
+                    offset = 0
+                with open(partial_path, "ab" if offset else "wb") as f:
+                    for chunk in iter(lambda: response.read(chunk_size), b""):
+                        f.write(chunk)
+    except HTTPError as e:
+        if e.code == 416 and offset:
+            # Requested range starts at EOF: the partial file is already complete
+            pass
+        else:
+            raise ToolInstallationError(f"Download of {url} failed: {e}")
+    except (URLError, OSError) as e:
+        raise ToolInstallationError(f"Download of {url} failed: {e}")
+    
+    if expected_sha256:
+        actual = sha256_file(partial_path)
+        if actual != expected_sha256.lower():
+            os.unlink(partial_path)
+            raise ToolInstallationError(
+                f"Checksum mismatch for {url}: expected {expected_sha256}, got {actual}"
+            )
+    
+    return partial_path
@@ -1,15 +1,296 @@
 """Logging utilities for the CLI."""
 
+import json
 import logging
-from rich.console import Console
-from rich.logging import RichHandler
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from utils import profiler
 
-console = Console()
+# "rich", "json" or "auto" (JSON lines for machine-readable --output, rich otherwise)
+LOG_FORMAT_ENV = "TOOLS_CLI_LOG_FORMAT"
+# Set to 1 to route every record through the background listener
+LOG_QUEUE_ENV = "TOOLS_CLI_LOG_QUEUE"
+
+# Logger behind log_success/log_error/log_info/log_warning
+USER_LOGGER = "tools_cli.user"
+
+# User message kind -> (level, icon, rich style)
+USER_MESSAGES = {
+    "success": (logging.INFO, "✓", "bold green"),
+    "error": (logging.ERROR, "✗", "bold red"),
+    "info": (logging.INFO, "ℹ", "bold blue"),
+    "warning": (logging.WARNING, "⚠", "bold yellow"),
+}
+
+_console = None
+_log_console = None
+_console_lock = threading.Lock()
+_console_kwargs: dict = {}
+_force_terminal: Optional[bool] = None
+_default_format: Optional[str] = None
+_log_format: Optional[str] = None
+
+
+def get_console():
+    """
+    Get the shared rich Console, creating it on first use.
+    
+    rich is only imported when something is actually printed, which keeps
+    it off the startup path of commands that never log.
+    
+    Returns:
+        Shared Console instance
+    """
+    global _console
+    if _console is None:
+        with _console_lock:
+            if _console is None:
+                with profiler.span("import rich", "render"):
+                    from rich.console import Console
+                    _console = Console()
+    return _console
+
+
+def get_log_console():
+    """
+    Get the Console that renders log records, creating it on first use.
+    
+    Log records go to stderr, so stdout only carries command output.
+    
+    Returns:
+        Shared stderr Console instance
+    """
+    global _log_console
+    if _log_console is None:
+        with _console_lock:
+            if _log_console is None:
+                with profiler.span("import rich", "render"):
+                    from rich.console import Console
+                kwargs = dict(_console_kwargs)
+                kwargs["force_terminal"] = _force_terminal
+                _log_console = Console(stderr=True, **kwargs)
+    return _log_console
+
+
+def configure_console(log_terminal: Optional[bool] = None, **console_kwargs):
+    """
+    Replace the shared Consoles, e.g. to match the terminal of a daemon client.
+    
+    The log format is chosen again on the next record.
+    
+    Args:
+        log_terminal: Whether stderr is a terminal (None: detect)
+        **console_kwargs: Arguments for rich.console.Console
+    """
+    global _console, _log_console, _console_kwargs, _force_terminal, _default_format, _log_format
+    from rich.console import Console
+    with _console_lock:
+        _console = Console(**console_kwargs)
+        _log_console = None
+        _console_kwargs = {key: value for key, value in console_kwargs.items() if key != "force_terminal"}
+        _force_terminal = log_terminal
+        _default_format = None
+        _log_format = None
+
+
+def set_log_format(default: Optional[str]):
+    """
+    Set the log format used when TOOLS_CLI_LOG_FORMAT does not choose one.
+    
+    Args:
+        default: "rich", "json", or None for the default (rich)
+    """
+    global _default_format, _log_format
+    _default_format = default
+    _log_format = None
+
+
+def log_format() -> str:
+    """
+    Get the active log format.
+    
+    TOOLS_CLI_LOG_FORMAT selects "rich" or "json", then the format set with
+    :func:`set_log_format` (JSON for ``-o json`` and the other
+    machine-readable outputs); otherwise rich output is used. rich renders
+    plain text when stderr is not a terminal, so redirected logs stay
+    readable.
+    
+    Returns:
+        "rich" or "json"
+    """
+    global _log_format
+    if _log_format is None:
+        requested = os.environ.get(LOG_FORMAT_ENV, "auto").lower()
+        if requested in ("rich", "json"):
+            _log_format = requested
+        elif _default_format is not None:
+            _log_format = _default_format
+        else:
+            _log_format = "rich"
+    return _log_format
+
+
+class _ConsoleProxy:
+    """Stand-in for the shared Console that defers creating it."""
+    
+    def __getattr__(self, name):
+        return getattr(get_console(), name)
+    
+    def print(self, *args, **kwargs):
+        """Print through the shared Console, timed when profiling."""
+        with profiler.span("console.print", "render"):
+            get_console().print(*args, **kwargs)
+
+
+console = _ConsoleProxy()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as compact single-line JSON objects."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        kind = getattr(record, "kind", None)
+        if kind:
+            entry["kind"] = kind
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _OutputHandler(logging.Handler):
+    """
+    Writes records to stderr in the active format.
+    
+    Rich output goes through the stderr Console (user messages styled,
+    other records via RichHandler); JSON lines are written directly. The
+    stream is looked up per record, so redirected stdio is honoured.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._json = JsonLinesFormatter()
+        self._rich = None
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            if log_format() == "json":
+                stream = sys.stderr
+                stream.write(self._json.format(record) + "\n")
+                stream.flush()
+            elif record.name == USER_LOGGER:
+                _, icon, style = USER_MESSAGES[record.kind]
+                with profiler.span("console.print", "render"):
+                    get_log_console().print(f"{icon} {record.getMessage()}", style=style)
+            else:
+                if self._rich is None:
+                    from rich.logging import RichHandler
+                    self._rich = RichHandler(rich_tracebacks=True, console=get_log_console())
+                    self._rich.setFormatter(logging.Formatter("%(message)s"))
+                self._rich.console = get_log_console()
+                self._rich.emit(record)
+        except Exception:
+            self.handleError(record)
+
+
+class _DispatchHandler(logging.Handler):
+    """
+    Handler attached to every CLI logger.
+    
+    Records are written directly, or put on a queue for the background
+    listener while queued logging is active. Records are not formatted
+    here, so the calling thread only pays for creating them.
+    """
+    
+    def __init__(self, output: logging.Handler):
+        super().__init__()
+        self.output = output
+        self.queue = None
+    
+    def emit(self, record: logging.LogRecord):
+        queue = self.queue
+        if queue is not None:
+            queue.put_nowait(record)
+        else:
+            self.output.handle(record)
+
+
+_output = _OutputHandler()
+_dispatch = _DispatchHandler(_output)
+_listener = None
+_listener_depth = 0
+_listener_lock = threading.Lock()
+
+
+def start_queue():
+    """
+    Route records through a queue to a background listener thread.
+    
+    Calls nest; the listener runs until the matching number of
+    :func:`stop_queue` calls.
+    """
+    global _listener, _listener_depth
+    with _listener_lock:
+        _listener_depth += 1
+        if _listener is None:
+            import queue
+            from logging.handlers import QueueListener
+            
+            records = queue.SimpleQueue()
+            _listener = QueueListener(records, _output)
+            _listener.start()
+            _dispatch.queue = records
+
+
+def stop_queue():
+    """Stop the background listener after writing every queued record."""
+    global _listener, _listener_depth
+    with _listener_lock:
+        _listener_depth = max(0, _listener_depth - 1)
+        if _listener_depth or _listener is None:
+            return
+        _dispatch.queue = None
+        # Enqueues the sentinel behind pending records and joins the thread
+        _listener.stop()
+        _listener = None
+
+
+@contextmanager
+def queued_logging():
+    """
+    Log through the background listener for the duration of a block.
+    
+    Used around concurrent operations, so worker threads and coroutines
+    never wait on terminal rendering; every record is written before the
+    block exits.
+    """
+    start_queue()
+    try:
+        yield
+    finally:
+        stop_queue()
+
+
+if os.environ.get(LOG_QUEUE_ENV) == "1":
+    import atexit
+    
+    start_queue()
+    atexit.register(stop_queue)
 
 
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
-    Set up a logger with rich formatting.
+    Set up a logger writing through the shared CLI handler.
     
     Args:
         name: Logger name
@@ -22,28 +303,37 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     logger.setLevel(level)
     
     if not logger.handlers:
-        handler = RichHandler(rich_tracebacks=True, console=console)
-        handler.setFormatter(logging.Formatter("%(message)s"))
-        logger.addHandler(handler)
+        logger.addHandler(_dispatch)
     
     return logger
 
 
-def log_success(message: str):
+_user_logger = setup_logger(USER_LOGGER)
+_user_logger.propagate = False
+
+
+def _log_user(kind: str, message: str, args: tuple):
+    """Emit a user message; %-style args are only formatted if it is shown."""
+    level = USER_MESSAGES[kind][0]
+    if _user_logger.isEnabledFor(level):
+        _user_logger.log(level, message, *args, extra={"kind": kind})
+
+
+def log_success(message: str, *args):
     """Log success message in green."""
-    console.print(f"✓ {message}", style="bold green")
+    _log_user("success", message, args)
 
 
-def log_error(message: str):
+def log_error(message: str, *args):
     """Log error message in red."""
-    console.print(f"✗ {message}", style="bold red")
+    _log_user("error", message, args)
 
 
-def log_info(message: str):
+def log_info(message: str, *args):
     """Log info message."""
-    console.print(f"ℹ {message}", style="bold blue")
+    _log_user("info", message, args)
 
 
-def log_warning(message: str):
+def log_warning(message: str, *args):
     """Log warning message."""
-    console.print(f"⚠ {message}", style="bold yellow")
+    _log_user("warning", message, args)
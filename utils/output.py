@@ -0,0 +1,142 @@
+"""Command output in the format selected with --output."""
+
+import json
+import sys
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+FORMATS = ("table", "json", "yaml", "ndjson")
+
+_format = "table"
+
+
+def set_output_format(output_format: str):
+    """
+    Select the output format for the rest of the command.
+    
+    Args:
+        output_format: One of FORMATS (case-insensitive)
+    
+    Raises:
+        ValueError: If the format is not supported
+    """
+    global _format
+    output_format = output_format.lower()
+    if output_format not in FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}'. Available formats: {', '.join(FORMATS)}")
+    _format = output_format
+
+
+def output_format() -> str:
+    """Get the selected output format."""
+    return _format
+
+
+class Column(NamedTuple):
+    """Table column: row key, header, rich style and cell formatter."""
+    key: str
+    header: str
+    style: Optional[str] = None
+    justify: str = "left"
+    format: Callable[[Any], str] = str
+
+
+def _dump_yaml(data: Any) -> str:
+    import yaml
+    
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml.dump(data, Dumper=dumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
+
+
+class RowWriter:
+    """
+    Writes rows (dictionaries) in the selected output format.
+    
+    Machine-readable formats are streamed: every row is written to stdout
+    as it is passed in and nothing is kept, so memory stays constant and a
+    reader sees rows while later ones are still being fetched. Cells keep
+    their raw values there; Column formatters only apply to the table,
+    which is built and printed when the writer is closed. rich is only
+    imported for tables.
+    """
+    
+    def __init__(self, columns: List[Column], title: Optional[str] = None):
+        """
+        Initialize writer.
+        
+        Args:
+            columns: Table columns (their keys are also the machine-readable fields)
+            title: Table title
+        """
+        self.columns = columns
+        self.title = title
+        self.format = output_format()
+        self.count = 0
+        self._rows: List[Dict[str, Any]] = []
+    
+    def write(self, row: Dict[str, Any]):
+        """
+        Write one row.
+        
+        Args:
+            row: Row values by column key
+        """
+        stream = sys.stdout
+        if self.format == "ndjson":
+            stream.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+            stream.flush()
+        elif self.format == "json":
+            stream.write(("[\n  " if not self.count else ",\n  ") + json.dumps(row, default=str))
+            stream.flush()
+        elif self.format == "yaml":
+            stream.write(_dump_yaml([row]))
+            stream.flush()
+        else:
+            self._rows.append(row)
+        self.count += 1
+    
+    def close(self):
+        """Finish the output: close the JSON array or print the table."""
+        stream = sys.stdout
+        if self.format == "json":
+            stream.write("\n]\n" if self.count else "[]\n")
+        elif self.format == "yaml":
+            if not self.count:
+                stream.write("[]\n")
+        elif self.format == "table" and self._rows:
+            from rich.table import Table
+            from utils.logger import console
+            
+            table = Table(title=self.title)
+            for column in self.columns:
+                table.add_column(column.header, style=column.style, justify=column.justify)
+            for row in self._rows:
+                table.add_row(*(column.format(row[column.key]) for column in self.columns))
+            console.print(table)
+            self._rows = []
+    
+    def __enter__(self) -> "RowWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        # Rows written before a failure are still flushed
+        self.close()
+
+
+def write_object(data: Dict[str, Any], title: Optional[str] = None):
+    """
+    Write a single object: a property/value table, or the object itself.
+    
+    Args:
+        data: Object to write
+        title: Table title
+    """
+    if _format == "table":
+        with RowWriter([Column("property", "Property", "cyan"), Column("value", "Value", "green")], title) as writer:
+            for key, value in data.items():
+                writer.write({"property": key, "value": value})
+    elif _format == "yaml":
+        sys.stdout.write(_dump_yaml(data))
+    else:
+        indent = 2 if _format == "json" else None
+        separators = None if indent else (",", ":")
+        sys.stdout.write(json.dumps(data, indent=indent, separators=separators, default=str) + "\n")
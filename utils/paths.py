@@ -0,0 +1,67 @@
+"""Filesystem locations used by the CLI."""
+
+import os
+from pathlib import Path
+
+
+APP_NAME = "tools-cli"
+
+
+def cache_dir(*parts: str) -> Path:
+    """
+    Get (and create) a directory under the CLI cache root.
+    
+    Honours XDG_CACHE_HOME and falls back to ~/.cache.
+    
+    Args:
+        *parts: Optional sub-directory components
+    
+    Returns:
+        Path to the cache directory
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    path = Path(root, APP_NAME, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def socket_path() -> str:
+    """
+    Get the Unix socket path of the resident ``serve`` process.
+    
+    Honours TOOLS_CLI_SOCKET, then XDG_RUNTIME_DIR, and falls back to a
+    per-user directory in the temp directory. Either way the socket's
+    directory must pass :func:`is_private_dir` to be used.
+    
+    Returns:
+        Socket path
+    """
+    if os.environ.get("TOOLS_CLI_SOCKET"):
+        return os.environ["TOOLS_CLI_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"{APP_NAME}.sock")
+    return os.path.join("/tmp", f"{APP_NAME}-{os.getuid()}", "serve.sock")
+
+
+def is_private_dir(path: str) -> bool:
+    """
+    Check that only the current user can create files in a directory.
+    
+    The directory itself (not a symlink to it) must be owned by the current
+    user and not be group- or world-writable, so no other user can plant a
+    socket in it.
+    
+    Args:
+        path: Directory path
+    
+    Returns:
+        True if the directory is private to the current user
+    """
+    import stat
+    
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o022
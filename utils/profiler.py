@@ -0,0 +1,183 @@
+"""Opt-in tracing that writes Chrome trace-event JSON (viewable in Perfetto)."""
+
+import atexit
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """Collects trace events for one CLI invocation."""
+    
+    def __init__(self, path: str, origin: Optional[float] = None):
+        """
+        Initialize profiler.
+        
+        Args:
+            path: File the trace is written to
+            origin: perf_counter() value used as time zero (default: now)
+        """
+        self.path = path
+        self.origin = time.perf_counter() if origin is None else origin
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+    
+    def _micros(self, seconds: float) -> float:
+        """Convert a perf_counter() value to trace microseconds."""
+        return round((seconds - self.origin) * 1_000_000, 3)
+    
+    def complete(self, name: str, start: float, duration: float, category: str, args: Dict[str, Any]):
+        """Record a span on the calling thread's track."""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._micros(start),
+            "dur": round(duration * 1_000_000, 3),
+            "pid": self.pid,
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+    
+    def async_span(self, name: str, start: float, duration: float, category: str, args: Dict[str, Any]):
+        """Record a span that may overlap others on the same thread (asyncio tasks)."""
+        span_id = next(self._ids)
+        common = {"name": name, "cat": category, "id": span_id, "pid": self.pid, "tid": threading.get_native_id()}
+        with self._lock:
+            self.events.append({**common, "ph": "b", "ts": self._micros(start), "args": args})
+            self.events.append({**common, "ph": "e", "ts": self._micros(start + duration)})
+    
+    def write(self):
+        """Write collected events to the trace file."""
+        import json
+        
+        with self._lock:
+            events = list(self.events)
+        events.append({"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "tools-cli"}})
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class _Span:
+    """Context manager recording one span on exit."""
+    
+    __slots__ = ("name", "category", "args", "start")
+    
+    def __init__(self, name: str, category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        profiler = _profiler
+        if profiler is not None:
+            if exc_type is not None:
+                self.args["error"] = exc_type.__name__
+            profiler.complete(self.name, self.start, time.perf_counter() - self.start, self.category, self.args)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span used while profiling is off."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(path: str, origin: Optional[float] = None) -> Profiler:
+    """
+    Start collecting trace events; the trace is written at interpreter exit.
+    
+    Args:
+        path: File the trace is written to
+        origin: perf_counter() value used as time zero (default: now)
+    
+    Returns:
+        Active Profiler
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(path, origin)
+        atexit.register(_write_at_exit)
+    return _profiler
+
+
+def _write_at_exit():
+    """Close the root span and write the trace file."""
+    profiler = _profiler
+    if profiler is None:
+        return
+    profiler.complete("tools-cli", profiler.origin, time.perf_counter() - profiler.origin, "cli", {"argv": sys.argv[1:]})
+    try:
+        profiler.write()
+        print(f"Profile written to {profiler.path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Failed to write profile {profiler.path}: {e}", file=sys.stderr)
+
+
+def is_enabled() -> bool:
+    """Check whether profiling is on."""
+    return _profiler is not None
+
+
+def span(name: str, category: str = "cli", **args):
+    """
+    Time a block of code.
+    
+    While profiling is off this returns a shared no-op context manager, so
+    instrumented code pays for one global lookup and a function call.
+    
+    Args:
+        name: Span name
+        category: Trace category
+        **args: Extra details shown with the span
+    
+    Returns:
+        Context manager
+    """
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def record(name: str, start: float, duration: float, category: str = "cli", overlapping: bool = False, **args):
+    """
+    Record an already finished span.
+    
+    Args:
+        name: Span name
+        start: perf_counter() value at which the span started
+        duration: Span length in seconds
+        category: Trace category
+        overlapping: Whether the span may overlap others on the same thread
+            (asyncio tasks); such spans are recorded as async events
+        **args: Extra details shown with the span
+    """
+    profiler = _profiler
+    if profiler is None:
+        return
+    if overlapping:
+        profiler.async_span(name, start, duration, category, args)
+    else:
+        profiler.complete(name, start, duration, category, args)